@@ -12,6 +12,12 @@ python manage.py migrate
 mkdir -p staticfiles
 mkdir -p media
 
+# Publish the public API content as static JSON (collected just below)
+python manage.py publicar_conteudo --sem-collectstatic
+
+# Sprite of the agenda icons used by the admin icon selector
+python manage.py gerar_sprite_icones
+
 # Collect static files (isso vai copiar de STATICFILES_DIRS para STATIC_ROOT)
 python manage.py collectstatic --no-input --clear
 
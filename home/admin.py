@@ -21,7 +21,7 @@ class ConfiguracaoSiteAdmin(admin.ModelAdmin):
 
     def has_add_permission(self, request):
         # Verifica se já existe uma configuração
-        return not ConfiguracaoSite.objects.exists()
+        return ConfiguracaoSite.atual() is None
 
     def has_delete_permission(self, request, obj=None):
         # Impede a exclusão da configuração
@@ -42,7 +42,7 @@ admin.site.register(ConfiguracaoSite, ConfiguracaoSiteAdmin)
 # --- ADMIN PARA DEVOCIONAIS ---
 @admin.register(Devocional)
 class DevocionalAdmin(admin.ModelAdmin):
-    list_display = ('titulo', 'autor', 'data_publicacao')
+    list_display = ('titulo', 'autor', 'data_publicacao', 'status_publicacao', 'tempo_leitura', 'visualizacoes')
     list_filter = ('autor', 'data_publicacao')
     search_fields = ('titulo', 'conteudo')
     fieldsets = (
@@ -54,6 +54,10 @@ class DevocionalAdmin(admin.ModelAdmin):
         }),
     )
 
+    def status_publicacao(self, obj):
+        return "Publicada" if obj.publicado else "Agendada"
+    status_publicacao.short_description = "Status"
+
 # --- NOVO ADMIN APENAS PARA DEPARTAMENTOS --- 
 @admin.register(Departamento)
 class DepartamentoAdmin(admin.ModelAdmin):
@@ -116,8 +120,10 @@ class DiaSemanaAdmin(admin.ModelAdmin):
 
 @admin.register(EventoEspecial)
 class EventoEspecialAdmin(admin.ModelAdmin):
-    list_display = ('titulo', 'periodo', 'ordem')
+    list_display = ('titulo', 'periodo', 'data_inicio', 'data_fim', 'ordem')
     list_editable = ('ordem',)
+    list_filter = ('data_inicio',)
+    fields = ('titulo', 'descricao', 'periodo', 'data_inicio', 'data_fim', 'ordem')
 
 # Registrando os novos modelos para que apareçam no Admin
 admin.site.register(Pastor)
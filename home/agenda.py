@@ -0,0 +1,153 @@
+# home/agenda.py
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import cache as home_cache
+from .models import DiaSemana
+
+# A agenda da igreja sempre é expressa no horário de Brasília
+FUSO_AGENDA = ZoneInfo(settings.TIME_ZONE)
+
+# Horizonte do índice pré-calculado e limites aceitos no parâmetro ?dias=
+HORIZONTE_MAXIMO_DIAS = 90
+DIAS_PADRAO = 14
+
+# Duração assumida para cada evento no feed iCalendar (o modelo não guarda o término)
+DURACAO_PADRAO_EVENTO = timedelta(hours=2)
+
+
+def hoje_local():
+    """Data de hoje no fuso da agenda."""
+    return timezone.now().astimezone(FUSO_AGENDA).date()
+
+
+def _dia_semana_do_modelo(data):
+    # DiaSemana usa 0 = Domingo, enquanto date.weekday() usa 0 = Segunda-feira
+    return (data.weekday() + 1) % 7
+
+
+def construir_indice(inicio, dias=HORIZONTE_MAXIMO_DIAS):
+    """
+    Expande o modelo semanal (DiaSemana -> Evento) em ocorrências concretas
+    para os próximos `dias` dias a partir de `inicio`, em ordem cronológica.
+    """
+    eventos_por_dia = {}
+    for dia in DiaSemana.objects.prefetch_related('eventos'):
+        eventos_por_dia[dia.nome] = (dia, list(dia.eventos.all()))
+
+    ocorrencias = []
+    for deslocamento in range(dias):
+        data = inicio + timedelta(days=deslocamento)
+        dia, eventos = eventos_por_dia.get(_dia_semana_do_modelo(data), (None, []))
+        for evento in eventos:
+            comeco = datetime.combine(data, evento.horario, tzinfo=FUSO_AGENDA)
+            ocorrencias.append({
+                'evento_id': evento.id,
+                'titulo': evento.titulo,
+                'descricao': evento.descricao,
+                'data': data.isoformat(),
+                'horario': evento.horario.strftime('%H:%M'),
+                'inicio': comeco.isoformat(),
+                'dia_semana': dia.nome,
+                'dia_semana_display': dia.get_nome_display(),
+            })
+    ocorrencias.sort(key=lambda ocorrencia: ocorrencia['inicio'])
+    return ocorrencias
+
+
+def obter_indice():
+    """
+    Retorna (ocorrencias, etag) do índice de hoje, calculando-o no máximo uma vez
+    por dia ou após qualquer alteração em DiaSemana/Evento/EventoEspecial.
+    """
+    inicio = hoje_local()
+    return home_cache.obter_ou_gerar(
+        'agenda', ('indice', inicio.isoformat()),
+        lambda: construir_indice(inicio),
+    )
+
+
+def ocorrencias_ate(ocorrencias, dias):
+    """Recorta o índice (já ordenado) para os primeiros `dias` dias."""
+    limite = (hoje_local() + timedelta(days=dias)).isoformat()
+    return [ocorrencia for ocorrencia in ocorrencias if ocorrencia['data'] < limite]
+
+
+# --- FEED ICALENDAR ---
+
+def _escapar_texto_ical(texto):
+    return (
+        (texto or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def _dobrar_linha_ical(linha):
+    # RFC 5545: linhas com mais de 75 octetos devem ser quebradas
+    partes = []
+    atual = ''
+    for caractere in linha:
+        if len((atual + caractere).encode('utf-8')) > 75:
+            partes.append(atual)
+            atual = ' ' + caractere
+        else:
+            atual += caractere
+    partes.append(atual)
+    return '\r\n'.join(partes)
+
+
+def _formatar_utc(momento):
+    return momento.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def gerar_ical(ocorrencias, dominio, eventos_especiais=()):
+    """
+    Gera um calendário iCalendar (RFC 5545) a partir das ocorrências do índice.
+    Os eventos especiais com datas entram como eventos de dia inteiro.
+    """
+    carimbo = _formatar_utc(timezone.now())
+    linhas = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:-//{dominio}//Agenda da Igreja//PT-BR',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:Agenda da Igreja',
+        f'X-WR-TIMEZONE:{settings.TIME_ZONE}',
+    ]
+    for ocorrencia in ocorrencias:
+        inicio = datetime.fromisoformat(ocorrencia['inicio'])
+        linhas += [
+            'BEGIN:VEVENT',
+            f"UID:evento-{ocorrencia['evento_id']}-{inicio.strftime('%Y%m%d')}@{dominio}",
+            f'DTSTAMP:{carimbo}',
+            f'DTSTART:{_formatar_utc(inicio)}',
+            f'DTEND:{_formatar_utc(inicio + DURACAO_PADRAO_EVENTO)}',
+            f"SUMMARY:{_escapar_texto_ical(ocorrencia['titulo'])}",
+        ]
+        if ocorrencia['descricao']:
+            linhas.append(f"DESCRIPTION:{_escapar_texto_ical(ocorrencia['descricao'])}")
+        linhas.append('END:VEVENT')
+    for evento in eventos_especiais:
+        linhas += [
+            'BEGIN:VEVENT',
+            f'UID:evento-especial-{evento.id}@{dominio}',
+            f'DTSTAMP:{carimbo}',
+            f"DTSTART;VALUE=DATE:{evento.data_inicio.strftime('%Y%m%d')}",
+            # DTEND de dia inteiro é exclusivo: o dia seguinte ao término
+            f"DTEND;VALUE=DATE:{((evento.data_fim or evento.data_inicio) + timedelta(days=1)).strftime('%Y%m%d')}",
+            f'SUMMARY:{_escapar_texto_ical(evento.titulo)}',
+        ]
+        if evento.descricao:
+            linhas.append(f'DESCRIPTION:{_escapar_texto_ical(evento.descricao)}')
+        linhas.append('END:VEVENT')
+    linhas.append('END:VCALENDAR')
+    return '\r\n'.join(_dobrar_linha_ical(linha) for linha in linhas) + '\r\n'
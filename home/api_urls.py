@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import ConfiguracaoSiteAPIView, DevocionalRecenteAPIView, LiderancaAPIView, DepartamentosAPIView, AgendaAPIView, DevocionalListView
+from .views import ConfiguracaoSiteAPIView, DevocionalRecenteAPIView, LiderancaAPIView, DepartamentosAPIView, AgendaAPIView, AgendaProximosAPIView, AgendaICalAPIView, DevocionalListView, HistoriaAPIView, AlteracoesAPIView, DevocionalDetalheAPIView, DevocionaisMaisLidosAPIView
 
 urlpatterns = [
     path('configuracao/', ConfiguracaoSiteAPIView.as_view(), name='api-configuracao'),
@@ -7,6 +7,12 @@ urlpatterns = [
     path('lideranca/', LiderancaAPIView.as_view(), name='api-lideranca'),
     path('departamentos/', DepartamentosAPIView.as_view(), name='api-departamentos'),
     path('agenda/', AgendaAPIView.as_view(), name='api-agenda'),
+    path('agenda/proximos/', AgendaProximosAPIView.as_view(), name='api-agenda-proximos'),
+    path('agenda/calendario.ics', AgendaICalAPIView.as_view(), name='api-agenda-ical'),
     path('devocionais/', DevocionalListView.as_view(), name='api-devocional-list'),
+    path('devocionais/mais-lidos/', DevocionaisMaisLidosAPIView.as_view(), name='api-devocional-mais-lidos'),
+    path('devocionais/<int:pk>/', DevocionalDetalheAPIView.as_view(), name='api-devocional-detail'),
+    path('historia/', HistoriaAPIView.as_view(), name='api-historia'),
+    path('changes/', AlteracoesAPIView.as_view(), name='api-changes'),
 
 ]
\ No newline at end of file
@@ -0,0 +1,106 @@
+# home/cache.py
+
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+# Tempo máximo que uma resposta fica no cache. A invalidação de verdade é feita
+# pelos sinais (home/signals.py), que trocam a versão do namespace.
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _chave_versao(namespace):
+    return f"versao:{namespace}"
+
+
+def versao(namespace):
+    """
+    Retorna a versão atual de um namespace de cache (ex: 'agenda').
+    A versão inicial é baseada no relógio para que, se o cache for limpo,
+    as novas chaves (e ETags) nunca colidam com as antigas.
+    """
+    chave = _chave_versao(namespace)
+    atual = cache.get(chave)
+    if atual is None:
+        cache.add(chave, int(time.time() * 1000), timeout=None)
+        atual = cache.get(chave)
+    return atual
+
+
+def invalidar(*namespaces):
+    """Invalida todas as entradas dos namespaces informados trocando a sua versão."""
+    for namespace in namespaces:
+        chave = _chave_versao(namespace)
+        try:
+            cache.incr(chave)
+        except ValueError:
+            # A chave ainda não existia (ou expirou): começa uma versão nova
+            cache.set(chave, int(time.time() * 1000), timeout=None)
+
+
+def chave(namespace, *partes):
+    """Monta uma chave de cache vinculada à versão atual do namespace."""
+    sufixo = ":".join(str(parte) for parte in partes)
+    return f"{namespace}:v{versao(namespace)}:{sufixo}"
+
+
+def calcular_etag(conteudo):
+    """Calcula uma ETag forte a partir de bytes, texto ou dados serializáveis em JSON."""
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode("utf-8")
+    elif not isinstance(conteudo, bytes):
+        conteudo = json.dumps(conteudo, sort_keys=True, cls=DjangoJSONEncoder).encode("utf-8")
+    return '"%s"' % hashlib.md5(conteudo).hexdigest()
+
+
+def obter_ou_gerar(namespace, partes, gerar, timeout=CACHE_TIMEOUT):
+    """
+    Busca no cache o par (conteudo, etag) identificado por namespace + partes.
+    Em caso de falta, chama `gerar()` uma única vez, calcula a ETag e guarda os dois juntos.
+    `timeout` pode ser uma função, avaliada só na geração (ex: segundos até a próxima publicação).
+    """
+    chave_cache = chave(namespace, *partes)
+    item = cache.get(chave_cache)
+    if item is None:
+        conteudo = gerar()
+        item = (conteudo, calcular_etag(conteudo))
+        if callable(timeout):
+            timeout = timeout()
+        cache.set(chave_cache, item, timeout)
+    return item
+
+
+def resposta_nao_modificada(request, etag):
+    """Retorna um 304 se o cliente já possui a versão identificada pela ETag, ou None."""
+    return get_conditional_response(request, etag=etag)
+
+
+def aplicar_cabecalhos_condicionais(response, etag):
+    """Adiciona a ETag e obriga o cliente a revalidar antes de reutilizar a resposta."""
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True, public=True)
+    return response
+
+
+def responder(request, etag, construir):
+    """
+    Responde 304 se a ETag do cliente ainda vale; caso contrário chama `construir()`
+    para montar a resposta completa. Nos dois casos aplica os cabeçalhos condicionais.
+    """
+    response = resposta_nao_modificada(request, etag)
+    if response is None:
+        response = construir()
+    return aplicar_cabecalhos_condicionais(response, etag)
+
+
+def segundos_ate(momento, maximo=CACHE_TIMEOUT):
+    """Tempo de vida de um item de cache que precisa expirar exatamente em `momento` (ou None)."""
+    if momento is None:
+        return maximo
+    restante = (momento - timezone.now()).total_seconds()
+    return max(1, min(maximo, int(restante) + 1))
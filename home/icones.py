@@ -0,0 +1,173 @@
+# home/icones.py
+"""
+Registro dos ícones da agenda (static/fotos/ícones/agenda). O manifesto fica
+memorizado no worker, vinculado a uma assinatura com nome, tamanho e mtime de cada
+ícone: montar o formulário do admin custa só um os.scandir da pasta, e o manifesto
+(e o sprite) são refeitos quando um ícone é adicionado, removido ou substituído.
+O mtime da pasta sozinho não bastaria: sobrescrever um arquivo não o altera.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections import namedtuple
+from urllib.parse import quote, urljoin
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+logger = logging.getLogger(__name__)
+
+# Caminho dos ícones dentro de STATICFILES_DIRS[0]
+PASTA_ICONES = 'fotos/ícones/agenda'
+EXTENSOES_ICONES = ('.png', '.svg', '.jpg', '.jpeg', '.gif')
+
+# Sprite opcional com todos os ícones lado a lado (gerado por `manage.py gerar_sprite_icones`).
+# Fica em static/publico/, a pasta de arquivos gerados que não vai para o git.
+SPRITE_ICONES = 'publico/icones/agenda-sprite.png'
+SPRITE_INDICE = 'publico/icones/agenda-sprite.json'
+TAMANHO_ICONE = 48  # pixels de cada célula do sprite
+
+Icone = namedtuple('Icone', ['nome', 'arquivo', 'url', 'posicao_sprite'])
+Manifesto = namedtuple('Manifesto', ['icones', 'por_nome', 'sprite_url'])
+
+MANIFESTO_VAZIO = Manifesto(icones=[], por_nome={}, sprite_url=None)
+
+# (assinatura da pasta, manifesto) memorizado neste worker
+_memorizado = (None, None)
+
+
+def pasta_absoluta():
+    return os.path.join(settings.STATICFILES_DIRS[0], *PASTA_ICONES.split('/'))
+
+
+def url_estatica(caminho):
+    """URL com hash do ManifestStaticFilesStorage; sem o manifesto (DEBUG ou antes do collectstatic), a URL simples."""
+    try:
+        return staticfiles_storage.url(caminho)
+    except ValueError:
+        # static() passaria de novo pelo mesmo storage e levantaria o mesmo erro
+        return urljoin(settings.STATIC_URL, quote(caminho))
+
+
+def assinatura_pasta(pasta):
+    """Hash de nome, tamanho e mtime de cada ícone da pasta (levanta OSError se ela não existir)."""
+    partes = []
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            if os.path.splitext(entrada.name)[1].lower() in EXTENSOES_ICONES:
+                estado = entrada.stat()
+                partes.append(f"{entrada.name}:{estado.st_size}:{estado.st_mtime_ns}")
+    return hashlib.sha1('\n'.join(sorted(partes)).encode('utf-8')).hexdigest()
+
+
+def _ler_indice_sprite():
+    caminho_indice = os.path.join(settings.STATICFILES_DIRS[0], *SPRITE_INDICE.split('/'))
+    try:
+        with open(caminho_indice, encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _listar(pasta):
+    icones = []
+    nomes = set()
+    for arquivo in sorted(os.listdir(pasta)):
+        nome, extensao = os.path.splitext(arquivo)
+        if extensao.lower() not in EXTENSOES_ICONES or nome in nomes:
+            continue
+        nomes.add(nome)
+        icones.append(Icone(nome, arquivo, url_estatica(f"{PASTA_ICONES}/{arquivo}"), None))
+    return icones
+
+
+def _escanear(pasta, assinatura):
+    icones = _listar(pasta)
+
+    # O sprite só vale se foi gerado exatamente para estes arquivos; um sprite de uma versão
+    # anterior da pasta é gerado de novo, e sem sprite o seletor usa um arquivo por ícone
+    indice = _ler_indice_sprite()
+    if indice is not None and (indice.get('assinatura'), indice.get('tamanho')) != (assinatura, TAMANHO_ICONE):
+        try:
+            indice = {'assinatura': assinatura} if _gravar_sprite(pasta, icones, assinatura) else None
+        except OSError:
+            logger.exception("Falha ao gerar de novo o sprite dos ícones em '%s'", pasta)
+            indice = None
+
+    sprite_url = None
+    if indice is not None:
+        sprite_url = url_estatica(SPRITE_ICONES)
+        icones = [icone._replace(posicao_sprite=posicao * TAMANHO_ICONE) for posicao, icone in enumerate(icones)]
+    return Manifesto(icones, {icone.nome: icone for icone in icones}, sprite_url)
+
+
+def manifesto():
+    """Manifesto atual dos ícones. Só é montado de novo quando a assinatura da pasta muda."""
+    global _memorizado
+    pasta = pasta_absoluta()
+    try:
+        assinatura = assinatura_pasta(pasta)
+    except OSError:
+        assinatura = None
+
+    assinatura_memorizada, atual = _memorizado
+    if atual is not None and assinatura_memorizada == assinatura:
+        return atual
+
+    if assinatura is None:
+        logger.warning("O diretório de ícones não foi encontrado em '%s'", pasta)
+        atual = MANIFESTO_VAZIO
+    else:
+        atual = _escanear(pasta, assinatura)
+    _memorizado = (assinatura, atual)
+    return atual
+
+
+def gerar_sprite():
+    """
+    Junta todos os ícones raster em um único PNG (uma célula de TAMANHO_ICONE por ícone)
+    e grava o índice usado para validar o sprite. Retorna a quantidade de ícones, ou
+    None se não houver ícones ou algum deles for SVG (o Pillow não rasteriza SVG).
+    """
+    pasta = pasta_absoluta()
+    if not os.path.isdir(pasta):
+        return None
+    icones = _listar(pasta)
+    if not _gravar_sprite(pasta, icones, assinatura_pasta(pasta)):
+        return None
+    return len(icones)
+
+
+def _gravar_sprite(pasta, icones, assinatura):
+    from PIL import Image
+
+    if not icones or any(icone.arquivo.lower().endswith('.svg') for icone in icones):
+        return False
+
+    sprite = Image.new('RGBA', (TAMANHO_ICONE * len(icones), TAMANHO_ICONE), (0, 0, 0, 0))
+    for indice, icone in enumerate(icones):
+        with Image.open(os.path.join(pasta, icone.arquivo)) as imagem:
+            imagem = imagem.convert('RGBA')
+            imagem.thumbnail((TAMANHO_ICONE, TAMANHO_ICONE))
+            deslocamento_x = indice * TAMANHO_ICONE + (TAMANHO_ICONE - imagem.width) // 2
+            deslocamento_y = (TAMANHO_ICONE - imagem.height) // 2
+            sprite.paste(imagem, (deslocamento_x, deslocamento_y))
+
+    raiz = settings.STATICFILES_DIRS[0]
+    caminho_sprite = os.path.join(raiz, *SPRITE_ICONES.split('/'))
+    caminho_indice = os.path.join(raiz, *SPRITE_INDICE.split('/'))
+    os.makedirs(os.path.dirname(caminho_sprite), exist_ok=True)
+    # Arquivos temporários trocados no final: outro worker nunca lê um sprite pela metade
+    sprite.save(f"{caminho_sprite}.tmp", format='PNG', optimize=True)
+    os.replace(f"{caminho_sprite}.tmp", caminho_sprite)
+    indice = {
+        'tamanho': TAMANHO_ICONE,
+        'assinatura': assinatura,
+        'arquivos': [icone.arquivo for icone in icones],
+    }
+    with open(f"{caminho_indice}.tmp", 'w', encoding='utf-8') as arquivo:
+        json.dump(indice, arquivo, ensure_ascii=False)
+    os.replace(f"{caminho_indice}.tmp", caminho_indice)
+    return True
@@ -0,0 +1,71 @@
+# home/imagens.py
+
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Larguras máximas (em pixels) das variantes geradas para as fotos
+VARIANTES_FOTO = {
+    'pequena': 160,
+    'media': 480,
+}
+
+# Pasta dentro de MEDIA_ROOT onde as variantes ficam guardadas
+PASTA_VARIANTES = 'variantes'
+
+
+def caminho_variante(nome, variante):
+    """Ex: 'pastores/joao.jpg' -> 'variantes/media/pastores/joao.jpg'."""
+    return f"{PASTA_VARIANTES}/{variante}/{nome}"
+
+
+def gerar_variante(nome, variante):
+    """
+    Gera (uma única vez) a versão reduzida de uma imagem já enviada e devolve o seu caminho.
+    Se a imagem original não puder ser lida, devolve o próprio original.
+    """
+    destino = caminho_variante(nome, variante)
+    if default_storage.exists(destino):
+        return destino
+
+    largura = VARIANTES_FOTO[variante]
+    try:
+        with default_storage.open(nome, 'rb') as arquivo:
+            imagem = Image.open(arquivo)
+            formato = imagem.format or 'JPEG'
+            # Fotos de celular guardam a rotação no EXIF; a variante já sai na posição certa
+            imagem = ImageOps.exif_transpose(imagem)
+            imagem.thumbnail((largura, largura * 4))
+            if formato == 'JPEG' and imagem.mode not in ('RGB', 'L'):
+                imagem = imagem.convert('RGB')
+            saida = BytesIO()
+            imagem.save(saida, format=formato, optimize=True)
+    except (OSError, UnidentifiedImageError):
+        return nome
+
+    salvo = default_storage.save(destino, ContentFile(saida.getvalue()))
+    if salvo != destino:
+        # Outro worker gravou a mesma variante ao mesmo tempo e o storage acrescentou um sufixo.
+        # O caminho fica sempre o derivado do nome da foto, o mesmo que `remover_variantes` apaga.
+        default_storage.delete(salvo)
+    return destino
+
+
+def remover_variantes(nome):
+    """Apaga as variantes geradas para uma imagem (substituída ou excluída)."""
+    for variante in VARIANTES_FOTO:
+        destino = caminho_variante(nome, variante)
+        if default_storage.exists(destino):
+            default_storage.delete(destino)
+
+
+def urls_variantes(campo_imagem, request):
+    """Retorna {'pequena': url, 'media': url} absolutas para um ImageField preenchido."""
+    if not campo_imagem or not request:
+        return None
+    return {
+        variante: request.build_absolute_uri(default_storage.url(gerar_variante(campo_imagem.name, variante)))
+        for variante in VARIANTES_FOTO
+    }
@@ -0,0 +1,120 @@
+# home/leitura.py
+"""
+Caminho de leitura enxuto dos endpoints públicos de listagem (liderança,
+departamentos e agenda). Produz exatamente o mesmo JSON dos serializers do DRF,
+mas a partir de projeções values(): sem instanciar modelos nem serializers,
+agrupando as linhas filhas em uma única passada e com os textos das choices
+calculados uma vez só. A comparação com os serializers fica no comando
+`python manage.py comparar_serializacao`.
+"""
+
+from django.utils.encoding import iri_to_uri
+
+from .models import Departamento, DiaSemana, Evento, EventoEspecial, Pessoa, SecaoLideranca
+
+# Textos das choices, montados uma vez na importação
+CATEGORIAS_DISPLAY = dict(Departamento.CATEGORIAS)
+DIAS_DISPLAY = dict(DiaSemana.DIAS)
+
+
+class _MontadorUrl:
+    """Equivalente a request.build_absolute_uri(campo.url), com o esquema/host calculado uma vez."""
+
+    def __init__(self, request, modelo, campo):
+        self.request = request
+        self.storage = modelo._meta.get_field(campo).storage
+        self.raiz = request.build_absolute_uri('/')[:-1] if request else None
+
+    def __call__(self, nome):
+        if not nome or self.request is None:
+            return None
+        url = self.storage.url(nome)
+        if url.startswith('/') and not url.startswith('//') and '/./' not in url and '/../' not in url:
+            return iri_to_uri(self.raiz + url)
+        return self.request.build_absolute_uri(url)
+
+
+def lideranca(request):
+    """Mesmo formato de SecaoLiderancaSerializer(many=True): seções com as pessoas aninhadas."""
+    url_foto = _MontadorUrl(request, Pessoa, 'foto')
+    secoes = []
+    pessoas_da_secao = {}
+    for secao in SecaoLideranca.objects.values('id', 'titulo', 'descricao'):
+        secao['pessoas'] = pessoas_da_secao[secao['id']] = []
+        secoes.append(secao)
+
+    pessoas = Pessoa.objects.filter(secao_id__in=pessoas_da_secao).values_list(
+        'secao_id', 'id', 'nome', 'cargo', 'descricao', 'foto'
+    )
+    for secao_id, pk, nome, cargo, descricao, foto in pessoas:
+        pessoas_da_secao[secao_id].append({
+            'id': pk,
+            'nome': nome,
+            'cargo': cargo,
+            'descricao': descricao,
+            'foto': url_foto(foto),
+        })
+    return secoes
+
+
+def departamentos(request):
+    """Departamentos agrupados por categoria: {categoria: {'nome_display', 'lista'}}."""
+    url_imagem = _MontadorUrl(request, Departamento, 'imagem')
+    agrupados = {}
+    linhas = Departamento.objects.values_list('id', 'nome', 'descricao', 'imagem', 'categoria')
+    for pk, nome, descricao, imagem, categoria in linhas:
+        grupo = agrupados.get(categoria)
+        if grupo is None:
+            display = CATEGORIAS_DISPLAY.get(categoria, categoria)
+            grupo = agrupados[categoria] = {'nome_display': display, 'lista': []}
+        grupo['lista'].append({
+            'id': pk,
+            'nome': nome,
+            'descricao': descricao,
+            'imagem': url_imagem(imagem),
+            'categoria': categoria,
+            'categoria_display': grupo['nome_display'],
+        })
+    return agrupados
+
+
+def dias_semana():
+    """Mesmo formato de DiaSemanaSerializer(many=True): dias com os eventos aninhados."""
+    dias = []
+    eventos_do_dia = {}
+    for pk, nome, resumo in DiaSemana.objects.values_list('id', 'nome', 'resumo'):
+        eventos = eventos_do_dia[pk] = []
+        dias.append({
+            'nome': nome,
+            'nome_display': DIAS_DISPLAY.get(nome, nome),
+            'resumo': resumo,
+            'icone': DiaSemana.ICONES.get(nome),
+            'eventos': eventos,
+        })
+
+    linhas = Evento.objects.filter(dia_id__in=eventos_do_dia).values_list('dia_id', 'id', 'titulo', 'descricao', 'horario')
+    for dia_id, pk, titulo, descricao, horario in linhas:
+        eventos_do_dia[dia_id].append({
+            'id': pk,
+            'titulo': titulo,
+            'descricao': descricao,
+            'horario': horario.strftime('%H:%M'),
+        })
+    return dias
+
+
+def eventos_especiais(queryset):
+    """Mesmo formato de EventoEspecialSerializer(many=True)."""
+    return [
+        {
+            'id': pk,
+            'titulo': titulo,
+            'descricao': descricao,
+            'periodo': periodo,
+            'data_inicio': data_inicio.isoformat() if data_inicio else None,
+            'data_fim': data_fim.isoformat() if data_fim else None,
+        }
+        for pk, titulo, descricao, periodo, data_inicio, data_fim in queryset.values_list(
+            'id', 'titulo', 'descricao', 'periodo', 'data_inicio', 'data_fim'
+        )
+    ]
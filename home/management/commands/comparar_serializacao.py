@@ -0,0 +1,144 @@
+# home/management/commands/comparar_serializacao.py
+
+import statistics
+import time
+from datetime import time as horario
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from home import leitura
+from home.models import Departamento, DiaSemana, Evento, EventoEspecial, Pessoa, SecaoLideranca
+from home.serializers import (
+    DepartamentoSerializer, DiaSemanaSerializer, EventoEspecialSerializer, SecaoLiderancaSerializer,
+)
+
+
+class _Reverter(Exception):
+    pass
+
+
+def _departamentos_drf(request):
+    # Reproduz a implementação anterior de DepartamentosAPIView (um serializer por linha)
+    agrupados = {}
+    for depto in Departamento.objects.all():
+        if depto.categoria not in agrupados:
+            agrupados[depto.categoria] = {"nome_display": depto.get_categoria_display(), "lista": []}
+        serializer = DepartamentoSerializer(depto, context={'request': request})
+        agrupados[depto.categoria]['lista'].append(serializer.data)
+    return agrupados
+
+
+def _lideranca_drf(request):
+    return SecaoLiderancaSerializer(
+        SecaoLideranca.objects.prefetch_related('pessoas'), many=True, context={'request': request}
+    ).data
+
+
+def _agenda_drf(request):
+    return {
+        'dias_semana': DiaSemanaSerializer(DiaSemana.objects.prefetch_related('eventos'), many=True, context={'request': request}).data,
+        'eventos_especiais': EventoEspecialSerializer(EventoEspecial.objects.all(), many=True, context={'request': request}).data,
+    }
+
+
+def _agenda_enxuta(request):
+    return {
+        'dias_semana': leitura.dias_semana(),
+        'eventos_especiais': leitura.eventos_especiais(EventoEspecial.objects.all()),
+    }
+
+
+CASOS = [
+    ('lideranca', _lideranca_drf, leitura.lideranca),
+    ('departamentos', _departamentos_drf, leitura.departamentos),
+    ('agenda', _agenda_drf, _agenda_enxuta),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o tempo dos serializers do DRF com o caminho de leitura enxuto (home/leitura.py) "
+        "nos endpoints de liderança, departamentos e agenda. Cria dados sintéticos dentro de uma "
+        "transação que é desfeita no final (o banco não é alterado) e confere se as duas "
+        "implementações geram exatamente o mesmo JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=5000, help="Registros sintéticos por tabela (padrão: 5000).")
+        parser.add_argument('--repeticoes', type=int, default=5, help="Execuções medidas de cada implementação (padrão: 5).")
+
+    def handle(self, *args, **options):
+        if options['linhas'] < 1 or options['repeticoes'] < 1:
+            raise CommandError("--linhas e --repeticoes devem ser maiores que zero.")
+        request = RequestFactory(HTTP_HOST=urlsplit(settings.SITE_URL).netloc).get('/')
+
+        try:
+            with transaction.atomic():
+                self.criar_dados(options['linhas'])
+                for nome, drf, enxuto in CASOS:
+                    self.comparar(nome, drf, enxuto, request, options['repeticoes'])
+                raise _Reverter
+        except _Reverter:
+            pass
+
+    def criar_dados(self, linhas):
+        categorias = [chave for chave, _ in Departamento.CATEGORIAS]
+        Departamento.objects.bulk_create(
+            Departamento(
+                nome=f"Departamento {i}", descricao="Descrição " * 10, imagem=f"departamentos/{i}.jpg",
+                categoria=categorias[i % len(categorias)], ordem=i,
+            )
+            for i in range(linhas)
+        )
+        secoes = SecaoLideranca.objects.bulk_create(
+            SecaoLideranca(titulo=f"Seção {i}", descricao="Texto", ordem=i) for i in range(max(1, linhas // 50))
+        )
+        Pessoa.objects.bulk_create(
+            Pessoa(
+                secao=secoes[i % len(secoes)], nome=f"Pessoa {i}", cargo="Diácono",
+                descricao="Descrição", foto=f"lideranca/{i}.jpg", ordem=i,
+            )
+            for i in range(linhas)
+        )
+        existentes = set(DiaSemana.objects.values_list('nome', flat=True))
+        DiaSemana.objects.bulk_create(
+            DiaSemana(nome=numero, resumo="Resumo") for numero, _ in DiaSemana.DIAS if numero not in existentes
+        )
+        dias = list(DiaSemana.objects.all())
+        Evento.objects.bulk_create(
+            Evento(dia=dias[i % len(dias)], titulo=f"Evento {i}", descricao="", horario=horario(i % 24, i % 60))
+            for i in range(linhas)
+        )
+        EventoEspecial.objects.bulk_create(
+            EventoEspecial(titulo=f"Especial {i}", descricao="Descrição", periodo="10 a 12 de Outubro")
+            for i in range(max(1, linhas // 10))
+        )
+
+    def medir(self, funcao, request, repeticoes):
+        funcao(request)  # aquecimento
+        tempos = []
+        for _ in range(repeticoes):
+            reset_queries()
+            inicio = time.perf_counter()
+            resultado = funcao(request)
+            tempos.append(time.perf_counter() - inicio)
+        with CaptureQueriesContext(connection) as consultas:
+            funcao(request)
+        return resultado, statistics.median(tempos), len(consultas.captured_queries)
+
+    def comparar(self, nome, drf, enxuto, request, repeticoes):
+        dados_drf, tempo_drf, consultas_drf = self.medir(drf, request, repeticoes)
+        dados_enxuto, tempo_enxuto, consultas_enxuto = self.medir(enxuto, request, repeticoes)
+        # ReturnList/ReturnDict e OrderedDict comparam igual a list/dict com o mesmo conteúdo
+        if dados_drf != dados_enxuto:
+            raise CommandError(f"{nome}: o caminho enxuto gerou um JSON diferente do serializer do DRF.")
+        self.stdout.write(
+            f"{nome:<14} DRF {tempo_drf * 1000:8.1f} ms ({consultas_drf} consultas) | "
+            f"enxuto {tempo_enxuto * 1000:8.1f} ms ({consultas_enxuto} consultas) | "
+            f"{tempo_drf / tempo_enxuto:5.1f}x"
+        )
@@ -0,0 +1,24 @@
+# home/management/commands/gerar_sprite_icones.py
+
+from django.core.management.base import BaseCommand
+
+from home import icones
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera o sprite (um único PNG) com os ícones da agenda, usado pelo seletor de ícones do admin. "
+        "Rode antes do collectstatic. Se a pasta tiver ícones SVG, o sprite não é gerado e o "
+        "seletor continua usando um arquivo por ícone."
+    )
+
+    def handle(self, *args, **options):
+        quantidade = icones.gerar_sprite()
+        if quantidade is None:
+            self.stdout.write(self.style.WARNING(
+                f"Sprite não gerado: nenhum ícone raster encontrado em static/{icones.PASTA_ICONES}/ (ou há ícones SVG)."
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Sprite com {quantidade} ícone(s) gerado em static/{icones.SPRITE_ICONES}"
+        ))
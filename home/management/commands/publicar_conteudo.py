@@ -0,0 +1,158 @@
+# home/management/commands/publicar_conteudo.py
+
+import json
+import os
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from home.models import Devocional
+from home.serializers import DevocionalSerializer
+
+# Endpoints públicos publicados como arquivo: (nome do arquivo, nome da rota da API).
+# Ficam de fora os que dependem do dia (agenda/proximos) e os que contam leituras
+# (a devocional recente é gerada direto pelo serializer em `publicar_devocionais`).
+ENDPOINTS_PUBLICOS = [
+    ('configuracao', 'api-configuracao'),
+    ('lideranca', 'api-lideranca'),
+    ('departamentos', 'api-departamentos'),
+    ('agenda', 'api-agenda'),
+    ('historia', 'api-historia'),
+]
+
+# Subpasta de STATICFILES_DIRS[0] onde os arquivos são gerados
+PASTA_PUBLICACAO = 'publico'
+
+
+class Command(BaseCommand):
+    help = (
+        "Publica o JSON dos endpoints públicos (configuração, agenda, departamentos, "
+        "liderança, história e devocionais paginadas) como arquivos estáticos em static/publico/. "
+        "O collectstatic gera as cópias versionadas (hash no nome) e pré-comprimidas "
+        "(.gz/.br) que o WhiteNoise serve sem executar nenhuma view do Django. "
+        "Rode no build.sh e depois de edições no admin (os arquivos novos passam a ser "
+        "servidos quando os workers forem reiniciados)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default=settings.SITE_URL,
+            help="URL pública do backend, usada nas URLs absolutas das imagens (padrão: settings.SITE_URL).",
+        )
+        parser.add_argument(
+            '--por-pagina', type=int, default=10,
+            help="Quantidade de devocionais por página (padrão: 10).",
+        )
+        parser.add_argument(
+            '--sem-collectstatic', action='store_true',
+            help="Apenas gera os arquivos, sem rodar o collectstatic (útil quando o build já roda em seguida).",
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['base_url'])
+        if not url.netloc:
+            raise CommandError("Informe uma --base-url completa, ex: https://igreja-backend.onrender.com")
+        self.fabrica = RequestFactory(HTTP_HOST=url.netloc)
+        self.seguro = url.scheme == 'https'
+        self.base_url = f"{url.scheme}://{url.netloc}"
+
+        self.pasta = os.path.join(settings.STATICFILES_DIRS[0], PASTA_PUBLICACAO)
+        os.makedirs(self.pasta, exist_ok=True)
+        self.indice = {}
+
+        for nome, rota in ENDPOINTS_PUBLICOS:
+            self.publicar(f"{nome}.json", self.renderizar_endpoint(rota))
+
+        self.publicar_devocionais(options['por_pagina'])
+
+        # O índice aponta para os nomes versionados, que podem ficar em cache para sempre
+        indice = {
+            'gerado_em': timezone.now(),
+            'arquivos': self.indice,
+        }
+        self.escrever('indice.json', json.dumps(indice, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8'))
+
+        if not options['sem_collectstatic']:
+            call_command('collectstatic', interactive=False, verbosity=0)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(self.indice)} arquivo(s) publicado(s) em {settings.STATIC_URL}{PASTA_PUBLICACAO}/"
+        ))
+
+    def renderizar_endpoint(self, rota):
+        """Executa a view da API como se fosse uma requisição real e devolve o corpo JSON."""
+        caminho = reverse(rota)
+        request = self.fabrica.get(caminho, secure=self.seguro, HTTP_ACCEPT='application/json')
+        response = resolve(caminho).func(request)
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code != 200:
+            raise CommandError(f"O endpoint {caminho} respondeu com status {response.status_code}.")
+        return response.content
+
+    def publicar_devocionais(self, por_pagina):
+        """
+        Gera a devocional recente e as páginas de devocionais no mesmo formato da API
+        (a paginação no formato do DRF: count/next/previous/results).
+        """
+        # Contexto com um request apenas para que as URLs das imagens saiam absolutas
+        contexto = {'request': self.fabrica.get('/', secure=self.seguro)}
+        devocionais = list(Devocional.objects.publicados().order_by('-data_publicacao'))
+
+        # Pelo serializer e não pela view, que contaria a publicação como uma leitura
+        recente = DevocionalSerializer(devocionais[0], context=contexto).data if devocionais else {}
+        self.publicar(
+            "devocional-recente.json",
+            json.dumps(recente, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8'),
+        )
+
+        # Remove as páginas da publicação anterior (o total de páginas pode ter diminuído)
+        pasta_devocionais = os.path.join(self.pasta, 'devocionais')
+        if os.path.isdir(pasta_devocionais):
+            for nome in os.listdir(pasta_devocionais):
+                if nome.startswith('pagina-'):
+                    os.remove(os.path.join(pasta_devocionais, nome))
+
+        total = len(devocionais)
+        paginas = max(1, -(-total // por_pagina))
+
+        for numero in range(1, paginas + 1):
+            inicio = (numero - 1) * por_pagina
+            pagina = devocionais[inicio:inicio + por_pagina]
+            dados = {
+                'count': total,
+                'next': self.url_pagina(numero + 1) if numero < paginas else None,
+                'previous': self.url_pagina(numero - 1) if numero > 1 else None,
+                'results': DevocionalSerializer(pagina, many=True, context=contexto).data,
+            }
+            self.publicar(
+                f"devocionais/pagina-{numero}.json",
+                json.dumps(dados, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8'),
+            )
+
+    def url_pagina(self, numero):
+        return f"{self.base_url}{settings.STATIC_URL}{PASTA_PUBLICACAO}/devocionais/pagina-{numero}.json"
+
+    def publicar(self, nome, conteudo):
+        """Grava o arquivo e registra no índice a URL do nome versionado (com hash)."""
+        self.escrever(nome, conteudo)
+        nome_estatico = f"{PASTA_PUBLICACAO}/{nome}"
+        versionado = staticfiles_storage.hashed_name(nome_estatico, ContentFile(conteudo))
+        self.indice[nome] = f"{self.base_url}{settings.STATIC_URL}{versionado}"
+
+    def escrever(self, nome, conteudo):
+        caminho = os.path.join(self.pasta, nome)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # Escreve em um arquivo temporário e troca no final, para nunca expor um JSON pela metade
+        temporario = f"{caminho}.tmp"
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, caminho)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='devocional',
+            name='data_publicacao',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, help_text='A devocional só aparece no site a partir desta data e hora. Use uma data futura para agendar.', verbose_name='Data de Publicação'),
+        ),
+    ]
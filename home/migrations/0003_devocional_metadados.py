@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:26
+
+from django.db import migrations, models
+
+from home.texto import calcular_metadados
+
+TAMANHO_LOTE = 500
+
+
+def preencher_metadados(apps, schema_editor):
+    """Calcula os campos derivados das devocionais já existentes, em lotes."""
+    Devocional = apps.get_model('home', 'Devocional')
+    campos = ['resumo', 'total_palavras', 'tempo_leitura', 'conteudo_html']
+    lote = []
+    for devocional in Devocional.objects.only('id', 'conteudo').iterator(chunk_size=TAMANHO_LOTE):
+        for campo, valor in calcular_metadados(devocional.conteudo).items():
+            setattr(devocional, campo, valor)
+        lote.append(devocional)
+        if len(lote) >= TAMANHO_LOTE:
+            Devocional.objects.bulk_update(lote, campos)
+            lote = []
+    if lote:
+        Devocional.objects.bulk_update(lote, campos)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_devocional_agendamento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='devocional',
+            name='conteudo_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Conteúdo (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='devocional',
+            name='resumo',
+            field=models.CharField(blank=True, editable=False, max_length=400, verbose_name='Resumo'),
+        ),
+        migrations.AddField(
+            model_name='devocional',
+            name='tempo_leitura',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name='Tempo de Leitura (min)'),
+        ),
+        migrations.AddField(
+            model_name='devocional',
+            name='total_palavras',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Total de Palavras'),
+        ),
+        migrations.RunPython(preencher_metadados, migrations.RunPython.noop),
+    ]
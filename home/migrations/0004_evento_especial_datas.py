@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:27
+
+from django.db import migrations, models
+from django.utils import timezone
+
+from home.texto import interpretar_periodo
+
+TAMANHO_LOTE = 500
+
+
+def preencher_datas(apps, schema_editor):
+    """Interpreta o texto livre de 'periodo' dos eventos existentes, em lotes."""
+    EventoEspecial = apps.get_model('home', 'EventoEspecial')
+    hoje = timezone.localdate()
+    lote = []
+    for evento in EventoEspecial.objects.only('id', 'periodo').iterator(chunk_size=TAMANHO_LOTE):
+        evento.data_inicio, evento.data_fim = interpretar_periodo(evento.periodo, hoje)
+        if evento.data_inicio is None:
+            continue
+        lote.append(evento)
+        if len(lote) >= TAMANHO_LOTE:
+            EventoEspecial.objects.bulk_update(lote, ['data_inicio', 'data_fim'])
+            lote = []
+    if lote:
+        EventoEspecial.objects.bulk_update(lote, ['data_inicio', 'data_fim'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0003_devocional_metadados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventoespecial',
+            name='data_fim',
+            field=models.DateField(blank=True, help_text='Deixe em branco para eventos de um só dia. O evento sai da agenda depois desta data.', null=True, verbose_name='Data de Término'),
+        ),
+        migrations.AddField(
+            model_name='eventoespecial',
+            name='data_inicio',
+            field=models.DateField(blank=True, help_text='Se ficar em branco, é preenchida a partir do texto do período.', null=True, verbose_name='Data de Início'),
+        ),
+        migrations.AlterField(
+            model_name='eventoespecial',
+            name='periodo',
+            field=models.CharField(blank=True, help_text='Texto exibido no site. Se ficar em branco, é gerado a partir das datas.', max_length=50, verbose_name='Período (ex: 15-17 Julho)'),
+        ),
+        migrations.AddIndex(
+            model_name='eventoespecial',
+            index=models.Index(fields=['data_fim', 'data_inicio'], name='home_evesp_fim_inicio_idx'),
+        ),
+        migrations.RunPython(preencher_datas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0005_sincronizacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='devocional',
+            name='visualizacoes',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Visualizações'),
+        ),
+    ]
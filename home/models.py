@@ -1,8 +1,9 @@
 # Create your models here.
 from django.db import models
 from django.conf import settings
-import os
 from django.utils import timezone
+from . import cache as home_cache
+from .texto import calcular_metadados, formatar_periodo, interpretar_periodo
 
 # Opções de imagens padrão
 OPCOES_IMAGEM_PADRAO = [
@@ -14,6 +15,42 @@ OPCOES_IMAGEM_PADRAO = [
     ('personalizada', 'Imagem Personalizada (Upload)'),
 ]
 
+class Sincronizavel(models.Model):
+    """
+    Base dos modelos públicos que participam da sincronização incremental (api/changes/).
+    Guarda a data da última alteração; as exclusões ficam em RegistroExclusao.
+    """
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Atualizado em")
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # Campos auto_now só são gravados quando fazem parte do update_fields
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'atualizado_em'}
+        return super().save(*args, **kwargs)
+
+
+class RegistroExclusao(models.Model):
+    """
+    Marca (tombstone) deixada quando um registro público é excluído, para que os
+    clientes da sincronização incremental saibam que devem removê-lo.
+    """
+    modelo = models.CharField(max_length=50, verbose_name="Coleção")
+    objeto_id = models.BigIntegerField(verbose_name="ID do Registro")
+    excluido_em = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Excluído em")
+
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id}"
+
+    class Meta:
+        verbose_name = "Registro de Exclusão"
+        verbose_name_plural = "Registros de Exclusão"
+        ordering = ['excluido_em']
+
+
 class ConfiguracaoSite(models.Model):
     link_youtube = models.URLField(
         max_length=255, 
@@ -52,9 +89,31 @@ class ConfiguracaoSite(models.Model):
     def __str__(self):
         return f"Configurações do Site - Atualizado em {self.data_atualizacao.strftime('%d/%m/%Y %H:%M')}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Guarda a imagem carregada do banco, para o save não precisar buscá-la de novo
+        instancia._imagem_original = (instancia.__dict__.get('tipo_imagem'), instancia.__dict__.get('imagem_personalizada'))
+        return instancia
+
+    @classmethod
+    def atual(cls):
+        """
+        Retorna a configuração do site (ou None) memorizada neste worker.
+        Cada chamada só confere a versão no cache compartilhado; o banco é lido
+        de novo apenas quando algum worker salvar a configuração.
+        """
+        global _configuracao_memorizada
+        versao = home_cache.versao(NAMESPACE_CONFIGURACAO)
+        versao_memorizada, instancia = _configuracao_memorizada
+        if versao_memorizada != versao:
+            instancia = cls.objects.first()
+            _configuracao_memorizada = (versao, instancia)
+        return instancia
+
     def save(self, *args, **kwargs):
         # Garantir que só exista uma instância deste modelo
-        if ConfiguracaoSite.objects.exists() and not self.pk:
+        if not self.pk and ConfiguracaoSite.objects.exists():
             # Se já existe uma configuração e estamos tentando criar outra,
             # atualizamos a existente em vez de criar uma nova
             raise ValueError("Já existe uma configuração. Edite a existente em vez de criar uma nova.")
@@ -62,14 +121,16 @@ class ConfiguracaoSite(models.Model):
         # Se o tipo de imagem não for personalizada, limpar o campo de imagem personalizada
         if self.tipo_imagem != 'personalizada':
             # Se havia uma imagem personalizada antes, podemos excluí-la para economizar espaço
-            if self.pk:
-                old_instance = ConfiguracaoSite.objects.get(pk=self.pk)
-                if old_instance.imagem_personalizada and old_instance.tipo_imagem == 'personalizada':
-                    if os.path.isfile(old_instance.imagem_personalizada.path):
-                        os.remove(old_instance.imagem_personalizada.path)
+            tipo_anterior, imagem_anterior = getattr(self, '_imagem_original', (None, None))
+            if imagem_anterior and tipo_anterior == 'personalizada':
+                storage = self.imagem_personalizada.storage
+                if storage.exists(str(imagem_anterior)):
+                    storage.delete(str(imagem_anterior))
             self.imagem_personalizada = None
             
-        return super().save(*args, **kwargs)
+        resultado = super().save(*args, **kwargs)
+        self._imagem_original = (self.tipo_imagem, self.imagem_personalizada.name or None)
+        return resultado
     
     def get_imagem_url(self):
         """Retorna a URL da imagem a ser exibida, seja padrão ou personalizada"""
@@ -80,17 +141,69 @@ class ConfiguracaoSite(models.Model):
             return f"{settings.STATIC_URL}fotos/{self.tipo_imagem}.jpeg"
 
 
-class Devocional(models.Model):
+# Namespace de cache cuja versão indica aos workers que a configuração mudou (ver home/signals.py)
+NAMESPACE_CONFIGURACAO = 'configuracao'
+
+# (versão, instância) da configuração memorizada neste worker
+_configuracao_memorizada = (None, None)
+
+
+class DevocionalQuerySet(models.QuerySet):
+    def publicados(self, momento=None):
+        """Apenas as devocionais cuja data de publicação já chegou (as futuras ficam agendadas)."""
+        return self.filter(data_publicacao__lte=momento or timezone.now())
+
+    def proxima_publicacao(self, momento=None):
+        """Data da próxima devocional agendada, ou None se não houver nenhuma."""
+        return (
+            self.filter(data_publicacao__gt=momento or timezone.now())
+            .order_by('data_publicacao')
+            .values_list('data_publicacao', flat=True)
+            .first()
+        )
+
+
+class Devocional(Sincronizavel):
     titulo = models.CharField(max_length=200, verbose_name="Título")
     subtitulo = models.CharField(max_length=255, blank=True, null=True, verbose_name="Subtítulo")
     autor = models.CharField(max_length=100, verbose_name="Autor (Assinatura)")
     imagem = models.ImageField(upload_to='devocionais/', verbose_name="Imagem Ilustrativa")
     conteudo = models.TextField(verbose_name="Conteúdo")
-    data_publicacao = models.DateTimeField(default=timezone.now, verbose_name="Data de Publicação")
+    # --- CAMPOS DERIVADOS (calculados no save a partir do conteúdo) ---
+    resumo = models.CharField(max_length=400, blank=True, editable=False, verbose_name="Resumo")
+    total_palavras = models.PositiveIntegerField(default=0, editable=False, verbose_name="Total de Palavras")
+    tempo_leitura = models.PositiveSmallIntegerField(default=1, editable=False, verbose_name="Tempo de Leitura (min)")
+    conteudo_html = models.TextField(blank=True, editable=False, verbose_name="Conteúdo (HTML)")
+
+    # Contador de leituras, gravado em lote por home/visualizacoes.py
+    visualizacoes = models.PositiveIntegerField(default=0, editable=False, db_index=True, verbose_name="Visualizações")
+
+    data_publicacao = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name="Data de Publicação",
+        help_text="A devocional só aparece no site a partir desta data e hora. Use uma data futura para agendar."
+    )
+
+    objects = DevocionalQuerySet.as_manager()
 
     def __str__(self):
         return self.titulo
 
+    @property
+    def publicado(self):
+        return self.data_publicacao <= timezone.now()
+
+    def save(self, *args, **kwargs):
+        # Pré-calcula resumo, tempo de leitura e HTML uma única vez, na gravação
+        metadados = calcular_metadados(self.conteudo)
+        for campo, valor in metadados.items():
+            setattr(self, campo, valor)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'conteudo' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(metadados)
+        return super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "Devocional"
         verbose_name_plural = "Devocionais"
@@ -98,7 +211,7 @@ class Devocional(models.Model):
 
 
 
-class Departamento(models.Model):
+class Departamento(Sincronizavel):
     CATEGORIAS = [
         ("TREINAMENTO", "Ministério de Treinamento e Crescimento Cristão"),
         ("MUSICA", "Ministério de Música"),
@@ -120,7 +233,7 @@ class Departamento(models.Model):
         ordering = ["categoria", "ordem"] # Ordena por ministério e depois pela ordem definida
 
 # --- ADIÇÕES NO MODELO PARA LIDERANÇA ---
-class SecaoLideranca(models.Model):
+class SecaoLideranca(Sincronizavel):
     titulo = models.CharField(max_length=200, verbose_name="Título da Seção")
     descricao = models.TextField(blank=True, verbose_name="Texto de Descrição")
     ordem = models.PositiveIntegerField(default=0, help_text="Define a ordem de exibição na página (menor número aparece primeiro).")
@@ -134,7 +247,7 @@ class SecaoLideranca(models.Model):
         ordering = ['ordem']
 
 
-class Pessoa(models.Model):
+class Pessoa(Sincronizavel):
     secao = models.ForeignKey(SecaoLideranca, on_delete=models.CASCADE, related_name='pessoas')
     nome = models.CharField(max_length=100)
     cargo = models.CharField(max_length=100, verbose_name="Cargo ou Função")
@@ -151,12 +264,17 @@ class Pessoa(models.Model):
         ordering = ['ordem']
 
 
-class DiaSemana(models.Model):
+class DiaSemana(Sincronizavel):
     DIAS = [
         (0, 'Domingo'), (1, 'Segunda-feira'), (2, 'Terça-feira'),
         (3, 'Quarta-feira'), (4, 'Quinta-feira'), (5, 'Sexta-feira'),
         (6, 'Sábado')
     ]
+    # Nome do arquivo do ícone fixo de cada dia
+    ICONES = {
+        0: 'domingo', 1: 'segunda', 2: 'terca', 3: 'quarta',
+        4: 'quinta', 5: 'sexta', 6: 'sabado',
+    }
     
     nome = models.IntegerField(choices=DIAS, unique=True, verbose_name="Dia da Semana")
     resumo = models.CharField(max_length=100, verbose_name="Resumo (ex: Dia de celebração)")
@@ -170,7 +288,7 @@ class DiaSemana(models.Model):
         ordering = ['nome']
 
 
-class Evento(models.Model):
+class Evento(Sincronizavel):
     dia = models.ForeignKey(DiaSemana, on_delete=models.CASCADE, related_name='eventos')
     titulo = models.CharField(max_length=100)
     descricao = models.TextField(blank=True)
@@ -185,21 +303,80 @@ class Evento(models.Model):
         ordering = ['horario']
 
 
-class EventoEspecial(models.Model):
+class EventoEspecialQuerySet(models.QuerySet):
+    def vigentes(self, hoje=None):
+        """
+        Eventos que ainda não terminaram, em ordem cronológica. Eventos sem data
+        (período que não pôde ser interpretado) continuam aparecendo, no final.
+        """
+        hoje = hoje or timezone.localdate()
+        return (
+            self.filter(models.Q(data_fim__gte=hoje) | models.Q(data_fim__isnull=True))
+            .order_by(models.F('data_inicio').asc(nulls_last=True), 'ordem')
+        )
+
+
+class EventoEspecial(Sincronizavel):
     titulo = models.CharField(max_length=100)
     descricao = models.TextField()
-    periodo = models.CharField(max_length=50, verbose_name="Período (ex: 15-17 Julho)")
+    periodo = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name="Período (ex: 15-17 Julho)",
+        help_text="Texto exibido no site. Se ficar em branco, é gerado a partir das datas."
+    )
+    data_inicio = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name="Data de Início",
+        help_text="Se ficar em branco, é preenchida a partir do texto do período."
+    )
+    data_fim = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name="Data de Término",
+        help_text="Deixe em branco para eventos de um só dia. O evento sai da agenda depois desta data."
+    )
     ordem = models.PositiveIntegerField(default=0)
 
+    objects = EventoEspecialQuerySet.as_manager()
+
     def __str__(self):
         return self.titulo
 
+    def save(self, *args, **kwargs):
+        # Mantém o texto do período e as datas estruturadas coerentes entre si:
+        # quando só um dos dois foi editado, o outro é refeito a partir dele
+        hoje = timezone.localdate()
+        periodo_alterado = datas_alteradas = False
+        anterior = None
+        if self.pk:
+            anterior = EventoEspecial.objects.filter(pk=self.pk).values('periodo', 'data_inicio', 'data_fim').first()
+        if anterior:
+            periodo_alterado = anterior['periodo'] != self.periodo
+            datas_alteradas = (anterior['data_inicio'], anterior['data_fim']) != (self.data_inicio, self.data_fim)
+
+        if self.periodo and (self.data_inicio is None or (periodo_alterado and not datas_alteradas)):
+            self.data_inicio, self.data_fim = interpretar_periodo(self.periodo, hoje)
+        if self.data_inicio and (self.data_fim is None or self.data_fim < self.data_inicio):
+            self.data_fim = self.data_inicio
+        if self.data_inicio and datas_alteradas and not periodo_alterado:
+            # Só reescreve o texto se ele descrevia datas (e não um texto livre como "Férias")
+            if interpretar_periodo(self.periodo, hoje) != (None, None):
+                self.periodo = formatar_periodo(self.data_inicio, self.data_fim)
+        if not self.periodo and self.data_inicio:
+            self.periodo = formatar_periodo(self.data_inicio, self.data_fim)
+        return super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "Evento Especial"
         verbose_name_plural = "Eventos Especiais"
         ordering = ['ordem']
+        indexes = [
+            models.Index(fields=['data_fim', 'data_inicio'], name='home_evesp_fim_inicio_idx'),
+        ]
 
-class Pastor(models.Model):
+class Pastor(Sincronizavel):
     nome = models.CharField(max_length=200, verbose_name="Nome do Pastor")
     periodo = models.CharField(max_length=100, verbose_name="Período no Pastorado")
     descricao_curta = models.CharField(max_length=255, blank=True, verbose_name="Descrição Curta")
@@ -215,7 +392,7 @@ class Pastor(models.Model):
         ordering = ['ordem']
 
 
-class Memorial(models.Model):
+class Memorial(Sincronizavel):
     nome = models.CharField(max_length=200, verbose_name="Nome da Pessoa")
     foto = models.ImageField(upload_to='memorial/', blank=True, null=True, verbose_name="Foto")
     ordem = models.PositiveIntegerField(default=0, help_text="Define a ordem de exibição (menor número aparece primeiro).")
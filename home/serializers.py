@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .imagens import urls_variantes
 # 1. Importe os modelos da Agenda
 from .models import (
     ConfiguracaoSite, Devocional, SecaoLideranca, Pessoa, Departamento, 
@@ -21,13 +22,45 @@ class DevocionalSerializer(serializers.ModelSerializer):
     imagem = serializers.SerializerMethodField()
     class Meta:
         model = Devocional
-        fields = ['id', 'titulo', 'subtitulo', 'autor', 'imagem', 'conteudo', 'data_publicacao']
+        fields = [
+            'id', 'titulo', 'subtitulo', 'autor', 'imagem', 'conteudo',
+            'resumo', 'tempo_leitura', 'data_publicacao'
+        ]
     def get_imagem(self, obj):
         request = self.context.get('request')
         if obj.imagem and request:
             return request.build_absolute_uri(obj.imagem.url)
         return None
 
+class DevocionalHtmlSerializer(DevocionalSerializer):
+    """
+    Mesma devocional, mas com o conteúdo já convertido em HTML (conteudo_html)
+    no lugar do texto puro. Usado quando o cliente pede ?html=1.
+    """
+    class Meta(DevocionalSerializer.Meta):
+        fields = [
+            'conteudo_html' if campo == 'conteudo' else campo
+            for campo in DevocionalSerializer.Meta.fields
+        ]
+
+class DevocionalResumoSerializer(DevocionalSerializer):
+    """
+    Versão enxuta para listagens: usa apenas as colunas pequenas pré-calculadas,
+    sem carregar o conteúdo completo.
+    """
+    # Colunas necessárias no .only() do queryset
+    campos_banco = ['id', 'titulo', 'subtitulo', 'autor', 'imagem', 'resumo', 'tempo_leitura', 'data_publicacao']
+
+    class Meta(DevocionalSerializer.Meta):
+        fields = ['id', 'titulo', 'subtitulo', 'autor', 'imagem', 'resumo', 'tempo_leitura', 'data_publicacao']
+
+class DevocionalRankingSerializer(DevocionalResumoSerializer):
+    """Prévia da devocional com o total de leituras, para o ranking de mais lidas."""
+    campos_banco = DevocionalResumoSerializer.campos_banco + ['visualizacoes']
+
+    class Meta(DevocionalResumoSerializer.Meta):
+        fields = DevocionalResumoSerializer.Meta.fields + ['visualizacoes']
+
 class PessoaSerializer(serializers.ModelSerializer):
     foto = serializers.SerializerMethodField()
     class Meta:
@@ -70,7 +103,7 @@ class EventoSerializer(serializers.ModelSerializer):
 class EventoEspecialSerializer(serializers.ModelSerializer):
     class Meta:
         model = EventoEspecial
-        fields = ['id', 'titulo', 'descricao', 'periodo']
+        fields = ['id', 'titulo', 'descricao', 'periodo', 'data_inicio', 'data_fim']
 
 class DiaSemanaSerializer(serializers.ModelSerializer):
     # Aninha os eventos dentro de cada dia
@@ -85,15 +118,36 @@ class DiaSemanaSerializer(serializers.ModelSerializer):
         fields = ['nome', 'nome_display', 'resumo', 'icone', 'eventos']
 
     def get_icone(self, obj):
-        # Mapeia o número do dia para o nome do arquivo do ícone
-        nomes_icones = {
-            0: 'domingo',
-            1: 'segunda',
-            2: 'terca',
-            3: 'quarta',
-            4: 'quinta',
-            5: 'sexta',
-            6: 'sabado'
-        }
         # Retorna o nome do ícone (ex: 'domingo'), ou None se não encontrar
-        return nomes_icones.get(obj.nome)
\ No newline at end of file
+        return DiaSemana.ICONES.get(obj.nome)
+
+
+# --- SERIALIZERS DA PÁGINA DE HISTÓRIA ---
+
+class PastorSerializer(serializers.ModelSerializer):
+    foto = serializers.SerializerMethodField()
+    foto_variantes = serializers.SerializerMethodField()
+    class Meta:
+        model = Pastor
+        fields = ['id', 'nome', 'periodo', 'descricao_curta', 'foto', 'foto_variantes']
+    def get_foto(self, obj):
+        request = self.context.get('request')
+        if obj.foto and request:
+            return request.build_absolute_uri(obj.foto.url)
+        return None
+    def get_foto_variantes(self, obj):
+        return urls_variantes(obj.foto, self.context.get('request'))
+
+class MemorialSerializer(serializers.ModelSerializer):
+    foto = serializers.SerializerMethodField()
+    foto_variantes = serializers.SerializerMethodField()
+    class Meta:
+        model = Memorial
+        fields = ['id', 'nome', 'foto', 'foto_variantes']
+    def get_foto(self, obj):
+        request = self.context.get('request')
+        if obj.foto and request:
+            return request.build_absolute_uri(obj.foto.url)
+        return None
+    def get_foto_variantes(self, obj):
+        return urls_variantes(obj.foto, self.context.get('request'))
@@ -0,0 +1,83 @@
+# home/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache as home_cache
+from .imagens import remover_variantes
+from .models import NAMESPACE_CONFIGURACAO, ConfiguracaoSite, DiaSemana, Devocional, Evento, EventoEspecial, Memorial, Pastor, RegistroExclusao
+from .sincronizacao import COLECAO_DO_MODELO
+
+
+@receiver([post_save, post_delete], sender=ConfiguracaoSite)
+def invalidar_configuracao(sender, **kwargs):
+    """
+    Avisa todos os workers que a configuração memorizada ficou velha. Só depois do
+    commit: antes disso outro worker poderia reler (e memorizar) os dados antigos.
+    """
+    transaction.on_commit(lambda: home_cache.invalidar(NAMESPACE_CONFIGURACAO))
+
+
+@receiver([post_save, post_delete], sender=DiaSemana)
+@receiver([post_save, post_delete], sender=Evento)
+@receiver([post_save, post_delete], sender=EventoEspecial)
+def invalidar_cache_agenda(sender, **kwargs):
+    """Qualquer alteração na agenda descarta o índice de ocorrências e o feed .ics."""
+    home_cache.invalidar('agenda')
+
+
+@receiver([post_save, post_delete], sender=Devocional)
+def invalidar_cache_devocionais(sender, **kwargs):
+    """Novas devocionais, edições e reagendamentos descartam as respostas em cache."""
+    home_cache.invalidar('devocionais')
+
+
+@receiver([post_save, post_delete], sender=Pastor)
+@receiver([post_save, post_delete], sender=Memorial)
+def invalidar_cache_historia(sender, **kwargs):
+    home_cache.invalidar('historia')
+
+
+@receiver(pre_save, sender=Pastor)
+@receiver(pre_save, sender=Memorial)
+def anotar_variantes_obsoletas(sender, instance, **kwargs):
+    """Guarda os nomes das fotos cujas variantes ficam velhas com este save."""
+    obsoletas = set()
+    if instance.foto and not instance.foto._committed:
+        # Foto nova: o storage pode reaproveitar o nome de um arquivo já apagado
+        instance._foto_enviada = True
+    if instance.pk:
+        anterior = sender.objects.filter(pk=instance.pk).values_list('foto', flat=True).first()
+        if anterior and anterior != instance.foto.name:
+            obsoletas.add(anterior)
+    instance._variantes_obsoletas = obsoletas
+
+
+@receiver(post_save, sender=Pastor)
+@receiver(post_save, sender=Memorial)
+def remover_variantes_substituidas(sender, instance, **kwargs):
+    obsoletas = getattr(instance, '_variantes_obsoletas', set())
+    if getattr(instance, '_foto_enviada', False):
+        obsoletas.add(instance.foto.name)
+        instance._foto_enviada = False
+    instance._variantes_obsoletas = set()
+    for nome in obsoletas:
+        transaction.on_commit(lambda nome=nome: remover_variantes(nome))
+
+
+@receiver(post_delete, sender=Pastor)
+@receiver(post_delete, sender=Memorial)
+def remover_variantes_excluidas(sender, instance, **kwargs):
+    if instance.foto:
+        nome = instance.foto.name
+        transaction.on_commit(lambda: remover_variantes(nome))
+
+
+def registrar_exclusao(sender, instance, **kwargs):
+    """Deixa a marca de exclusão usada pela sincronização incremental (api/changes/)."""
+    RegistroExclusao.objects.create(modelo=COLECAO_DO_MODELO[sender], objeto_id=instance.pk)
+
+
+for _modelo in COLECAO_DO_MODELO:
+    post_delete.connect(registrar_exclusao, sender=_modelo, dispatch_uid=f'registrar_exclusao_{_modelo.__name__}')
@@ -0,0 +1,159 @@
+# home/sincronizacao.py
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import (
+    ConfiguracaoSite, Departamento, Devocional, DiaSemana, Evento, EventoEspecial,
+    Memorial, Pastor, Pessoa, RegistroExclusao, SecaoLideranca,
+)
+from .serializers import (
+    ConfiguracaoSiteSerializer, DepartamentoSerializer, DevocionalSerializer, EventoEspecialSerializer,
+    EventoSerializer, MemorialSerializer, PastorSerializer, PessoaSerializer,
+)
+
+# Alterações mais recentes que isso ficam para a próxima sincronização: dá tempo
+# para transações ainda abertas confirmarem e evita que um registro seja perdido.
+MARGEM_SEGURANCA = timedelta(seconds=5)
+
+# Por quanto tempo as exclusões são garantidas. Clientes com um token mais antigo
+# recebem uma carga completa.
+RETENCAO_EXCLUSOES = timedelta(days=90)
+
+# As marcas de exclusão vencidas são apagadas no máximo uma vez por período
+INTERVALO_LIMPEZA = 60 * 60 * 24
+
+
+# --- SERIALIZERS "PLANOS" (sem aninhamento, com as chaves estrangeiras) ---
+
+class SecaoLiderancaSincronizacaoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SecaoLideranca
+        fields = ['id', 'titulo', 'descricao', 'ordem']
+
+class PessoaSincronizacaoSerializer(PessoaSerializer):
+    class Meta(PessoaSerializer.Meta):
+        fields = PessoaSerializer.Meta.fields + ['secao', 'ordem']
+
+class DiaSemanaSincronizacaoSerializer(serializers.ModelSerializer):
+    nome_display = serializers.CharField(source='get_nome_display', read_only=True)
+    class Meta:
+        model = DiaSemana
+        fields = ['id', 'nome', 'nome_display', 'resumo']
+
+class EventoSincronizacaoSerializer(EventoSerializer):
+    class Meta(EventoSerializer.Meta):
+        fields = EventoSerializer.Meta.fields + ['dia']
+
+
+# Coleções sincronizadas: (chave na resposta, modelo, serializer, campo de última alteração)
+COLECOES = [
+    ('configuracao', ConfiguracaoSite, ConfiguracaoSiteSerializer, 'data_atualizacao'),
+    ('devocionais', Devocional, DevocionalSerializer, 'atualizado_em'),
+    ('departamentos', Departamento, DepartamentoSerializer, 'atualizado_em'),
+    ('secoes_lideranca', SecaoLideranca, SecaoLiderancaSincronizacaoSerializer, 'atualizado_em'),
+    ('pessoas', Pessoa, PessoaSincronizacaoSerializer, 'atualizado_em'),
+    ('dias_semana', DiaSemana, DiaSemanaSincronizacaoSerializer, 'atualizado_em'),
+    ('eventos', Evento, EventoSincronizacaoSerializer, 'atualizado_em'),
+    ('eventos_especiais', EventoEspecial, EventoEspecialSerializer, 'atualizado_em'),
+    ('pastores', Pastor, PastorSerializer, 'atualizado_em'),
+    ('memorial', Memorial, MemorialSerializer, 'atualizado_em'),
+]
+
+# Nome da coleção de cada modelo, usado nos registros de exclusão
+COLECAO_DO_MODELO = {modelo: chave for chave, modelo, _, _ in COLECOES}
+
+
+class TokenInvalido(ValueError):
+    pass
+
+
+def gerar_token(momento):
+    """O token é opaco para o cliente: o instante (em microssegundos) até onde ele está sincronizado."""
+    return format(int(momento.timestamp() * 1_000_000), 'x')
+
+
+def ler_token(token):
+    try:
+        return datetime.fromtimestamp(int(token, 16) / 1_000_000, tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise TokenInvalido("Token de sincronização inválido.")
+
+
+def limpar_exclusoes_antigas(agora=None):
+    """
+    Apaga as marcas de exclusão que nenhum cliente ainda pode pedir: quem tem um token
+    mais antigo que RETENCAO_EXCLUSOES já recebe a carga completa. Retorna quantas foram apagadas.
+    """
+    agora = agora or timezone.now()
+    limite = agora - MARGEM_SEGURANCA - RETENCAO_EXCLUSOES
+    apagadas, _ = RegistroExclusao.objects.filter(excluido_em__lt=limite).delete()
+    return apagadas
+
+
+def _limpar_exclusoes_periodicamente(agora):
+    # O cache é compartilhado entre os workers: só o primeiro do período faz a limpeza
+    if cache.add('sincronizacao:limpeza_exclusoes', agora.isoformat(), timeout=INTERVALO_LIMPEZA):
+        limpar_exclusoes_antigas(agora)
+
+
+def _queryset_alterados(modelo, campo, desde, ate):
+    queryset = modelo.objects.all()
+    janela = Q(**{f'{campo}__lte': ate})
+    if desde is not None:
+        janela &= Q(**{f'{campo}__gt': desde})
+    if modelo is Devocional:
+        # Devocionais agendadas entram quando são publicadas, não quando são editadas
+        queryset = queryset.publicados(ate)
+        if desde is not None:
+            janela = (Q(atualizado_em__gt=desde) & Q(atualizado_em__lte=ate)) | Q(data_publicacao__gt=desde)
+    return queryset.filter(janela).order_by('pk')
+
+
+def alteracoes_desde(desde, request):
+    """
+    Monta a resposta da sincronização: registros criados/alterados e excluídos
+    no intervalo (desde, agora - margem]. Com `desde=None` devolve a carga completa.
+    """
+    agora = timezone.now()
+    _limpar_exclusoes_periodicamente(agora)
+    ate = agora - MARGEM_SEGURANCA
+    completo = desde is None or desde < ate - RETENCAO_EXCLUSOES
+    if completo:
+        desde = None
+
+    contexto = {'request': request}
+    alteracoes = {}
+    for chave, modelo, serializer_class, campo in COLECOES:
+        queryset = _queryset_alterados(modelo, campo, desde, ate)
+        dados = serializer_class(queryset, many=True, context=contexto).data
+        if dados:
+            alteracoes[chave] = dados
+
+    exclusoes = {}
+    if not completo:
+        registros = (
+            RegistroExclusao.objects
+            .filter(excluido_em__gt=desde, excluido_em__lte=ate)
+            .values_list('modelo', 'objeto_id')
+        )
+        for colecao, objeto_id in registros:
+            exclusoes.setdefault(colecao, []).append(objeto_id)
+
+        # Devocionais reagendadas para o futuro saem do cliente até serem publicadas
+        reagendadas = Devocional.objects.filter(
+            atualizado_em__gt=desde, atualizado_em__lte=ate, data_publicacao__gt=ate
+        ).values_list('pk', flat=True)
+        if reagendadas:
+            exclusoes.setdefault('devocionais', []).extend(reagendadas)
+
+    return {
+        'token': gerar_token(ate),
+        'completo': completo,
+        'alteracoes': alteracoes,
+        'exclusoes': exclusoes,
+    }
@@ -1,3 +1,386 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import icones, imagens, sincronizacao, visualizacoes
+from .models import Devocional, EventoEspecial, Pastor, RegistroExclusao
+from .texto import interpretar_periodo
+
+
+class InterpretarPeriodoTests(SimpleTestCase):
+    hoje = date(2026, 10, 19)
+
+    def interpretar(self, texto, hoje=None):
+        return interpretar_periodo(texto, hoje or self.hoje)
+
+    def test_formatos_por_extenso(self):
+        self.assertEqual(self.interpretar("15-17 Novembro"), (date(2026, 11, 15), date(2026, 11, 17)))
+        self.assertEqual(self.interpretar("15 a 17 de julho de 2025"), (date(2025, 7, 15), date(2025, 7, 17)))
+        self.assertEqual(self.interpretar("30 Outubro - 02 Novembro"), (date(2026, 10, 30), date(2026, 11, 2)))
+        self.assertEqual(self.interpretar("Dezembro"), (date(2026, 12, 1), date(2026, 12, 31)))
+
+    def test_formatos_numericos(self):
+        self.assertEqual(self.interpretar("15/11"), (date(2026, 11, 15), date(2026, 11, 15)))
+        self.assertEqual(self.interpretar("15/07/2025 a 20/07/2025"), (date(2025, 7, 15), date(2025, 7, 20)))
+        self.assertEqual(self.interpretar("30/12/25 a 02/01/26"), (date(2025, 12, 30), date(2026, 1, 2)))
+
+    def test_horario_nao_vira_dia(self):
+        esperado = (date(2026, 12, 12), date(2026, 12, 12))
+        self.assertEqual(self.interpretar("12 de Dezembro às 19h"), esperado)
+        self.assertEqual(self.interpretar("12 de Dezembro, 19h30"), esperado)
+        self.assertEqual(self.interpretar("12/12 às 19:00"), esperado)
+        self.assertEqual(self.interpretar("12 de dezembro às 19 horas"), esperado)
+
+    def test_virada_de_ano(self):
+        self.assertEqual(self.interpretar("30 Dezembro - 02 Janeiro"), (date(2026, 12, 30), date(2027, 1, 2)))
+
+    def test_data_ja_passada_vai_para_o_ano_seguinte(self):
+        self.assertEqual(self.interpretar("10 Janeiro", date(2026, 12, 5)), (date(2027, 1, 10), date(2027, 1, 10)))
+        self.assertEqual(self.interpretar("Março"), (date(2027, 3, 1), date(2027, 3, 31)))
+
+    def test_data_recem_passada_continua_no_ano(self):
+        self.assertEqual(self.interpretar("20-21 Setembro"), (date(2026, 9, 20), date(2026, 9, 21)))
+        # Em janeiro, um evento de dezembro é o que acabou de acontecer
+        self.assertEqual(self.interpretar("20 Dezembro", date(2027, 1, 5)), (date(2026, 12, 20), date(2026, 12, 20)))
+
+    def test_29_de_fevereiro(self):
+        self.assertEqual(self.interpretar("29/02", date(2028, 1, 10)), (date(2028, 2, 29), date(2028, 2, 29)))
+        # Sem ano, vai para o próximo ano em que a data existe
+        self.assertEqual(self.interpretar("29/02"), (date(2028, 2, 29), date(2028, 2, 29)))
+        self.assertEqual(self.interpretar("29 Fevereiro"), (date(2028, 2, 29), date(2028, 2, 29)))
+        # Com o ano informado, a data precisa existir naquele ano
+        self.assertEqual(self.interpretar("29/02/2027"), (None, None))
+        self.assertEqual(self.interpretar("Fevereiro 2027"), (date(2027, 2, 1), date(2027, 2, 28)))
+
+    def test_texto_nao_reconhecido(self):
+        for texto in ("", "Em breve", "32/07", "às 19h"):
+            self.assertEqual(self.interpretar(texto), (None, None), texto)
+
+
+@mock.patch('home.models.timezone.localdate', return_value=date(2026, 10, 19))
+class EventoEspecialDatasTests(TestCase):
+    def test_datas_preenchidas_pelo_periodo(self, _):
+        evento = EventoEspecial.objects.create(titulo="Congresso", descricao="-", periodo="15-17 Novembro")
+        self.assertEqual((evento.data_inicio, evento.data_fim), (date(2026, 11, 15), date(2026, 11, 17)))
+
+    def test_editar_periodo_atualiza_as_datas(self, _):
+        evento = EventoEspecial.objects.create(titulo="Congresso", descricao="-", periodo="15-17 Novembro")
+        evento.periodo = "05-06 Dezembro"
+        evento.save()
+        evento.refresh_from_db()
+        self.assertEqual((evento.data_inicio, evento.data_fim), (date(2026, 12, 5), date(2026, 12, 6)))
+
+    def test_editar_datas_atualiza_o_periodo(self, _):
+        evento = EventoEspecial.objects.create(titulo="Congresso", descricao="-", periodo="15-17 Novembro")
+        evento.data_inicio, evento.data_fim = date(2026, 11, 20), date(2026, 11, 22)
+        evento.save()
+        self.assertEqual(evento.periodo, "20-22 Novembro")
+
+    def test_texto_livre_nao_e_reescrito(self, _):
+        evento = EventoEspecial.objects.create(
+            titulo="Retiro", descricao="-", periodo="Férias escolares", data_inicio=date(2026, 12, 20),
+        )
+        evento.data_fim = date(2026, 12, 30)
+        evento.save()
+        self.assertEqual(evento.periodo, "Férias escolares")
+
+
+class SincronizacaoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def pedir(self, desde):
+        return self.client.get(reverse('api-changes'), {'since': sincronizacao.gerar_token(desde)}).json()
+
+    def test_token_recente_recebe_as_exclusoes(self):
+        desde = timezone.now() - timedelta(days=1)
+        pastor = Pastor.objects.create(nome="Pastor")
+        pastor_id = pastor.pk
+        pastor.delete()
+        RegistroExclusao.objects.update(excluido_em=timezone.now() - timedelta(hours=1))
+        dados = self.pedir(desde)
+        self.assertFalse(dados['completo'])
+        self.assertEqual(dados['exclusoes'], {'pastores': [pastor_id]})
+
+    def test_token_antigo_demais_recebe_a_carga_completa(self):
+        Pastor.objects.create(nome="Pastor")
+        Pastor.objects.update(atualizado_em=timezone.now() - timedelta(hours=1))
+        desde = timezone.now() - sincronizacao.RETENCAO_EXCLUSOES - timedelta(days=1)
+        dados = self.pedir(desde)
+        self.assertTrue(dados['completo'])
+        self.assertEqual(dados['exclusoes'], {})
+        self.assertEqual(len(dados['alteracoes']['pastores']), 1)
+
+    def test_marcas_vencidas_sao_apagadas(self):
+        agora = timezone.now()
+        vencida = RegistroExclusao.objects.create(
+            modelo='pastores', objeto_id=1, excluido_em=agora - sincronizacao.RETENCAO_EXCLUSOES - timedelta(days=1),
+        )
+        recente = RegistroExclusao.objects.create(modelo='pastores', objeto_id=2, excluido_em=agora - timedelta(days=1))
+        self.pedir(agora - timedelta(days=2))
+        self.assertFalse(RegistroExclusao.objects.filter(pk=vencida.pk).exists())
+        self.assertTrue(RegistroExclusao.objects.filter(pk=recente.pk).exists())
+
+    def test_limpeza_no_maximo_uma_vez_por_periodo(self):
+        self.pedir(timezone.now() - timedelta(days=1))
+        RegistroExclusao.objects.create(
+            modelo='pastores', objeto_id=1,
+            excluido_em=timezone.now() - sincronizacao.RETENCAO_EXCLUSOES - timedelta(days=1),
+        )
+        self.pedir(timezone.now() - timedelta(days=1))
+        self.assertEqual(RegistroExclusao.objects.count(), 1)
+        self.assertEqual(sincronizacao.limpar_exclusoes_antigas(), 1)
+
+
+@mock.patch('home.visualizacoes._garantir_thread')
+class VisualizacoesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        visualizacoes._buffer.clear()
+        self.addCleanup(visualizacoes._buffer.clear)
+        self.devocional = Devocional.objects.create(
+            titulo="Devocional", autor="Pastor", conteudo="Texto", data_publicacao=timezone.now() - timedelta(days=1),
+        )
+
+    def test_so_conta_quando_o_corpo_e_enviado(self, _):
+        url = reverse('api-devocional-recente')
+        resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(visualizacoes._buffer[self.devocional.pk], 1)
+
+        revalidacao = self.client.get(url, HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(revalidacao.status_code, 304)
+        self.assertEqual(visualizacoes._buffer[self.devocional.pk], 1)
+
+        self.client.get(reverse('api-devocional-detail', args=[self.devocional.pk]))
+        self.assertEqual(visualizacoes._buffer[self.devocional.pk], 2)
+
+    def test_descarregar_grava_e_esvazia_o_buffer(self, garantir_thread):
+        for _ in range(3):
+            visualizacoes.registrar_visualizacao(self.devocional.pk)
+        garantir_thread.assert_called()
+        # Nada é gravado na requisição do leitor
+        self.devocional.refresh_from_db()
+        self.assertEqual(self.devocional.visualizacoes, 0)
+
+        visualizacoes.descarregar()
+        self.devocional.refresh_from_db()
+        self.assertEqual(self.devocional.visualizacoes, 3)
+        self.assertFalse(visualizacoes._buffer)
+
+    def test_buffer_cheio_acorda_a_thread(self, _):
+        self.addCleanup(visualizacoes._sinal.clear)
+        with mock.patch.object(visualizacoes, 'LIMITE_BUFFER', 2):
+            visualizacoes.registrar_visualizacao(self.devocional.pk)
+            self.assertFalse(visualizacoes._sinal.is_set())
+            visualizacoes.registrar_visualizacao(self.devocional.pk)
+            self.assertTrue(visualizacoes._sinal.is_set())
+
+
+@mock.patch('home.visualizacoes._garantir_thread')
+class PublicarConteudoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        visualizacoes._buffer.clear()
+        self.addCleanup(visualizacoes._buffer.clear)
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta)
+
+    def publicar(self):
+        with override_settings(STATICFILES_DIRS=[self.pasta]):
+            call_command(
+                'publicar_conteudo', '--sem-collectstatic', '--base-url', 'https://testserver', stdout=io.StringIO(),
+            )
+
+    def ler(self, nome):
+        with open(os.path.join(self.pasta, 'publico', nome), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+
+    def test_devocional_recente_sem_contar_leitura(self, _):
+        devocional = Devocional.objects.create(
+            titulo="Devocional", autor="Pastor", conteudo="Texto", data_publicacao=timezone.now() - timedelta(days=1),
+        )
+        self.publicar()
+        self.assertEqual(self.ler('devocional-recente.json')['id'], devocional.pk)
+        self.assertIn('devocional-recente.json', self.ler('indice.json')['arquivos'])
+        self.assertFalse(visualizacoes._buffer)
+
+    def test_nao_publica_os_proximos_eventos(self, _):
+        self.publicar()
+        self.assertEqual(self.ler('devocional-recente.json'), {})
+        self.assertFalse(os.path.exists(os.path.join(self.pasta, 'publico', 'agenda-proximos.json')))
+
+
+class IconesTests(SimpleTestCase):
+    def setUp(self):
+        raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, raiz)
+        configuracao = override_settings(STATICFILES_DIRS=[raiz])
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        icones._memorizado = (None, None)
+        self.addCleanup(setattr, icones, '_memorizado', (None, None))
+        self.pasta = icones.pasta_absoluta()
+        os.makedirs(self.pasta)
+        self.sprite = os.path.join(raiz, *icones.SPRITE_ICONES.split('/'))
+        self.salvar('culto.png', 'red')
+        self.salvar('oracao.png', 'blue')
+
+    def salvar(self, arquivo, cor):
+        from PIL import Image
+
+        caminho = os.path.join(self.pasta, arquivo)
+        existia = os.path.exists(caminho)
+        mtime_pasta = os.stat(self.pasta).st_mtime_ns
+        Image.new('RGB', (16, 16), cor).save(caminho)
+        if existia:
+            # Sobrescrever um arquivo não altera o mtime da pasta; garante isso no teste
+            os.utime(self.pasta, ns=(mtime_pasta, mtime_pasta))
+            estado = os.stat(caminho)
+            os.utime(caminho, ns=(estado.st_atime_ns, estado.st_mtime_ns + 10 ** 9))
+
+    def cor_no_sprite(self, posicao):
+        from PIL import Image
+
+        with Image.open(self.sprite) as sprite:
+            return sprite.convert('RGB').getpixel((posicao + icones.TAMANHO_ICONE // 2, icones.TAMANHO_ICONE // 2))
+
+    def test_manifesto_memorizado_enquanto_a_pasta_nao_muda(self):
+        primeiro = icones.manifesto()
+        self.assertEqual([icone.nome for icone in primeiro.icones], ['culto', 'oracao'])
+        self.assertIsNone(primeiro.sprite_url)
+        self.assertIs(icones.manifesto(), primeiro)
+
+        self.salvar('santa-ceia.png', 'green')
+        self.assertEqual([icone.nome for icone in icones.manifesto().icones], ['culto', 'oracao', 'santa-ceia'])
+
+    def test_icone_substituido_gera_o_sprite_de_novo(self):
+        self.assertEqual(icones.gerar_sprite(), 2)
+        manifesto = icones.manifesto()
+        self.assertIsNotNone(manifesto.sprite_url)
+        self.assertEqual(self.cor_no_sprite(manifesto.por_nome['oracao'].posicao_sprite), (0, 0, 255))
+
+        self.salvar('oracao.png', 'green')
+        atualizado = icones.manifesto()
+        self.assertIsNot(atualizado, manifesto)
+        self.assertEqual(self.cor_no_sprite(atualizado.por_nome['oracao'].posicao_sprite), (0, 128, 0))
+
+    def test_sprite_descartado_quando_nao_pode_ser_refeito(self):
+        icones.gerar_sprite()
+        with open(os.path.join(self.pasta, 'batismo.svg'), 'w') as arquivo:
+            arquivo.write('<svg xmlns="http://www.w3.org/2000/svg"/>')
+        manifesto = icones.manifesto()
+        self.assertIsNone(manifesto.sprite_url)
+        self.assertIsNone(manifesto.por_nome['culto'].posicao_sprite)
+
+
+class VariantesImagemTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        configuracao = override_settings(MEDIA_ROOT=media_root)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def foto(self, nome, cor='red'):
+        from PIL import Image
+
+        saida = io.BytesIO()
+        Image.new('RGB', (800, 400), cor).save(saida, 'JPEG')
+        return SimpleUploadedFile(nome, saida.getvalue(), content_type='image/jpeg')
+
+    def salvar(self, pastor):
+        with self.captureOnCommitCallbacks(execute=True):
+            pastor.save()
+
+    def test_variante_gerada_uma_vez_no_caminho_derivado_da_foto(self):
+        pastor = Pastor(nome="Pastor", foto=self.foto('joao.jpg'))
+        self.salvar(pastor)
+        caminho = imagens.gerar_variante(pastor.foto.name, 'media')
+        self.assertEqual(caminho, imagens.caminho_variante(pastor.foto.name, 'media'))
+        with mock.patch.object(default_storage, 'save') as salvar:
+            self.assertEqual(imagens.gerar_variante(pastor.foto.name, 'media'), caminho)
+        salvar.assert_not_called()
+
+    def test_variante_gravada_ao_mesmo_tempo_por_outro_worker(self):
+        pastor = Pastor(nome="Pastor", foto=self.foto('joao.jpg'))
+        self.salvar(pastor)
+        caminho = imagens.gerar_variante(pastor.foto.name, 'media')
+        # O exists() deste worker rodou antes da gravação do outro: o storage dá um nome com sufixo
+        exists = default_storage.exists
+        with mock.patch.object(default_storage, 'exists') as verificar:
+            verificar.side_effect = lambda nome: verificar.call_count > 1 and exists(nome)
+            self.assertEqual(imagens.gerar_variante(pastor.foto.name, 'media'), caminho)
+        self.assertGreater(verificar.call_count, 1)
+        _, arquivos = default_storage.listdir(caminho.rsplit('/', 1)[0])
+        self.assertEqual(arquivos, [caminho.rsplit('/', 1)[1]])
+
+    def test_trocar_a_foto_apaga_as_variantes_antigas(self):
+        pastor = Pastor(nome="Pastor", foto=self.foto('joao.jpg'))
+        self.salvar(pastor)
+        antigas = [imagens.gerar_variante(pastor.foto.name, variante) for variante in imagens.VARIANTES_FOTO]
+
+        pastor.foto = self.foto('joao-novo.jpg', 'blue')
+        self.salvar(pastor)
+        for caminho in antigas:
+            self.assertFalse(default_storage.exists(caminho))
+
+        novas = [imagens.gerar_variante(pastor.foto.name, variante) for variante in imagens.VARIANTES_FOTO]
+        # Editar outro campo não mexe nas variantes da foto atual
+        pastor.nome = "Pastor João"
+        self.salvar(pastor)
+        for caminho in novas:
+            self.assertTrue(default_storage.exists(caminho))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pastor.delete()
+        for caminho in novas:
+            self.assertFalse(default_storage.exists(caminho))
+
+
+@mock.patch('home.visualizacoes._garantir_thread')
+class DevocionalAgendadaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        visualizacoes._buffer.clear()
+        self.addCleanup(visualizacoes._buffer.clear)
+        self.agora = timezone.now()
+        self.publicada = Devocional.objects.create(
+            titulo="Publicada", autor="Pastor", conteudo="Texto", data_publicacao=self.agora - timedelta(days=1),
+        )
+        self.agendada = Devocional.objects.create(
+            titulo="Agendada", autor="Pastor", conteudo="Texto", data_publicacao=self.agora + timedelta(minutes=10),
+        )
+
+    def ids_visiveis(self):
+        recente = self.client.get(reverse('api-devocional-recente')).json()
+        lista = self.client.get(reverse('api-devocional-list')).json()
+        detalhe = self.client.get(reverse('api-devocional-detail', args=[self.agendada.pk]))
+        return recente['id'], [item['id'] for item in lista], detalhe.status_code
+
+    def test_agendada_aparece_quando_chega_a_hora(self, _):
+        with mock.patch('home.cache.timezone.now', return_value=self.agora), \
+                mock.patch.object(cache, 'set', wraps=cache.set) as guardar:
+            self.assertEqual(self.ids_visiveis(), (self.publicada.pk, [self.publicada.pk], 404))
+        # As respostas em cache expiram exatamente na publicação da agendada (10 minutos)
+        timeouts = {chamada.args[2] for chamada in guardar.call_args_list if 'devocionais' in chamada.args[0]}
+        self.assertEqual(timeouts, {601})
+
+        # Passada a hora, as entradas já expiraram do cache
+        cache.clear()
+        with mock.patch('home.models.timezone.now', return_value=self.agora + timedelta(minutes=11)):
+            recente, lista, detalhe = self.ids_visiveis()
+        self.assertEqual((recente, lista, detalhe), (self.agendada.pk, [self.agendada.pk, self.publicada.pk], 200))
 
-# Create your tests here.
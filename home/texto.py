@@ -0,0 +1,170 @@
+# home/texto.py
+
+import calendar
+import math
+import re
+from datetime import date, timedelta
+
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+# Velocidade média de leitura em português (palavras por minuto)
+PALAVRAS_POR_MINUTO = 200
+# Tamanho do resumo exibido nas listagens
+PALAVRAS_RESUMO = 40
+# Limite da coluna Devocional.resumo
+TAMANHO_MAXIMO_RESUMO = 400
+
+re_espacos = re.compile(r'\s+')
+
+
+def calcular_metadados(conteudo):
+    """
+    Calcula, a partir do texto puro de uma devocional, os campos derivados que ficam
+    gravados no banco: resumo, total de palavras, tempo de leitura e o HTML já sanitizado.
+    Função pura, usada tanto pelo Devocional.save quanto pela migração de preenchimento.
+    """
+    conteudo = conteudo or ''
+    texto_corrido = re_espacos.sub(' ', conteudo).strip()
+    total_palavras = len(texto_corrido.split()) if texto_corrido else 0
+    resumo = Truncator(texto_corrido).words(PALAVRAS_RESUMO, truncate='…')
+    return {
+        'resumo': Truncator(resumo).chars(TAMANHO_MAXIMO_RESUMO, truncate='…'),
+        'total_palavras': total_palavras,
+        'tempo_leitura': max(1, math.ceil(total_palavras / PALAVRAS_POR_MINUTO)),
+        # O texto é escapado (nenhuma tag do autor passa) e os parágrafos viram <p>/<br>
+        'conteudo_html': linebreaks(conteudo.strip(), autoescape=True),
+    }
+
+
+# --- PERÍODOS DE EVENTOS ESPECIAIS (ex: "15-17 Julho") ---
+
+MESES = [
+    'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+    'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro',
+]
+
+# Nomes e abreviações aceitos na leitura, já em minúsculas
+NUMERO_DO_MES = {}
+for _numero, _nome in enumerate(MESES, start=1):
+    _nome = _nome.lower()
+    NUMERO_DO_MES[_nome] = _numero
+    NUMERO_DO_MES[_nome[:3]] = _numero
+NUMERO_DO_MES['marco'] = 3
+
+re_data_numerica = re.compile(r'(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?')
+re_token_periodo = re.compile(r'\d+|[^\W\d_]+')
+# Horários ("às 19h", "19h30", "19:00", "19 horas") não são dias e são descartados
+re_horario = re.compile(r'\b\d{1,2}(?::\d{2}|\s*h(?:oras?|rs?|s)?(?:\s*\d{2})?\b)')
+
+# Sem ano no texto, o evento é a primeira ocorrência que não terminou há mais que isso
+# (ex: "10 Janeiro" digitado em dezembro é o janeiro seguinte)
+TOLERANCIA_PASSADO = timedelta(days=90)
+
+
+def _data_no_ano(dia, mes, ano, ultimo_dia=False):
+    """Monta a data; sem dia, usa o primeiro (ou o último) dia do mês. None se a data não existe."""
+    if dia is None:
+        dia = calendar.monthrange(ano, mes)[1] if ultimo_dia else 1
+    try:
+        return date(ano, mes, dia)
+    except ValueError:
+        return None
+
+
+def _montar_periodo(inicio, fim, ano):
+    """
+    Monta (data_inicio, data_fim) a partir de (dia, mes, ano_informado) usando `ano`
+    onde o texto não trouxe o ano. Retorna None se alguma das datas não existir (ex: 29/02).
+    """
+    data_inicio = _data_no_ano(inicio[0], inicio[1], inicio[2] or ano)
+    data_fim = _data_no_ano(fim[0], fim[1], fim[2] or ano, ultimo_dia=True)
+    if data_inicio is None or data_fim is None:
+        return None
+    if data_fim < data_inicio:
+        if fim[2]:
+            return None
+        # Ex: "30 Dezembro - 02 Janeiro": o término é no ano seguinte
+        data_fim = _data_no_ano(fim[0], fim[1], data_fim.year + 1, ultimo_dia=True)
+        if data_fim is None:
+            return None
+    return data_inicio, data_fim
+
+
+def interpretar_periodo(texto, hoje):
+    """
+    Converte o texto livre de EventoEspecial.periodo em (data_inicio, data_fim).
+    Entende formatos como "15-17 Julho", "15 a 17 de julho de 2025",
+    "30 Julho - 02 Agosto", "15/07", "15/07/2025 a 20/07/2025", "Julho" e
+    "12 de Dezembro às 19h" (o horário é ignorado).
+    Quando o ano não é informado, usa a primeira ocorrência a partir do ano anterior a
+    `hoje` que não tenha terminado há mais de TOLERANCIA_PASSADO (e em que a data exista,
+    no caso de 29/02). Retorna (None, None) se não entender.
+    """
+    texto = re_horario.sub(' ', (texto or '').strip().lower())
+    if not texto.strip():
+        return None, None
+
+    # Datas numéricas (dd/mm ou dd/mm/aaaa)
+    numericas = re_data_numerica.findall(texto)
+    if numericas:
+        datas = []
+        for dia, mes, ano in numericas:
+            ano = int(ano) if ano else None
+            if ano is not None and ano < 100:
+                ano += 2000
+            datas.append((int(dia), int(mes), ano))
+        inicio, fim = datas[0], datas[-1]
+        # "15/07 a 20/07/2025": o ano informado em uma das datas vale para a outra
+        ano_informado = fim[2] or inicio[2]
+    else:
+        # Dias e meses por extenso: os dias pendentes pertencem ao próximo mês citado
+        pares = []
+        dias_pendentes = []
+        ultimo_mes = None
+        ano_informado = None
+        for token in re_token_periodo.findall(texto):
+            if token.isdigit():
+                if len(token) == 4:
+                    ano_informado = int(token)
+                else:
+                    dias_pendentes.append(int(token))
+            elif token in NUMERO_DO_MES:
+                ultimo_mes = NUMERO_DO_MES[token]
+                pares += [(dia, ultimo_mes) for dia in dias_pendentes]
+                dias_pendentes = []
+                if not pares or pares[-1][1] != ultimo_mes:
+                    # Mês citado sem dia, ex: "Julho" ou "Julho 15-17"
+                    pares.append((None, ultimo_mes))
+        if ultimo_mes is None:
+            return None, None
+        pares += [(dia, ultimo_mes) for dia in dias_pendentes]
+        pares_com_dia = [par for par in pares if par[0] is not None]
+        if pares_com_dia:
+            inicio, fim = pares_com_dia[0], pares_com_dia[-1]
+        else:
+            # Apenas o mês: o evento ocupa o mês inteiro
+            inicio = fim = pares[0]
+        inicio = (inicio[0], inicio[1], None)
+        fim = (fim[0], fim[1], None)
+
+    if ano_informado:
+        return _montar_periodo(inicio, fim, ano_informado) or (None, None)
+
+    # 29/02 só existe em anos bissextos: até 4 anos à frente
+    limite = hoje - TOLERANCIA_PASSADO
+    for ano in range(hoje.year - 1, hoje.year + 5):
+        periodo = _montar_periodo(inicio, fim, ano)
+        if periodo and periodo[1] >= limite:
+            return periodo
+    return None, None
+
+
+def formatar_periodo(inicio, fim):
+    """Texto de exibição no mesmo estilo usado no admin, ex: "15-17 Julho"."""
+    fim = fim or inicio
+    if inicio == fim:
+        return f"{inicio.day:02d} {MESES[inicio.month - 1]}"
+    if (inicio.year, inicio.month) == (fim.year, fim.month):
+        return f"{inicio.day:02d}-{fim.day:02d} {MESES[inicio.month - 1]}"
+    return f"{inicio.day:02d} {MESES[inicio.month - 1]} - {fim.day:02d} {MESES[fim.month - 1]}"
@@ -1,11 +1,16 @@
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.shortcuts import render
-from .models import ConfiguracaoSite, Departamento, SecaoLideranca, DiaSemana, EventoEspecial, Devocional, Pessoa
+from django.http import HttpResponse
+from .models import ConfiguracaoSite, Departamento, SecaoLideranca, DiaSemana, EventoEspecial, Devocional, Pessoa, Pastor, Memorial
 from django.conf import settings
-from .serializers import ConfiguracaoSiteSerializer, DevocionalSerializer, SecaoLiderancaSerializer, DepartamentoSerializer, DiaSemanaSerializer, EventoEspecialSerializer
+from .serializers import ConfiguracaoSiteSerializer, DevocionalSerializer, DevocionalHtmlSerializer, DevocionalResumoSerializer, DevocionalRankingSerializer, SecaoLiderancaSerializer, DepartamentoSerializer, DiaSemanaSerializer, EventoEspecialSerializer, PastorSerializer, MemorialSerializer
+from . import agenda
+from . import leitura, sincronizacao
+from .visualizacoes import registrar_visualizacao
+from . import cache as home_cache
 
 # --- VIEWS DA API ---
 
@@ -14,57 +19,123 @@ class ConfiguracaoSiteAPIView(APIView):
     API View para buscar a configuração (singleton) do site.
     """
     def get(self, request, format=None):
-        configuracao = ConfiguracaoSite.objects.first()
+        configuracao = ConfiguracaoSite.atual()
         if configuracao:
             # Passando o 'request' no contexto do serializer
             serializer = ConfiguracaoSiteSerializer(configuracao, context={'request': request})
             return Response(serializer.data)
         return Response({})
 
+def _validade_devocionais():
+    # O cache das devocionais expira sozinho quando a próxima devocional agendada for publicada
+    return home_cache.segundos_ate(Devocional.objects.proxima_publicacao())
+
+
+def _formato_html(request):
+    # Com ?html=1 a devocional vem com o conteúdo em HTML (conteudo_html) no lugar do texto puro
+    return request.query_params.get('html') in ('1', 'true')
+
+
+def _serializer_devocional(request):
+    return DevocionalHtmlSerializer if _formato_html(request) else DevocionalSerializer
+
+
+def _devocionais_completas(request):
+    # Só uma das duas colunas grandes é lida do banco
+    coluna_ignorada = 'conteudo' if _formato_html(request) else 'conteudo_html'
+    return Devocional.objects.publicados().defer(coluna_ignorada)
+
+
 class DevocionalRecenteAPIView(APIView):
     """
-    API View para buscar a devocional mais recente.
+    API View para buscar a devocional mais recente (já publicada).
+    Com ?html=1 o conteúdo vem em HTML (conteudo_html) no lugar do texto puro.
     """
     def get(self, request, format=None):
-        devocional = Devocional.objects.order_by('-data_publicacao').first()
-        if devocional:
-            # Passando o 'request' no contexto do serializer
-            serializer = DevocionalSerializer(devocional, context={'request': request})
-            return Response(serializer.data)
-        return Response({})
+        serializer_class = _serializer_devocional(request)
+
+        def gerar():
+            devocional = _devocionais_completas(request).order_by('-data_publicacao').first()
+            if devocional:
+                # Passando o 'request' no contexto do serializer
+                return serializer_class(devocional, context={'request': request}).data
+            return {}
+
+        data, etag = home_cache.obter_ou_gerar(
+            'devocionais', ('recente', _formato_html(request), request.build_absolute_uri('/')), gerar,
+            timeout=_validade_devocionais,
+        )
+
+        def construir():
+            # Só conta a leitura quando o corpo é enviado: um 304 é o mesmo leitor revalidando
+            if data:
+                registrar_visualizacao(data['id'])
+            return Response(data)
+
+        return home_cache.responder(request, etag, construir)
+
+
+class DevocionalDetalheAPIView(generics.RetrieveAPIView):
+    """
+    API View para ler uma devocional publicada pelo id. Cada leitura é contada
+    (em memória, gravada em lote) para o ranking de mais lidas.
+    Com ?html=1 o conteúdo vem em HTML (conteudo_html) no lugar do texto puro.
+    """
+    permission_classes = [AllowAny]
+
+    def get_serializer_class(self):
+        return _serializer_devocional(self.request)
+
+    def get_queryset(self):
+        return _devocionais_completas(self.request)
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        registrar_visualizacao(response.data['id'])
+        return response
+
+
+class DevocionaisMaisLidosAPIView(APIView):
+    """
+    API View com o ranking das devocionais mais lidas (padrão 5, máximo 20 via ?limite=).
+    Fica em cache por alguns minutos, pois as contagens mudam o tempo todo.
+    """
+    CACHE_SEGUNDOS = 10 * 60
+
+    def get(self, request, format=None):
+        try:
+            limite = max(1, min(int(request.query_params.get('limite', 5)), 20))
+        except ValueError:
+            return Response({"detail": "O parâmetro 'limite' deve ser um número inteiro."}, status=status.HTTP_400_BAD_REQUEST)
+
+        def gerar():
+            devocionais = (
+                Devocional.objects.publicados()
+                .order_by('-visualizacoes', '-data_publicacao')
+                .only(*DevocionalRankingSerializer.campos_banco)[:limite]
+            )
+            return DevocionalRankingSerializer(devocionais, many=True, context={'request': request}).data
+
+        data, etag = home_cache.obter_ou_gerar(
+            'devocionais', ('mais-lidos', limite, request.build_absolute_uri('/')), gerar,
+            timeout=lambda: min(self.CACHE_SEGUNDOS, _validade_devocionais()),
+        )
+        return home_cache.responder(request, etag, lambda: Response(data))
     
-class LiderancaAPIView(generics.ListAPIView):
+class LiderancaAPIView(APIView):
     """
     API View para listar todas as seções de liderança com as pessoas aninhadas.
     """
-    queryset = SecaoLideranca.objects.prefetch_related('pessoas').all()
-    serializer_class = SecaoLiderancaSerializer    
+    def get(self, request, format=None):
+        return Response(leitura.lideranca(request))
 
 class DepartamentosAPIView(APIView):
     """
     API View que retorna os departamentos agrupados por categoria.
     """
     def get(self, request, format=None):
-        # A ordenação já é feita pelo Meta do modelo
-        departamentos = Departamento.objects.all()
-        
-        departamentos_agrupados = {}
-        
-        for depto in departamentos:
-            categoria_chave = depto.categoria
-            
-            # Se a categoria ainda não existe no nosso dicionário, a criamos
-            if categoria_chave not in departamentos_agrupados:
-                departamentos_agrupados[categoria_chave] = {
-                    "nome_display": depto.get_categoria_display(),
-                    "lista": []
-                }
-            
-            # Serializamos e adicionamos o departamento à lista da sua categoria
-            serializer = DepartamentoSerializer(depto, context={'request': request})
-            departamentos_agrupados[categoria_chave]['lista'].append(serializer.data)
-            
-        return Response(departamentos_agrupados)
+        # A ordenação já é feita pelo Meta do modelo; o agrupamento é feito em uma passada
+        return Response(leitura.departamentos(request))
 
  
 class AgendaAPIView(APIView):
@@ -73,29 +144,142 @@ class AgendaAPIView(APIView):
     dias da semana com eventos aninhados e eventos especiais.
     """
     def get(self, request, format=None):
-        # Usamos prefetch_related para otimizar a busca dos eventos
-        dias_semana = DiaSemana.objects.prefetch_related('eventos').all()
-        eventos_especiais = EventoEspecial.objects.all()
-
-        # Serializamos os dois conjuntos de dados
-        dias_serializer = DiaSemanaSerializer(dias_semana, many=True, context={'request': request})
-        especiais_serializer = EventoEspecialSerializer(eventos_especiais, many=True, context={'request': request})
+        # Apenas eventos especiais que ainda não terminaram, em ordem cronológica
+        eventos_especiais = EventoEspecial.objects.vigentes(agenda.hoje_local())
 
-        # Montamos a resposta final
         data = {
-            'dias_semana': dias_serializer.data,
-            'eventos_especiais': especiais_serializer.data
+            'dias_semana': leitura.dias_semana(),
+            'eventos_especiais': leitura.eventos_especiais(eventos_especiais),
         }
         
         return Response(data)
 
 
+class AgendaProximosAPIView(APIView):
+    """
+    API View que retorna as próximas ocorrências concretas dos eventos da semana
+    (ex: "Culto de Ceia, domingo 19/10 às 19:00") para os próximos N dias.
+    Parâmetro opcional: ?dias=N (padrão 14, máximo 90).
+    """
+    def get(self, request, format=None):
+        try:
+            dias = int(request.query_params.get('dias', agenda.DIAS_PADRAO))
+        except ValueError:
+            return Response({"detail": "O parâmetro 'dias' deve ser um número inteiro."}, status=status.HTTP_400_BAD_REQUEST)
+        dias = max(1, min(dias, agenda.HORIZONTE_MAXIMO_DIAS))
+
+        def gerar():
+            ocorrencias, _ = agenda.obter_indice()
+            eventos_especiais = EventoEspecial.objects.vigentes(agenda.hoje_local())
+            return {
+                'fuso_horario': settings.TIME_ZONE,
+                'dias': dias,
+                'ocorrencias': agenda.ocorrencias_ate(ocorrencias, dias),
+                'eventos_especiais': EventoEspecialSerializer(eventos_especiais, many=True).data,
+            }
+
+        data, etag = home_cache.obter_ou_gerar(
+            'agenda', ('proximos', agenda.hoje_local().isoformat(), dias), gerar
+        )
+        return home_cache.responder(request, etag, lambda: Response(data))
+
+
+class AgendaICalAPIView(APIView):
+    """
+    Feed iCalendar (.ics) com as ocorrências dos próximos 90 dias e os eventos especiais, para assinatura
+    em Google Agenda, Apple Calendário, Outlook etc. Suporta If-None-Match.
+    """
+    def get(self, request, format=None):
+        dominio = request.get_host().split(':')[0]
+
+        def gerar():
+            ocorrencias, _ = agenda.obter_indice()
+            eventos_especiais = EventoEspecial.objects.vigentes(agenda.hoje_local()).filter(data_inicio__isnull=False)
+            return agenda.gerar_ical(ocorrencias, dominio, eventos_especiais)
+
+        conteudo, etag = home_cache.obter_ou_gerar(
+            'agenda', ('ical', agenda.hoje_local().isoformat(), dominio), gerar
+        )
+        def construir():
+            response = HttpResponse(conteudo, content_type='text/calendar; charset=utf-8')
+            response['Content-Disposition'] = 'inline; filename="agenda.ics"'
+            return response
+
+        return home_cache.responder(request, etag, construir)
+
+
+class HistoriaAPIView(APIView):
+    """
+    API View da página de história: galeria de pastores e memorial, já ordenados,
+    com as URLs das fotos em tamanho original e nas variantes reduzidas.
+    """
+    def get(self, request, format=None):
+        def gerar():
+            contexto = {'request': request}
+            return {
+                'pastores': PastorSerializer(Pastor.objects.all(), many=True, context=contexto).data,
+                'memorial': MemorialSerializer(Memorial.objects.all(), many=True, context=contexto).data,
+            }
+
+        data, etag = home_cache.obter_ou_gerar('historia', (request.build_absolute_uri('/'),), gerar)
+        return home_cache.responder(request, etag, lambda: Response(data))
+
+
+class AlteracoesAPIView(APIView):
+    """
+    API View de sincronização incremental do conteúdo público.
+    GET /api/changes/ devolve tudo e um token; GET /api/changes/?since=<token> devolve
+    apenas o que foi criado, alterado ou excluído desde aquele token.
+    """
+    def get(self, request, format=None):
+        token = request.query_params.get('since')
+        desde = None
+        if token:
+            try:
+                desde = sincronizacao.ler_token(token)
+            except sincronizacao.TokenInvalido as erro:
+                return Response({"detail": str(erro)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(sincronizacao.alteracoes_desde(desde, request))
+
 
 class DevocionalListView(generics.ListAPIView):
     """
-    View de API para listar todas as devocionais, ordenadas pela mais recente.
+    View de API para listar todas as devocionais publicadas, ordenadas pela mais recente.
+    Devocionais agendadas (data futura) só aparecem quando chegar a hora.
+    Com ?formato=resumo retorna apenas as prévias (resumo e tempo de leitura), sem o texto completo;
+    com ?html=1 o texto completo vem em HTML (conteudo_html) no lugar do texto puro.
     Este endpoint é público.
     """
-    queryset = Devocional.objects.all().order_by('-data_publicacao')
-    serializer_class = DevocionalSerializer
-    permission_classes = [AllowAny]
\ No newline at end of file
+    permission_classes = [AllowAny]
+
+    def formato_resumo(self):
+        return self.request.query_params.get('formato') == 'resumo'
+
+    def get_serializer_class(self):
+        if self.formato_resumo():
+            return DevocionalResumoSerializer
+        return _serializer_devocional(self.request)
+
+    def get_queryset(self):
+        if self.formato_resumo():
+            # Não lê as colunas grandes (conteudo e conteudo_html) do banco
+            return (
+                Devocional.objects.publicados().order_by('-data_publicacao')
+                .only(*DevocionalResumoSerializer.campos_banco)
+            )
+        return _devocionais_completas(self.request).order_by('-data_publicacao')
+
+    def list(self, request, *args, **kwargs):
+        def gerar():
+            queryset = self.filter_queryset(self.get_queryset())
+            return self.get_serializer(queryset, many=True).data
+
+        if self.formato_resumo():
+            formato = 'resumo'
+        else:
+            formato = 'html' if _formato_html(request) else 'completo'
+        data, etag = home_cache.obter_ou_gerar(
+            'devocionais', ('lista', formato, request.build_absolute_uri('/')), gerar,
+            timeout=_validade_devocionais,
+        )
+        return home_cache.responder(request, etag, lambda: Response(data))
\ No newline at end of file
@@ -0,0 +1,86 @@
+# home/visualizacoes.py
+
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.db import DatabaseError, connections
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+
+from .models import Devocional
+
+logger = logging.getLogger(__name__)
+
+# O buffer é gravado por uma thread do worker quando acumula tantas leituras ou passa tanto tempo
+LIMITE_BUFFER = 200
+INTERVALO_DESCARGA = 30  # segundos
+
+_buffer = Counter()
+_trava = threading.Lock()
+_sinal = threading.Event()
+_thread = None
+
+
+def registrar_visualizacao(devocional_id):
+    """
+    Conta uma leitura em memória (sem tocar no banco). As contagens são gravadas
+    em lote por uma thread do worker (`descarregar`), fora da requisição do leitor.
+
+    O buffer só existe na memória do processo: ele é gravado no encerramento normal
+    do worker (atexit), mas um SIGKILL (ex: timeout do Gunicorn, OOM) perde as
+    leituras ainda não gravadas, no máximo LIMITE_BUFFER ou INTERVALO_DESCARGA segundos
+    delas. Para um contador de popularidade essa perda é aceitável.
+    """
+    with _trava:
+        _buffer[devocional_id] += 1
+        cheio = sum(_buffer.values()) >= LIMITE_BUFFER
+    _garantir_thread()
+    if cheio:
+        _sinal.set()
+
+
+def _garantir_thread():
+    global _thread
+    with _trava:
+        # Depois de um fork (ex: workers do Gunicorn) a thread do processo pai não existe no filho
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_trabalhar, name='visualizacoes', daemon=True)
+            _thread.start()
+
+
+def _trabalhar():
+    while True:
+        _sinal.wait(INTERVALO_DESCARGA)
+        _sinal.clear()
+        try:
+            descarregar()
+        finally:
+            # As conexões são por thread: fecha só as desta, para não segurar o banco entre descargas
+            connections.close_all()
+
+
+def descarregar():
+    """Grava todas as contagens pendentes com um único UPDATE."""
+    with _trava:
+        pendentes = dict(_buffer)
+        _buffer.clear()
+    if not pendentes:
+        return
+
+    incremento = Case(
+        *[When(pk=pk, then=Value(quantidade)) for pk, quantidade in pendentes.items()],
+        default=Value(0),
+        output_field=PositiveIntegerField(),
+    )
+    try:
+        # update() não altera atualizado_em nem dispara sinais: ler não conta como editar
+        Devocional.objects.filter(pk__in=pendentes).update(visualizacoes=F('visualizacoes') + incremento)
+    except DatabaseError:
+        logger.exception("Falha ao gravar as visualizações das devocionais; tentando de novo depois.")
+        with _trava:
+            _buffer.update(pendentes)
+
+
+# Não perde as contagens quando o worker é reciclado (max_requests do Gunicorn)
+atexit.register(descarregar)
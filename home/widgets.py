@@ -1,30 +1,21 @@
 # seu_app/widgets.py
 
-import os
 from django import forms
-from django.conf import settings
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
+from . import icones
+
 def get_icon_choices():
     """
-    Escaneia o diretório de ícones e retorna uma lista de tuplas
-    (nome_do_arquivo_sem_extensao, nome_do_arquivo_sem_extensao)
-    para ser usada como 'choices' em um formulário.
+    Retorna uma lista de tuplas (nome_do_arquivo_sem_extensao, nome_do_arquivo_sem_extensao)
+    para ser usada como 'choices' em um formulário. Usa o manifesto memorizado
+    dos ícones, sem varrer o diretório a cada formulário.
     """
-    icon_dir_path = os.path.join(settings.BASE_DIR, 'static', 'fotos', 'ícones', 'agenda')
-    choices = []
-
-    if not os.path.exists(icon_dir_path):
-        print(f"AVISO: O diretório de ícones não foi encontrado em '{icon_dir_path}'")
+    lista = icones.manifesto().icones
+    if not lista:
         return [('', 'Nenhum ícone encontrado')]
-
-    for filename in sorted(os.listdir(icon_dir_path)):
-        if filename.lower().endswith(('.png', '.svg', '.jpg', '.jpeg', '.gif')):
-            name_without_extension = os.path.splitext(filename)[0]
-            choices.append((name_without_extension, name_without_extension))
-            
-    return choices
+    return [(icone.nome, icone.nome) for icone in lista]
 
 class IconSelectorWidget(forms.RadioSelect):
     """
@@ -34,26 +25,29 @@ class IconSelectorWidget(forms.RadioSelect):
     def render(self, name, value, attrs=None, renderer=None):
         """Renderiza o widget como uma lista de ícones clicáveis."""
         
+        # Um único acesso ao manifesto para todas as opções
+        manifesto = icones.manifesto()
+
         # Inicia a construção do nosso layout visual
         final_html = '<div style="display: flex; flex-wrap: wrap; gap: 15px; margin-top: 10px;">'
         
         for i, choice in enumerate(self.choices):
             choice_value = choice[0]
-            
-            # Localiza a URL estática do ícone
-            static_url = None
-            icon_path_rel = os.path.join('fotos', 'ícones', 'agenda')
-            icon_dir_abs = os.path.join(settings.BASE_DIR, 'static', icon_path_rel)
-
-            if os.path.exists(icon_dir_abs):
-                for filename in os.listdir(icon_dir_abs):
-                    if os.path.splitext(filename)[0] == choice_value:
-                        static_url = os.path.join(settings.STATIC_URL, icon_path_rel, filename)
-                        break
+            icone = manifesto.por_nome.get(choice_value)
 
-            if static_url:
+            if icone:
                 is_checked = str(choice_value) == str(value)
                 radio_id = f'id_{name}_{i}'
+
+                if icone.posicao_sprite is not None:
+                    # Todos os ícones vêm do mesmo PNG: o navegador faz um único download
+                    imagem_html = format_html(
+                        '<span class="icon-selector-sprite" role="img" aria-label="{}" '
+                        'style="background-image: url(\'{}\'); background-position: -{}px 0;"></span>',
+                        choice[1], manifesto.sprite_url, icone.posicao_sprite,
+                    )
+                else:
+                    imagem_html = format_html('<img src="{}" alt="{}">', icone.url, choice[1])
                 
                 # *** CORREÇÃO PRINCIPAL AQUI ***
                 # Usamos <label> como o container principal para garantir o clique nativo.
@@ -63,7 +57,7 @@ class IconSelectorWidget(forms.RadioSelect):
                     <label class="icon-selector-label {selected_class}" data-group="{name}">
                         <input type="radio" name="{name}" value="{value}" id="{radio_id}" style="opacity:0; width:0; height:0; position:absolute;" {checked}>
                         <div class="icon-selector-content">
-                            <img src="{icon_url}" alt="{alt_text}">
+                            {imagem_html}
                             <span>{label_text}</span>
                         </div>
                     </label>
@@ -73,8 +67,7 @@ class IconSelectorWidget(forms.RadioSelect):
                     value=choice_value,
                     radio_id=radio_id,
                     checked='checked' if is_checked else '',
-                    icon_url=static_url,
-                    alt_text=choice[1],
+                    imagem_html=imagem_html,
                     label_text=choice[1]
                 )
 
@@ -104,6 +97,13 @@ class IconSelectorWidget(forms.RadioSelect):
                     display: block;
                     margin-bottom: 5px;
                 }}
+                .icon-selector-content .icon-selector-sprite {{
+                    width: {tamanho}px;
+                    height: {tamanho}px;
+                    display: block;
+                    margin-bottom: 5px;
+                    background-repeat: no-repeat;
+                }}
                 .icon-selector-content span {{
                     font-family: sans-serif;
                     font-size: 12px;
@@ -126,7 +126,7 @@ class IconSelectorWidget(forms.RadioSelect):
                     }});
                 }});
             </script>
-            """, name=name
+            """, name=name, tamanho=icones.TAMANHO_ICONE
         )
 
         return mark_safe(final_html + script_and_style)
\ No newline at end of file
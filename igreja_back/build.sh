@@ -8,6 +8,12 @@ pip install -r requirements.txt
 # Apply database migrations
 python manage.py migrate
 
+# Publish the public API content as static JSON (collected just below)
+python manage.py publicar_conteudo --sem-collectstatic
+
+# Sprite of the agenda icons used by the admin icon selector
+python manage.py gerar_sprite_icones
+
 # Collect static files
 python manage.py collectstatic --no-input
 
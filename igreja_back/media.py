@@ -0,0 +1,209 @@
+# igreja_back/media.py
+
+import mimetypes
+import os
+import posixpath
+import re
+import time
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+SALT_ASSINATURA = 'igreja_back.media.assinatura'
+
+# Os nomes dos uploads não carregam hash do conteúdo e as variantes são regeneradas
+# com o mesmo nome, então o cache público é curto e depois o navegador revalida
+# com If-None-Match/If-Modified-Since (304 barato, ver `servir_media`)
+CACHE_PUBLICO_SEGUNDOS = 60 * 60
+
+re_intervalo = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+# --- URLS ASSINADAS PARA ARQUIVOS PRIVADOS ---
+
+def eh_privado(caminho):
+    """Indica se o arquivo de mídia só pode ser acessado com uma URL assinada (ex: fotos de perfil)."""
+    return caminho.startswith(tuple(settings.MEDIA_PRIVADA_PREFIXOS))
+
+
+def _assinatura(caminho, expira):
+    return salted_hmac(SALT_ASSINATURA, f"{caminho}:{expira}", algorithm='sha256').hexdigest()
+
+
+def assinar(caminho):
+    """
+    Gera os parâmetros (exp, sig) de uma URL assinada para o caminho.
+    A expiração é arredondada para uma janela fixa, então a URL fica estável
+    por alguns minutos e o navegador consegue reaproveitar a imagem em cache.
+    """
+    janela = settings.MEDIA_ASSINATURA_JANELA
+    expira = (int(time.time()) + settings.MEDIA_ASSINATURA_VALIDADE) // janela * janela + janela
+    return {'exp': expira, 'sig': _assinatura(caminho, expira)}
+
+
+def assinatura_valida(caminho, expira, assinatura):
+    """Confere a assinatura e a validade sem nenhuma consulta ao banco de dados."""
+    try:
+        expira = int(expira)
+    except (TypeError, ValueError):
+        return False
+    if expira < time.time():
+        return False
+    return constant_time_compare(assinatura or '', _assinatura(caminho, expira))
+
+
+class MediaStorage(FileSystemStorage):
+    """
+    Storage padrão dos uploads. Para arquivos privados (settings.MEDIA_PRIVADA_PREFIXOS),
+    `.url` já devolve uma URL assinada de curta duração, então os serializers e o admin
+    continuam usando `obj.foto_perfil.url` normalmente.
+    """
+
+    def url(self, name):
+        url = super().url(name)
+        if name and eh_privado(name):
+            url = f"{url}?{urlencode(assinar(name))}"
+        return url
+
+
+# --- VIEW QUE SERVE OS ARQUIVOS DE MÍDIA ---
+
+def _etag_arquivo(estado):
+    return '"%x-%x"' % (int(estado.st_mtime), estado.st_size)
+
+
+def _intervalo_solicitado(request, etag, modificado_em, tamanho):
+    """
+    Interpreta o cabeçalho Range. Retorna None para servir o arquivo inteiro,
+    (inicio, fim) para um intervalo válido ou False se o intervalo não pode ser atendido.
+    Apenas um intervalo por requisição é suportado, como na maioria dos servidores.
+    """
+    cabecalho = request.META.get('HTTP_RANGE', '').strip()
+    if not cabecalho:
+        return None
+
+    # If-Range: só atende o intervalo se o arquivo não mudou desde a cópia do cliente
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if if_range:
+        data_if_range = parse_http_date_safe(if_range)
+        if if_range != etag and (data_if_range is None or data_if_range < int(modificado_em)):
+            return None
+
+    correspondencia = re_intervalo.match(cabecalho)
+    if not correspondencia:
+        return None
+    inicio, fim = correspondencia.groups()
+    if not inicio and not fim:
+        return None
+
+    if not inicio:
+        # Sufixo: "bytes=-500" são os últimos 500 bytes
+        quantidade = int(fim)
+        if quantidade == 0:
+            return False
+        return max(0, tamanho - quantidade), tamanho - 1
+
+    inicio = int(inicio)
+    fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio >= tamanho or inicio > fim:
+        return False
+    return inicio, fim
+
+
+def _ler_intervalo(arquivo, inicio, fim, bloco=64 * 1024):
+    arquivo.seek(inicio)
+    restante = fim - inicio + 1
+    while restante > 0:
+        dados = arquivo.read(min(bloco, restante))
+        if not dados:
+            break
+        restante -= len(dados)
+        yield dados
+
+
+def _aplicar_cache(response, privado):
+    if privado:
+        patch_cache_control(response, private=True, max_age=settings.MEDIA_ASSINATURA_VALIDADE)
+    else:
+        patch_cache_control(response, public=True, max_age=CACHE_PUBLICO_SEGUNDOS)
+    return response
+
+
+@require_safe
+def servir_media(request, caminho):
+    """
+    Serve os arquivos de MEDIA_ROOT em produção.
+
+    - Arquivos privados exigem uma URL assinada válida (ver `assinar`).
+    - Responde a If-None-Match/If-Modified-Since com 304 e a Range com 206.
+    - Com MEDIA_SERVIDOR = 'nginx' ou 'apache', a transferência é delegada ao servidor
+      web via X-Accel-Redirect/X-Sendfile; com 'python' o arquivo é entregue por
+      FileResponse, que o Gunicorn transmite com sendfile (cópia zero).
+    """
+    caminho = posixpath.normpath(caminho).lstrip('/')
+    try:
+        caminho_absoluto = safe_join(settings.MEDIA_ROOT, caminho)
+    except SuspiciousFileOperation:
+        raise Http404("Arquivo não encontrado.")
+
+    privado = eh_privado(caminho)
+    if privado and not assinatura_valida(caminho, request.GET.get('exp'), request.GET.get('sig')):
+        return HttpResponse("Link expirado ou inválido.", status=403, content_type='text/plain; charset=utf-8')
+
+    try:
+        estado = os.stat(caminho_absoluto)
+    except OSError:
+        raise Http404("Arquivo não encontrado.")
+    if not os.path.isfile(caminho_absoluto):
+        raise Http404("Arquivo não encontrado.")
+
+    etag = _etag_arquivo(estado)
+    nao_modificada = get_conditional_response(request, etag=etag, last_modified=int(estado.st_mtime))
+    if nao_modificada is not None:
+        nao_modificada['ETag'] = etag
+        return _aplicar_cache(nao_modificada, privado)
+
+    tipo_conteudo = mimetypes.guess_type(caminho_absoluto)[0] or 'application/octet-stream'
+
+    servidor = settings.MEDIA_SERVIDOR
+    if servidor in ('nginx', 'apache'):
+        # O servidor web cuida de Range e da transferência em si
+        response = HttpResponse(content_type=tipo_conteudo)
+        if servidor == 'nginx':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIXO + quote(caminho)
+        else:
+            response['X-Sendfile'] = caminho_absoluto
+    else:
+        intervalo = _intervalo_solicitado(request, etag, estado.st_mtime, estado.st_size)
+        if intervalo is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{estado.st_size}'
+            return response
+
+        arquivo = open(caminho_absoluto, 'rb')
+        if intervalo is None:
+            response = FileResponse(arquivo, content_type=tipo_conteudo)
+        else:
+            inicio, fim = intervalo
+            if fim == estado.st_size - 1:
+                # Intervalo até o fim do arquivo: posiciona e deixa o sendfile transmitir o resto
+                arquivo.seek(inicio)
+                response = FileResponse(arquivo, content_type=tipo_conteudo, status=206)
+            else:
+                response = FileResponse(_ler_intervalo(arquivo, inicio, fim), content_type=tipo_conteudo, status=206)
+                response._resource_closers.append(arquivo.close)
+                response['Content-Length'] = fim - inicio + 1
+            response['Content-Range'] = f'bytes {inicio}-{fim}/{estado.st_size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(estado.st_mtime)
+    return _aplicar_cache(response, privado)
@@ -0,0 +1,122 @@
+# igreja_back/middleware.py
+
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Sem Brotli instalado, a compressão cai para gzip
+
+# Tipos de conteúdo que valem a pena comprimir (as imagens já são comprimidas)
+TIPOS_COMPRIMIVEIS = getattr(settings, 'COMPRESSAO_TIPOS', (
+    'application/json',
+    'text/calendar',
+    'text/csv',
+))
+# Respostas menores que isso não compensam o custo de comprimir
+TAMANHO_MINIMO = getattr(settings, 'COMPRESSAO_TAMANHO_MINIMO', 1024)
+# Tempo que os bytes comprimidos de uma resposta com ETag ficam no cache
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def escolher_codificacao(accept_encoding):
+    """
+    Escolhe a melhor codificação aceita pelo cliente de acordo com o cabeçalho
+    Accept-Encoding (respeitando os valores de q). Brotli tem preferência em caso de empate.
+    Retorna 'br', 'gzip' ou None.
+    """
+    preferencias = {}
+    for item in accept_encoding.split(','):
+        partes = item.strip().split(';')
+        nome = partes[0].strip().lower()
+        if not nome:
+            continue
+        qualidade = 1.0
+        for parametro in partes[1:]:
+            chave, _, valor = parametro.strip().partition('=')
+            if chave.strip().lower() == 'q':
+                try:
+                    qualidade = float(valor)
+                except ValueError:
+                    qualidade = 0.0
+        preferencias[nome] = qualidade
+
+    candidatas = ('br', 'gzip') if brotli is not None else ('gzip',)
+    melhor, melhor_qualidade = None, 0.0
+    for codificacao in candidatas:
+        qualidade = preferencias.get(codificacao, preferencias.get('*', 0.0))
+        if qualidade > melhor_qualidade:
+            melhor, melhor_qualidade = codificacao, qualidade
+    return melhor
+
+
+def comprimir(conteudo, codificacao, maximo=False):
+    """
+    Comprime os bytes com a codificação escolhida. Com `maximo=True` usa o nível
+    mais alto, pois o resultado será guardado no cache e reaproveitado.
+    """
+    if codificacao == 'br':
+        return brotli.compress(conteudo, quality=11 if maximo else 5)
+    return gzip.compress(conteudo, compresslevel=9 if maximo else 6, mtime=0)
+
+
+class CompressaoMiddleware(MiddlewareMixin):
+    """
+    Comprime com Brotli ou gzip as respostas JSON (e outros tipos textuais)
+    acima de um tamanho mínimo, conforme o Accept-Encoding do cliente.
+
+    Respostas com ETag forte (ex: as respostas cacheadas de home/cache.py) têm
+    os bytes comprimidos guardados no cache, indexados pela ETag, para que um
+    conteúdo popular seja comprimido uma única vez e não a cada requisição.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.status_code != 200:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return response
+
+        tipo = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if tipo not in TIPOS_COMPRIMIVEIS or len(response.content) < TAMANHO_MINIMO:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        codificacao = escolher_codificacao(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if codificacao is None:
+            return response
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            identificador = hashlib.md5(
+                f"{etag}|{tipo}|{len(response.content)}".encode('utf-8')
+            ).hexdigest()
+            chave_cache = f"compressao:{codificacao}:{identificador}"
+            comprimido = cache.get(chave_cache)
+            if comprimido is None:
+                comprimido = comprimir(response.content, codificacao, maximo=True)
+                cache.set(chave_cache, comprimido, CACHE_TIMEOUT)
+            # A representação comprimida não é idêntica byte a byte: a ETag vira fraca
+            # (RFC 9110, seção 8.8.1), o que ainda permite os 304 por comparação fraca.
+            response.headers['ETag'] = 'W/' + etag
+        else:
+            comprimido = comprimir(response.content, codificacao)
+
+        # Só vale a pena se ficou realmente menor
+        if len(comprimido) >= len(response.content):
+            if etag:
+                response.headers['ETag'] = etag
+            return response
+
+        response.content = comprimido
+        response.headers['Content-Length'] = str(len(comprimido))
+        response.headers['Content-Encoding'] = codificacao
+        return response
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -26,6 +27,9 @@ SECRET_KEY = os.environ.get('SECRET_KEY', 'NaoDeveSerUsadaDeVerdade!@#')
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
 
+# URL pública do backend, usada quando não há um request (ex: publicar_conteudo)
+SITE_URL = os.environ.get('SITE_URL', 'https://igreja-backend.onrender.com')
+
 ALLOWED_HOSTS = [
     'localhost',
     '127.0.0.1',
@@ -55,6 +59,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'igreja_back.middleware.CompressaoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -65,6 +70,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Compressão das respostas da API (ver igreja_back/middleware.py)
+COMPRESSAO_TAMANHO_MINIMO = 1024  # bytes
+COMPRESSAO_TIPOS = ('application/json', 'text/calendar', 'text/csv')
+
 ROOT_URLCONF = 'igreja_back.urls'
 
 TEMPLATES = [
@@ -106,6 +115,40 @@ else:
     }
 
 
+# Cache
+# O cache precisa ser compartilhado entre os workers do Gunicorn para que a
+# invalidação feita por um worker valha para todos.
+
+if 'REDIS_URL' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    # O limite padrão (300 entradas) seria atingido só com as versões dos namespaces,
+    # os usuários do JWT e as respostas comprimidas. Quando o limite estoura, o Django
+    # apaga um terço dos arquivos; uma versão apagada volta com um valor novo (ver
+    # home/cache.py), o que equivale a uma invalidação.
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, '.cache')),
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        }
+    }
+
+# Os testes (manage.py test) usam um cache em memória, novo a cada execução, em vez
+# do diretório compartilhado com o servidor de desenvolvimento
+if sys.argv[1:2] == ['test']:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -143,11 +186,31 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# A partir do Django 5.1 o antigo STATICFILES_STORAGE é ignorado: os storages
+# precisam ser declarados aqui.
+STORAGES = {
+    'default': {
+        'BACKEND': 'igreja_back.media.MediaStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Entrega dos arquivos de mídia em produção (ver igreja_back/media.py)
+# 'python' = FileResponse com sendfile; 'nginx' = X-Accel-Redirect; 'apache' = X-Sendfile
+MEDIA_SERVIDOR = os.environ.get('MEDIA_SERVIDOR', 'python')
+# Location "internal" do nginx que aponta para MEDIA_ROOT
+MEDIA_ACCEL_PREFIXO = '/media-interna/'
+# Uploads com dados pessoais: só acessíveis por URL assinada
+MEDIA_PRIVADA_PREFIXOS = ('perfil_fotos/',)
+MEDIA_ASSINATURA_VALIDADE = 15 * 60  # segundos
+MEDIA_ASSINATURA_JANELA = 5 * 60  # a URL assinada se mantém estável dentro dessa janela
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -163,7 +226,8 @@ AUTH_USER_MODEL = 'usuarios.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT sem consulta ao banco a cada requisição (usuário memorizado por worker)
+        'usuarios.autenticacao.JWTAutenticacaoEmCache',
     ),
     # para habilitar os filtros globalmente
     'DEFAULT_FILTER_BACKENDS': [
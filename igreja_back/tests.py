@@ -0,0 +1,199 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import brotli
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from home.models import Devocional
+
+from .media import _assinatura, assinar, servir_media
+from .middleware import CompressaoMiddleware, escolher_codificacao
+
+CORPO_GRANDE = json.dumps([{'titulo': f'Devocional {indice}', 'texto': 'palavra ' * 20} for indice in range(50)])
+
+
+class EscolherCodificacaoTests(SimpleTestCase):
+    def test_prefere_brotli_em_caso_de_empate(self):
+        self.assertEqual(escolher_codificacao('gzip, deflate, br'), 'br')
+
+    def test_respeita_os_valores_de_q(self):
+        self.assertEqual(escolher_codificacao('br;q=0.5, gzip;q=0.8'), 'gzip')
+        self.assertEqual(escolher_codificacao('br;q=0, gzip'), 'gzip')
+        self.assertEqual(escolher_codificacao('*;q=0.3'), 'br')
+
+    def test_sem_codificacao_aceita(self):
+        self.assertIsNone(escolher_codificacao(''))
+        self.assertIsNone(escolher_codificacao('identity'))
+        self.assertIsNone(escolher_codificacao('gzip;q=0, br;q=0'))
+
+
+class CompressaoMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.fabrica = RequestFactory()
+
+    def processar(self, response, accept_encoding='gzip, br'):
+        request = self.fabrica.get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressaoMiddleware(lambda request: response)(request)
+
+    def json(self, corpo=CORPO_GRANDE, **cabecalhos):
+        response = HttpResponse(corpo, content_type='application/json')
+        for nome, valor in cabecalhos.items():
+            response[nome] = valor
+        return response
+
+    def test_brotli(self):
+        response = self.processar(self.json())
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content).decode(), CORPO_GRANDE)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_gzip(self):
+        response = self.processar(self.json(), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), CORPO_GRANDE)
+
+    def test_identidade_ainda_varia_pelo_accept_encoding(self):
+        response = self.processar(self.json(), 'identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content.decode(), CORPO_GRANDE)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_nao_comprime_respostas_pequenas_streaming_ou_de_outros_tipos(self):
+        pequena = self.processar(self.json('{"ok": true}'))
+        self.assertFalse(pequena.has_header('Content-Encoding'))
+        self.assertFalse(pequena.has_header('Vary'))
+
+        streaming = self.processar(StreamingHttpResponse(iter([CORPO_GRANDE.encode()]), content_type='text/csv'))
+        self.assertFalse(streaming.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(streaming.streaming_content).decode(), CORPO_GRANDE)
+
+        html = self.processar(HttpResponse(CORPO_GRANDE, content_type='text/html'))
+        self.assertFalse(html.has_header('Content-Encoding'))
+
+    def test_etag_forte_vira_fraca_e_os_bytes_ficam_no_cache(self):
+        primeira = self.processar(self.json(ETag='"abc"'))
+        self.assertEqual(primeira['ETag'], 'W/"abc"')
+        # Mesmo ETag: os bytes comprimidos vêm do cache, não do corpo atual
+        segunda = self.processar(self.json(CORPO_GRANDE.replace('palavra', 'PALAVRA'), ETag='"abc"'))
+        self.assertEqual(segunda.content, primeira.content)
+
+
+class CompressaoRevalidacaoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ontem = timezone.now() - timezone.timedelta(days=1)
+        for indice in range(5):
+            Devocional.objects.create(
+                titulo=f'Devocional {indice}', autor='Pastor', conteudo='palavra ' * 300, data_publicacao=ontem,
+            )
+
+    def test_etag_fraca_revalida_com_304(self):
+        url = reverse('api-devocional-list')
+        resposta = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(resposta['Content-Encoding'], 'gzip')
+        etag = resposta['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+
+        revalidacao = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(revalidacao.status_code, 304)
+        self.assertEqual(revalidacao.content, b'')
+
+        # A ETag forte da versão sem compressão também vale (comparação fraca)
+        identidade = self.client.get(url, HTTP_IF_NONE_MATCH=etag[2:])
+        self.assertEqual(identidade.status_code, 304)
+
+
+class ServirMediaTests(SimpleTestCase):
+    CONTEUDO = b'0123456789'
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta)
+        self.media_root = os.path.join(self.pasta, 'media')
+        for caminho in ('galeria/foto.jpg', 'perfil_fotos/foto.jpg'):
+            os.makedirs(os.path.dirname(os.path.join(self.media_root, caminho)), exist_ok=True)
+            with open(os.path.join(self.media_root, caminho), 'wb') as arquivo:
+                arquivo.write(self.CONTEUDO)
+        # Arquivo fora de MEDIA_ROOT, que não pode ser alcançado pela URL
+        with open(os.path.join(self.pasta, 'segredo.txt'), 'wb') as arquivo:
+            arquivo.write(b'segredo')
+        configuracao = override_settings(MEDIA_ROOT=self.media_root, MEDIA_SERVIDOR='python')
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def obter(self, caminho, **extra):
+        response = self.client.get(f'/media/{caminho}', **extra)
+        self.addCleanup(response.close)
+        return response
+
+    def corpo(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_arquivo_publico_tem_cache_curto_e_sem_immutable(self):
+        response = self.obter('galeria/foto.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.corpo(response), self.CONTEUDO)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=3600', response['Cache-Control'])
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+        revalidacao = self.obter('galeria/foto.jpg', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidacao.status_code, 304)
+
+    def test_intervalos(self):
+        response = self.obter('galeria/foto.jpg', HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.corpo(response), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+
+        sufixo = self.obter('galeria/foto.jpg', HTTP_RANGE='bytes=-3')
+        self.assertEqual(sufixo.status_code, 206)
+        self.assertEqual(self.corpo(sufixo), b'789')
+        self.assertEqual(sufixo['Content-Range'], 'bytes 7-9/10')
+
+        # If-Range com uma ETag antiga: o cliente recebe o arquivo inteiro
+        desatualizado = self.obter('galeria/foto.jpg', HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"antiga"')
+        self.assertEqual(desatualizado.status_code, 200)
+        self.assertEqual(self.corpo(desatualizado), self.CONTEUDO)
+
+    def test_intervalo_fora_do_arquivo_responde_416(self):
+        for intervalo in ('bytes=10-', 'bytes=5-2', 'bytes=-0'):
+            with self.subTest(intervalo=intervalo):
+                response = self.obter('galeria/foto.jpg', HTTP_RANGE=intervalo)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_arquivo_privado_exige_assinatura_valida(self):
+        caminho = 'perfil_fotos/foto.jpg'
+        self.assertEqual(self.obter(caminho).status_code, 403)
+
+        response = self.obter(caminho, data=assinar(caminho))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+        # Assinatura correta, mas já expirada
+        expirou = int(time.time()) - 1
+        expirada = self.obter(caminho, data={'exp': expirou, 'sig': _assinatura(caminho, expirou)})
+        self.assertEqual(expirada.status_code, 403)
+
+        # Assinatura de outro arquivo não vale para este
+        outra = self.obter(caminho, data=assinar('perfil_fotos/outra.jpg'))
+        self.assertEqual(outra.status_code, 403)
+
+    def test_caminho_fora_de_media_root(self):
+        request = RequestFactory().get('/media/')
+        for caminho in ('../segredo.txt', 'galeria/../../segredo.txt', '/../segredo.txt'):
+            with self.subTest(caminho=caminho):
+                with self.assertRaises(Http404):
+                    servir_media(request, caminho)
+        self.assertEqual(self.obter('%2e%2e/segredo.txt').status_code, 404)
@@ -1,9 +1,10 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from usuarios.views import MyTokenObtainPairView
 from rest_framework_simplejwt.views import TokenRefreshView
+from igreja_back.media import servir_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -15,6 +16,10 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
 
+# Arquivos de mídia (uploads), em desenvolvimento e em produção
+urlpatterns += [
+    re_path(r'^%s(?P<caminho>.+)$' % settings.MEDIA_URL.lstrip('/'), servir_media, name='media'),
+]
+
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0])
\ No newline at end of file
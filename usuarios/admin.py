@@ -2,7 +2,9 @@
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Filho, ModeloDocumento
+from .models import User, Filho, ModeloDocumento, RegistroAuditoria, Curso, Matricula, SolicitacaoCertificado
+from . import aniversariantes, auditoria, estatisticas, relatorios
+from .autenticacao import invalidar_usuarios
 
 class FilhoInline(admin.TabularInline):
     """
@@ -94,11 +96,27 @@ class UserAdmin(BaseUserAdmin):
     
     # Ações personalizadas
     actions = ['aprovar_usuarios', 'desaprovar_usuarios', 'ativar_usuarios', 'desativar_usuarios']
+
+    def _atualizar_em_lote(self, request, queryset, acao, **valores):
+        """update() das colunas, com um registro de auditoria por usuário e a invalidação dos caches."""
+        usuarios = list(queryset.only('pk', 'nome_completo', 'username', *valores))
+        atualizados = queryset.update(**valores)
+        depois = auditoria.capturar(User(**valores), valores)
+        auditoria.registrar_varios(acao, request.user, usuarios, {
+            user.pk: auditoria.diferencas(auditoria.capturar(user, valores), depois) for user in usuarios
+        }, origem='admin')
+        # update() não dispara os sinais
+        estatisticas.invalidar()
+        relatorios.invalidar()
+        aniversariantes.invalidar()
+        invalidar_usuarios([user.pk for user in usuarios])
+        return atualizados
     
     def aprovar_usuarios(self, request, queryset):
         """Aprovar usuários selecionados"""
         from django.utils import timezone
-        updated = queryset.update(
+        updated = self._atualizar_em_lote(
+            request, queryset, 'aprovar',
             aprovado=True, 
             aprovado_por=request.user, 
             data_aprovacao=timezone.now()
@@ -108,7 +126,8 @@ class UserAdmin(BaseUserAdmin):
     
     def desaprovar_usuarios(self, request, queryset):
         """Desaprovar usuários selecionados"""
-        updated = queryset.update(
+        updated = self._atualizar_em_lote(
+            request, queryset, 'desaprovar',
             aprovado=False, 
             aprovado_por=None, 
             data_aprovacao=None
@@ -118,16 +137,74 @@ class UserAdmin(BaseUserAdmin):
     
     def ativar_usuarios(self, request, queryset):
         """Ativar usuários selecionados"""
-        updated = queryset.update(ativo=True)
+        updated = self._atualizar_em_lote(request, queryset, 'ativar', ativo=True)
         self.message_user(request, f'{updated} usuário(s) ativado(s) com sucesso.')
     ativar_usuarios.short_description = "Ativar usuários selecionados"
     
     def desativar_usuarios(self, request, queryset):
         """Desativar usuários selecionados"""
-        updated = queryset.update(ativo=False)
+        updated = self._atualizar_em_lote(request, queryset, 'desativar', ativo=False)
         self.message_user(request, f'{updated} usuário(s) desativado(s) com sucesso.')
     desativar_usuarios.short_description = "Desativar usuários selecionados"
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        alteracoes = auditoria.diferencas_formulario(form)
+        if alteracoes or not change:
+            auditoria.registrar('editar' if change else 'criar', request.user, obj, alteracoes, origem='admin')
+
+    def delete_model(self, request, obj):
+        auditoria.registrar('excluir', request.user, obj, origem='admin')
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        auditoria.registrar_varios('excluir', request.user, list(queryset.only('pk', 'nome_completo', 'username')), origem='admin')
+        super().delete_queryset(request, queryset)
+
+
+@admin.register(RegistroAuditoria)
+class RegistroAuditoriaAdmin(admin.ModelAdmin):
+    """Registro de auditoria: somente leitura, ninguém cria, altera ou exclui pelo painel."""
+    list_display = ('criado_em', 'acao', 'ator_nome', 'alvo_nome', 'origem')
+    list_filter = ('acao', 'origem', 'criado_em')
+    search_fields = ('ator_nome', 'alvo_nome')
+    date_hierarchy = 'criado_em'
+    readonly_fields = ('criado_em', 'acao', 'origem', 'ator', 'ator_nome', 'alvo', 'alvo_nome', 'alteracoes')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(Curso)
+class CursoAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'professor', 'carga_horaria', 'ativo', 'data_criacao')
+    list_filter = ('ativo',)
+    search_fields = ('nome', 'professor__nome_completo')
+    list_select_related = ('professor',)
+
+
+@admin.register(Matricula)
+class MatriculaAdmin(admin.ModelAdmin):
+    list_display = ('aluno', 'curso', 'data_matricula', 'concluido', 'nota_final')
+    list_filter = ('concluido', 'curso')
+    search_fields = ('aluno__nome_completo', 'curso__nome')
+    list_select_related = ('aluno', 'curso')
+    raw_id_fields = ('aluno',)
+
+
+@admin.register(SolicitacaoCertificado)
+class SolicitacaoCertificadoAdmin(admin.ModelAdmin):
+    list_display = ('aluno', 'curso', 'professor', 'status', 'data_solicitacao', 'data_aprovacao')
+    list_filter = ('status', 'curso')
+    search_fields = ('aluno__nome_completo', 'curso__nome')
+    list_select_related = ('aluno', 'curso', 'professor')
+    raw_id_fields = ('aluno', 'professor', 'aprovado_por')
+
 # --- ESTA É A NOVA PARTE ADICIONADA PARA GERENCIAR OS DOCUMENTOS ---
 @admin.register(ModeloDocumento)
 class ModeloDocumentoAdmin(admin.ModelAdmin):
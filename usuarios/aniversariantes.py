@@ -0,0 +1,136 @@
+# usuarios/aniversariantes.py
+
+import calendar
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from home import cache as home_cache
+
+from .models import Filho, User
+
+# Namespace de cache invalidado a cada alteração de usuário ou filho (ver usuarios/signals.py)
+NAMESPACE = 'usuarios_aniversariantes'
+
+# Datas comemoradas: (chave na resposta, campo de data, campo MMDD indexado)
+COMEMORACOES = [
+    ('nascimento', 'data_nascimento', 'nascimento_mes_dia'),
+    ('casamento', 'data_casamento', 'casamento_mes_dia'),
+    ('batismo', 'data_batismo', 'batismo_mes_dia'),
+]
+
+
+def invalidar():
+    """Descarta os aniversariantes em cache. Chame depois de update()/bulk_create(), que não disparam sinais."""
+    home_cache.invalidar(NAMESPACE)
+
+
+def ler_mes_dia(texto):
+    """Aceita 'MM-DD', 'AAAA-MM-DD' ou 'DD/MM' e devolve a chave MMDD. Levanta ValueError se inválido."""
+    texto = texto.strip()
+    if '/' in texto:
+        dia, mes = texto.split('/')[:2]
+    else:
+        mes, dia = texto.split('-')[-2:]
+    data = date(2000, int(mes), int(dia))  # 2000 é bissexto: 29/02 é válido
+    return data.month * 100 + data.day
+
+
+def intervalo_padrao(hoje):
+    """O mês corrente inteiro: (MM01, último dia do mês)."""
+    proximo_mes = (hoje.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return hoje.month * 100 + 1, hoje.month * 100 + (proximo_mes - timedelta(days=1)).day
+
+
+def filtro_intervalo(campo, de, ate):
+    """
+    Intervalo de chaves MMDD. Quando vira o ano (ex: 12-20 a 01-10) são duas faixas,
+    e cada uma continua sendo uma busca por intervalo no índice.
+    """
+    if de <= ate:
+        return Q(**{f'{campo}__gte': de, f'{campo}__lte': ate})
+    return Q(**{f'{campo}__gte': de}) | Q(**{f'{campo}__lte': ate})
+
+
+def _ocorrencia(data, ano):
+    try:
+        return data.replace(year=ano)
+    except ValueError:
+        return date(ano, 2, 28)  # 29/02 em ano não bissexto
+
+
+def _item(pk, nome, data, chave, de, ano_inicio):
+    ano = ano_inicio + 1 if chave < de else ano_inicio
+    ocorrencia = _ocorrencia(data, ano)
+    return {
+        'id': pk,
+        'nome_completo': nome,
+        'data': data,
+        'dia': ocorrencia,
+        'anos': ocorrencia.year - data.year,
+    }
+
+
+def gerar(de, ate, hoje):
+    # Intervalo que vira o ano e já está na parte de janeiro: começou no ano passado
+    ano_inicio = hoje.year
+    if de > ate and hoje.month * 100 + hoje.day <= ate:
+        ano_inicio -= 1
+
+    # Em ano não bissexto, quem faz aniversário em 29/02 comemora em 28/02
+    # (ex: o intervalo padrão de fevereiro de 2027 é 0201 a 0228)
+    rotulo_ate = ate
+    ano_fevereiro = ano_inicio + 1 if de > ate else ano_inicio
+    if ate == 228 and not calendar.isleap(ano_fevereiro):
+        ate = 229
+
+    usuarios = User.objects.filter(aprovado=True, ativo=True)
+    resultado = {}
+    for chave_resposta, campo_data, campo_chave in COMEMORACOES:
+        linhas = (
+            usuarios.filter(filtro_intervalo(campo_chave, de, ate))
+            .values_list('pk', 'nome_completo', campo_data, campo_chave)
+            .order_by()  # a ordenação padrão (nome) faria o banco varrer o índice de nomes
+        )
+        itens = [_item(*linha, de, ano_inicio) for linha in linhas]
+        resultado[chave_resposta] = sorted(itens, key=lambda item: (item['dia'], item['nome_completo']))
+
+    filhos = []
+    linhas = (
+        Filho.objects.filter(filtro_intervalo('nascimento_mes_dia', de, ate), user__aprovado=True, user__ativo=True)
+        .values_list('pk', 'nome_completo', 'data_nascimento', 'nascimento_mes_dia', 'user_id', 'user__nome_completo')
+        .order_by()
+    )
+    for pk, nome, data, chave, user_id, nome_responsavel in linhas:
+        item = _item(pk, nome, data, chave, de, ano_inicio)
+        item['responsavel'] = {'id': user_id, 'nome_completo': nome_responsavel}
+        filhos.append(item)
+    resultado['filhos'] = sorted(filhos, key=lambda item: (item['dia'], item['nome_completo']))
+
+    return {
+        'de': f"{de // 100:02d}-{de % 100:02d}",
+        'ate': f"{rotulo_ate // 100:02d}-{rotulo_ate % 100:02d}",
+        **resultado,
+    }
+
+
+def obter(de=None, ate=None):
+    """
+    Aniversariantes (nascimento, casamento, batismo e filhos) entre as chaves MMDD `de` e `ate`.
+    Sem intervalo, o mês corrente. Fica em cache até a meia-noite ou até algum cadastro mudar.
+    """
+    hoje = timezone.localdate()
+    if de is None and ate is None:
+        de, ate = intervalo_padrao(hoje)
+    elif ate is None:
+        ate = intervalo_padrao(date(2000, de // 100, 1))[1]
+    elif de is None:
+        de = ate // 100 * 100 + 1
+
+    meia_noite = datetime.combine(hoje + timedelta(days=1), time.min, tzinfo=timezone.get_current_timezone())
+    dados, _ = home_cache.obter_ou_gerar(
+        NAMESPACE, (hoje.isoformat(), de, ate), lambda: gerar(de, ate, hoje),
+        timeout=lambda: home_cache.segundos_ate(meia_noite),
+    )
+    return dados
@@ -1,6 +1,8 @@
 from django.urls import path
 from .views import ( 
-    UserRegisterView, DashboardStatsAPIView, UserProfileView, AdminUserListView, AdminPendingUserListView, AdminApproveUserView, AdminRejectUserView, AdminUserDetailView, GerarCartaConviteAPIView, GerarCertificadoBatismoAPIView, SuperuserManagementView, SuperuserDemoteView, UserSelectionListView
+    UserRegisterView, DashboardStatsAPIView, AniversariantesAPIView, AuditoriaListView, RelatorioDemograficoAPIView, UserProfileView, AdminUserListView, AdminPendingUserListView, AdminApproveUserView, AdminRejectUserView, AdminUserDetailView, AdminBulkUserActionView, AdminImportUsersView, AdminUserExportView, GerarCartaConviteAPIView, GerarCertificadoBatismoAPIView, GerarCertificadoCursoAPIView, SuperuserManagementView, SuperuserDemoteView, UserSelectionListView,
+    CursoListView, CursoMatriculaView, MinhasMatriculasView, SolicitarCertificadoView, ProfessorSolicitacoesView,
+    ProfessorResponderSolicitacoesView
 )
 
 urlpatterns = [
@@ -17,14 +19,29 @@ urlpatterns = [
 
     # Rotas de Administração (para Secretário)
     path('admin/dashboard-stats/', DashboardStatsAPIView.as_view(), name='api-dashboard-stats'),
+    path('admin/aniversariantes/', AniversariantesAPIView.as_view(), name='api-admin-aniversariantes'),
+    path('admin/auditoria/', AuditoriaListView.as_view(), name='api-admin-auditoria'),
+    path('admin/relatorios/demografico/', RelatorioDemograficoAPIView.as_view(), name='api-admin-relatorio-demografico'),
     path('admin/users/', AdminUserListView.as_view(), name='api-admin-user-list'),
     path('admin/pending-users/', AdminPendingUserListView.as_view(), name='api-admin-pending-list'),
     path('admin/users/<int:pk>/approve/', AdminApproveUserView.as_view(), name='api-admin-user-approve'),
     path('admin/users/<int:pk>/reject/', AdminRejectUserView.as_view(), name='api-admin-user-reject'),
     path('admin/users/<int:pk>/', AdminUserDetailView.as_view(), name='api-admin-user-detail'),
+    path('admin/users/bulk/', AdminBulkUserActionView.as_view(), name='api-admin-user-bulk'),
+    path('admin/users/import/', AdminImportUsersView.as_view(), name='api-admin-user-import'),
+    path('admin/users/export/', AdminUserExportView.as_view(), name='api-admin-user-export'),
+
+    # Rotas de cursos e certificados
+    path('cursos/', CursoListView.as_view(), name='api-cursos'),
+    path('cursos/<int:pk>/matricula/', CursoMatriculaView.as_view(), name='api-curso-matricula'),
+    path('matriculas/me/', MinhasMatriculasView.as_view(), name='api-minhas-matriculas'),
+    path('matriculas/<int:pk>/certificado/', SolicitarCertificadoView.as_view(), name='api-solicitar-certificado'),
+    path('professor/solicitacoes/', ProfessorSolicitacoesView.as_view(), name='api-professor-solicitacoes'),
+    path('professor/solicitacoes/responder/', ProfessorResponderSolicitacoesView.as_view(), name='api-professor-responder'),
 
      # Rotas para geração de documentos
     path('documentos/gerar-certificado-batismo/', GerarCertificadoBatismoAPIView.as_view(), name='api-gerar-certificado-batismo'),
+    path('documentos/gerar-certificado-curso/', GerarCertificadoCursoAPIView.as_view(), name='api-gerar-certificado-curso'),
     path('documentos/gerar-carta-convite/', GerarCartaConviteAPIView.as_view(), name='api-gerar-carta-convite'),
 ]
 
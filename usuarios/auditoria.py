@@ -0,0 +1,164 @@
+# usuarios/auditoria.py
+
+import atexit
+import logging
+import threading
+
+from django.db import DatabaseError, connections, models, transaction
+from django.utils import timezone
+
+from .models import RegistroAuditoria
+
+logger = logging.getLogger(__name__)
+
+# Os registros são gravados por uma thread do worker quando acumulam tantos ou passa tanto tempo
+LIMITE_BUFFER = 50
+INTERVALO_DESCARGA = 5  # segundos
+
+# Colunas derivadas ou irrelevantes para a auditoria
+CAMPOS_IGNORADOS = {'busca', 'last_login', 'nascimento_mes_dia', 'casamento_mes_dia', 'batismo_mes_dia'}
+# Mudanças registradas sem o valor
+CAMPOS_SENSIVEIS = {'password'}
+OCULTO = '***'
+
+_buffer = []
+_trava = threading.Lock()
+_sinal = threading.Event()
+_thread = None
+
+
+def _valor(valor):
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    return str(valor)
+
+
+def capturar(objeto, campos=None):
+    """
+    Foto dos campos do objeto (chaves estrangeiras pelo id), para comparar depois com `diferencas`.
+    Com `campos`, só esses (evita carregar colunas adiadas por only()).
+    """
+    return {
+        campo.name: _valor(getattr(objeto, campo.attname))
+        for campo in objeto._meta.concrete_fields
+        if campo.name not in CAMPOS_IGNORADOS and (campos is None or campo.name in campos)
+    }
+
+
+def diferencas(antes, depois):
+    """{campo: [antes, depois]} dos campos que mudaram entre duas fotos (ou foto e objeto)."""
+    if not isinstance(depois, dict):
+        depois = capturar(depois)
+    alteracoes = {}
+    for campo, valor in depois.items():
+        if campo in antes and antes[campo] != valor:
+            alteracoes[campo] = [OCULTO, OCULTO] if campo in CAMPOS_SENSIVEIS else [antes[campo], valor]
+    return alteracoes
+
+
+def _valor_formulario(valor):
+    if isinstance(valor, models.Model):
+        return valor.pk
+    if isinstance(valor, (list, tuple, models.QuerySet)):
+        return sorted(_valor_formulario(item) for item in valor)
+    return _valor(valor)
+
+
+def diferencas_formulario(form):
+    """{campo: [antes, depois]} dos campos alterados em um formulário do admin."""
+    return {
+        campo: (
+            [OCULTO, OCULTO] if campo in CAMPOS_SENSIVEIS
+            else [_valor_formulario(form.initial.get(campo)), _valor_formulario(form.cleaned_data.get(campo))]
+        )
+        for campo in form.changed_data
+        if campo not in CAMPOS_IGNORADOS
+    }
+
+
+def _dados(acao, ator, alvo, alteracoes, origem, momento):
+    # Copiados na hora: o alvo pode ser excluído logo depois (ex: cadastro rejeitado)
+    return {
+        'criado_em': momento,
+        'acao': acao,
+        'origem': origem,
+        'ator_id': ator.pk if ator is not None else None,
+        'ator_nome': str(ator)[:200] if ator is not None else '',
+        'alvo_id': alvo.pk if alvo is not None else None,
+        'alvo_nome': str(alvo)[:200] if alvo is not None else '',
+        'alteracoes': alteracoes or {},
+    }
+
+
+def registrar(acao, ator=None, alvo=None, alteracoes=None, origem='api'):
+    """
+    Enfileira um registro de auditoria, que só entra na fila se a transação confirmar.
+    A gravação acontece em lote, fora da requisição.
+
+    Até a descarga, os registros só existem na memória do worker: o atexit os grava
+    quando o Gunicorn recicla ou encerra o worker normalmente, mas um SIGKILL (timeout,
+    falta de memória) perde os últimos INTERVALO_DESCARGA segundos. Se a trilha precisar
+    ser completa mesmo nesse caso, grave direto com RegistroAuditoria.objects.create.
+    """
+    dados = _dados(acao, ator, alvo, alteracoes, origem, timezone.now())
+    transaction.on_commit(lambda: _enfileirar([dados]))
+
+
+def registrar_varios(acao, ator, alvos, alteracoes_por_alvo=None, origem='api'):
+    """Um registro por alvo (ex: ações em lote), todos enfileirados de uma vez."""
+    alteracoes_por_alvo = alteracoes_por_alvo or {}
+    agora = timezone.now()
+    dados = [_dados(acao, ator, alvo, alteracoes_por_alvo.get(alvo.pk), origem, agora) for alvo in alvos]
+    if dados:
+        transaction.on_commit(lambda: _enfileirar(dados))
+
+
+def _enfileirar(dados):
+    with _trava:
+        _buffer.extend(dados)
+        cheio = len(_buffer) >= LIMITE_BUFFER
+    _garantir_thread()
+    if cheio:
+        _sinal.set()
+
+
+def _garantir_thread():
+    global _thread
+    with _trava:
+        # Depois de um fork (ex: workers do Gunicorn) a thread do processo pai não existe no filho
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_trabalhar, name='auditoria', daemon=True)
+            _thread.start()
+
+
+def _trabalhar():
+    while True:
+        _sinal.wait(INTERVALO_DESCARGA)
+        _sinal.clear()
+        try:
+            descarregar()
+        finally:
+            # As conexões são por thread: fecha só as desta, para não segurar o banco entre descargas
+            connections.close_all()
+
+
+def descarregar():
+    """Grava todos os registros pendentes com um único bulk_create."""
+    with _trava:
+        pendentes = list(_buffer)
+        _buffer.clear()
+    if not pendentes:
+        return
+
+    try:
+        RegistroAuditoria.objects.bulk_create([RegistroAuditoria(**dados) for dados in pendentes])
+    except DatabaseError:
+        logger.exception("Falha ao gravar %d registro(s) de auditoria; tentando de novo depois.", len(pendentes))
+        with _trava:
+            _buffer[:0] = pendentes
+
+
+# Não perde os registros quando o worker é reciclado (max_requests do Gunicorn)
+atexit.register(descarregar)
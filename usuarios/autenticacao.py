@@ -0,0 +1,79 @@
+# usuarios/autenticacao.py
+
+import threading
+import time
+
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from home import cache as home_cache
+
+# Tempo máximo que um usuário fica memorizado no worker, mesmo sem nenhuma invalidação
+# (cobre alterações feitas direto no banco, fora do ORM)
+VALIDADE_SEGUNDOS = 60
+# Limite de usuários memorizados por worker
+MAXIMO_USUARIOS = 1000
+
+# user_id -> (versão, expira_em, banco, valores dos campos)
+_usuarios = {}
+_trava = threading.Lock()
+
+
+def _namespace(user_id):
+    return f'usuario_autenticado:{user_id}'
+
+
+def invalidar_usuarios(ids):
+    """
+    Troca a versão dos usuários no cache compartilhado: todos os workers recarregam
+    o usuário do banco na próxima requisição. Só depois do commit, para que ninguém
+    recarregue (e memorize) os dados antigos.
+    """
+    namespaces = [_namespace(user_id) for user_id in ids]
+    if namespaces:
+        transaction.on_commit(lambda: home_cache.invalidar(*namespaces))
+
+
+class JWTAutenticacaoEmCache(JWTAuthentication):
+    """
+    JWTAuthentication que não consulta o banco a cada requisição. O usuário é
+    memorizado por worker e só é relido quando a versão dele no cache compartilhado
+    muda (qualquer save/delete do usuário, ver usuarios/signals.py) ou após
+    VALIDADE_SEGUNDOS. Mudanças de papel e de ativo valem na requisição seguinte.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        versao = home_cache.versao(_namespace(user_id))
+        agora = time.monotonic()
+        item = _usuarios.get(user_id)
+        if item is not None and item[0] == versao and item[1] > agora:
+            # Só os valores ficam memorizados: cada requisição recebe uma instância nova,
+            # sem _state nem cache de relacionamentos compartilhados com outras requisições
+            user = self.user_model.from_db(item[2], self.campos(), item[3])
+            self.verificar_revogacao(user, validated_token)
+        else:
+            # Consulta o banco e faz as verificações do simplejwt (existe, ativo, senha)
+            user = super().get_user(validated_token)
+            valores = tuple(getattr(user, campo) for campo in self.campos())
+            with _trava:
+                if len(_usuarios) >= MAXIMO_USUARIOS:
+                    _usuarios.clear()
+                _usuarios[user_id] = (versao, agora + VALIDADE_SEGUNDOS, user._state.db, valores)
+        return user
+
+    def campos(self):
+        return [campo.attname for campo in self.user_model._meta.concrete_fields]
+
+    def verificar_revogacao(self, user, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
@@ -0,0 +1,76 @@
+# usuarios/busca.py
+
+import re
+import unicodedata
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+# Tabela FTS5 (SQLite) mantida por triggers a partir de usuarios_user.busca (migração 0003)
+TABELA_FTS = 'usuarios_user_busca_fts'
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos: 'João Antônio' -> 'joao antonio'."""
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    sem_acentos = ''.join(caractere for caractere in decomposto if not unicodedata.combining(caractere))
+    return ' '.join(sem_acentos.casefold().split())
+
+
+def apenas_digitos(texto):
+    return re.sub(r'\D', '', texto or '')
+
+
+def texto_busca(user):
+    """Conteúdo da coluna User.busca: nome, e-mail, CPF e telefone (estes dois só com dígitos)."""
+    telefone = apenas_digitos(user.telefone)
+    partes = [
+        normalizar(user.nome_completo),
+        normalizar(user.email),
+        apenas_digitos(user.cpf),
+        telefone,
+        # O número sem o DDD, para que "98765" encontre "(11) 98765-4321" também na busca por prefixo
+        telefone[2:] if len(telefone) >= 10 else '',
+    ]
+    return ' '.join(parte for parte in partes if parte)
+
+
+def normalizar_termo(termo):
+    # "123.456.789-00" ou "(11) 9999-0000" viram só dígitos, como estão gravados
+    if not re.search(r'[^\d\s().\-/+]', termo):
+        return apenas_digitos(termo)
+    return normalizar(termo)
+
+
+class BuscaNormalizadaFilter(SearchFilter):
+    """
+    Busca (?search=) na coluna normalizada User.busca, sem diferenciar acentos e
+    maiúsculas ("joao" encontra "João"). Usa os índices criados na migração 0003:
+    no PostgreSQL um índice trigram (pg_trgm), que atende o LIKE '%termo%';
+    no SQLite a tabela FTS5, com busca pelo início das palavras. Termos só com
+    dígitos (trechos de CPF ou telefone) são procurados em qualquer posição nos dois
+    bancos; no SQLite isso é um LIKE sem índice, aceitável no tamanho do cadastro.
+    Vários termos são combinados com E.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        termos = [normalizar_termo(termo) for termo in self.get_search_terms(request)]
+        termos = [termo for termo in termos if termo]
+        if not termos:
+            return queryset
+
+        if connections[queryset.db].vendor == 'sqlite':
+            # O FTS5 só encontra o início das palavras: "56789" não acharia o CPF 12345678900
+            termos_fts = [termo for termo in termos if not termo.isdigit()]
+            termos = [termo for termo in termos if termo.isdigit()]
+            if termos_fts:
+                # Cada termo vira uma frase com prefixo: "joao"* (aspas internas são removidas)
+                consulta = ' '.join('"%s"*' % termo.replace('"', '') for termo in termos_fts)
+                queryset = queryset.filter(pk__in=RawSQL(
+                    f'SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s', [consulta]
+                ))
+
+        for termo in termos:
+            queryset = queryset.filter(busca__contains=termo)
+        return queryset
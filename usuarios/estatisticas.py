@@ -0,0 +1,104 @@
+# usuarios/estatisticas.py
+
+from datetime import timedelta
+
+from django.db.models import Count, Min, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from home import cache as home_cache
+
+from .models import User
+
+# Namespace de cache invalidado a cada alteração de usuário (ver usuarios/signals.py)
+NAMESPACE = 'usuarios_estatisticas'
+
+# As faixas da fila de pendentes mudam com o tempo mesmo sem escritas no banco
+CACHE_SEGUNDOS = 60 * 60
+
+MESES_PADRAO = 12
+MESES_MAXIMO = 36
+
+# Faixas de idade (em dias) da fila de cadastros pendentes
+FAIXAS_PENDENTES = [
+    ('ate_7_dias', 0, 7),
+    ('de_8_a_30_dias', 7, 30),
+    ('mais_de_30_dias', 30, None),
+]
+
+
+def invalidar():
+    """Descarta as estatísticas em cache. Chame depois de update()/bulk_update(), que não disparam sinais."""
+    home_cache.invalidar(NAMESPACE)
+
+
+def _contadores(agora):
+    """Totais e idade da fila de pendentes em uma única consulta (COUNT com FILTER / CASE)."""
+    pendente = Q(aprovado=False)
+    faixas = {}
+    for nome, inicio_dias, fim_dias in FAIXAS_PENDENTES:
+        condicao = pendente & Q(data_cadastro__lte=agora - timedelta(days=inicio_dias))
+        if fim_dias is not None:
+            condicao &= Q(data_cadastro__gt=agora - timedelta(days=fim_dias))
+        faixas[nome] = Count('pk', filter=condicao)
+
+    return User.objects.aggregate(
+        total_usuarios=Count('pk'),
+        usuarios_pendentes=Count('pk', filter=pendente),
+        total_membros=Count('pk', filter=Q(papel='membro', aprovado=True)),
+        total_congregados=Count('pk', filter=Q(papel='congregado', aprovado=True)),
+        pendente_mais_antigo=Min('data_cadastro', filter=pendente),
+        **faixas,
+    )
+
+
+def _primeiro_dia_do_mes(momento, meses_atras):
+    ano, mes = momento.year, momento.month - meses_atras
+    while mes < 1:
+        ano, mes = ano - 1, mes + 12
+    return momento.replace(year=ano, month=mes, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _por_mes(campo, inicio):
+    """{'AAAA-MM': total} agrupado no banco (GROUP BY mês)."""
+    linhas = (
+        User.objects.filter(**{f'{campo}__gte': inicio})
+        .annotate(mes=TruncMonth(campo))
+        .values('mes')
+        .annotate(total=Count('pk'))
+        .order_by()
+    )
+    return {linha['mes'].strftime('%Y-%m'): linha['total'] for linha in linhas}
+
+
+def _series(agora, meses):
+    inicio = _primeiro_dia_do_mes(timezone.localtime(agora), meses - 1)
+    cadastros = _por_mes('data_cadastro', inicio)
+    aprovacoes = _por_mes('data_aprovacao', inicio)
+
+    serie = []
+    for deslocamento in range(meses - 1, -1, -1):
+        mes = _primeiro_dia_do_mes(timezone.localtime(agora), deslocamento).strftime('%Y-%m')
+        serie.append({'mes': mes, 'cadastros': cadastros.get(mes, 0), 'aprovacoes': aprovacoes.get(mes, 0)})
+    return serie
+
+
+def gerar(meses=MESES_PADRAO):
+    agora = timezone.now()
+    contadores = _contadores(agora)
+    mais_antigo = contadores.pop('pendente_mais_antigo')
+    faixas = {nome: contadores.pop(nome) for nome, _, _ in FAIXAS_PENDENTES}
+
+    contadores['fila_pendentes'] = {
+        'pendente_mais_antigo_desde': mais_antigo,
+        'dias_pendente_mais_antigo': (agora - mais_antigo).days if mais_antigo else None,
+        'faixas': faixas,
+    }
+    contadores['por_mes'] = _series(agora, meses)
+    return contadores
+
+
+def obter(meses=MESES_PADRAO):
+    """Estatísticas do dashboard, recalculadas apenas quando algum usuário muda (ou a cada hora)."""
+    dados, _ = home_cache.obter_ou_gerar(NAMESPACE, ('dashboard', meses), lambda: gerar(meses), timeout=CACHE_SEGUNDOS)
+    return dados
@@ -0,0 +1,114 @@
+# usuarios/exportacao.py
+
+import csv
+import os
+import tempfile
+from itertools import islice
+
+from django.utils import timezone
+
+from .importacao import CAMPOS_BOOLEANOS, CAMPOS_DATA, CAMPOS_TEXTO, CARACTERES_FORMULA
+from .models import Filho
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None  # Exportação em .xlsx fica indisponível; CSV continua funcionando
+
+# Linhas lidas do banco por vez (e consulta de filhos por lote)
+TAMANHO_LOTE = 1000
+
+# Mesmas colunas (e formatos) aceitas pela importação, para que a planilha possa voltar ao sistema
+COLUNAS = (
+    ['id'] + CAMPOS_TEXTO + CAMPOS_DATA + CAMPOS_BOOLEANOS
+    + ['aprovado', 'ativo', 'data_cadastro', 'filhos']
+)
+COLUNAS_DO_BANCO = [coluna for coluna in COLUNAS if coluna != 'filhos']
+
+
+def _sem_formula(texto):
+    """
+    Textos digitados no cadastro público (ex: um nome "=HYPERLINK(...)") seriam executados
+    como fórmula ao abrir a planilha: o apóstrofo na frente faz o valor ser lido como texto.
+    """
+    if texto.startswith(CARACTERES_FORMULA):
+        return "'" + texto
+    return texto
+
+
+def _formatar(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'sim' if valor else 'não'
+    if hasattr(valor, 'hour'):
+        return timezone.localtime(valor).strftime('%d/%m/%Y %H:%M')
+    if hasattr(valor, 'strftime'):
+        return valor.strftime('%d/%m/%Y')
+    if isinstance(valor, str):
+        return _sem_formula(valor)
+    return valor
+
+
+def _filhos_por_usuario(ids):
+    filhos = {}
+    consulta = (
+        Filho.objects.filter(user_id__in=ids)
+        .order_by('user_id', 'data_nascimento')
+        .values_list('user_id', 'nome_completo', 'data_nascimento')
+    )
+    for user_id, nome, nascimento in consulta:
+        filhos.setdefault(user_id, []).append(f"{nome} ({_formatar(nascimento)})")
+    return filhos
+
+
+def linhas(queryset):
+    """
+    Gera o cabeçalho e depois uma lista de valores por usuário, lendo o banco em lotes
+    de TAMANHO_LOTE (iterator sobre values_list, sem instanciar modelos) e buscando
+    os filhos de cada lote em uma única consulta. A memória usada não cresce com o total.
+    """
+    yield COLUNAS
+    registros = queryset.values_list(*COLUNAS_DO_BANCO).iterator(chunk_size=TAMANHO_LOTE)
+    while True:
+        lote = list(islice(registros, TAMANHO_LOTE))
+        if not lote:
+            return
+        filhos = _filhos_por_usuario([registro[0] for registro in lote])
+        for registro in lote:
+            yield [_formatar(valor) for valor in registro] + [_sem_formula('; '.join(filhos.get(registro[0], ())))]
+
+
+class _Eco:
+    """Pseudo-arquivo para o csv.writer: devolve a linha em vez de guardá-la."""
+    def write(self, valor):
+        return valor
+
+
+def gerar_csv(queryset):
+    """Gera o CSV (UTF-8 com BOM e ';', como o Excel em português espera) em pedaços de bytes."""
+    escritor = csv.writer(_Eco(), delimiter=';')
+    yield '\ufeff'.encode('utf-8')
+    for linha in linhas(queryset):
+        yield escritor.writerow(linha).encode('utf-8')
+
+
+def gerar_xlsx(queryset):
+    """
+    Grava a planilha em um arquivo temporário com o modo write_only do openpyxl,
+    que descarrega as linhas no disco conforme são escritas, e devolve o arquivo aberto.
+    """
+    planilha = openpyxl.Workbook(write_only=True)
+    aba = planilha.create_sheet('Membros')
+    for linha in linhas(queryset):
+        aba.append(linha)
+    descritor, caminho = tempfile.mkstemp(suffix='.xlsx')
+    os.close(descritor)
+    planilha.save(caminho)
+    arquivo = open(caminho, 'rb')
+    os.remove(caminho)  # O arquivo aberto continua legível até ser fechado
+    return arquivo
+
+
+def nome_arquivo(extensao):
+    return f"membros-{timezone.localdate().isoformat()}.{extensao}"
@@ -0,0 +1,371 @@
+# usuarios/importacao.py
+
+import codecs
+import csv
+import io
+import re
+from collections import namedtuple
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import aniversariantes, auditoria, estatisticas, relatorios
+from .busca import apenas_digitos, texto_busca
+from .models import Filho, User, chave_mes_dia
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None  # Importação de .xlsx fica indisponível; CSV continua funcionando
+
+# Linhas validadas e gravadas por vez
+TAMANHO_LOTE = 500
+
+# Codificações aceitas nos CSV, na ordem em que são testadas: UTF-8 (com ou sem BOM)
+# e a usada pelo Excel em português no Windows
+CODIFICACOES_CSV = ('utf-8-sig', 'cp1252')
+TAMANHO_BLOCO_LEITURA = 64 * 1024
+
+# Colunas aceitas na planilha (cabeçalho = nome do campo do modelo) além de 'filhos'
+CAMPOS_TEXTO = [
+    'username', 'email', 'nome_completo', 'nome_pai', 'nome_mae', 'cpf', 'rg', 'naturalidade',
+    'estado_civil', 'nome_conjuge', 'telefone', 'endereco', 'bairro', 'cidade', 'cep',
+    'profissao', 'nivel_escolar', 'local_batismo', 'outra_igreja_batismo', 'qual_congregacao',
+    'qual_classe_escola_biblica', 'qual_funcao_deseja', 'alergias_texto', 'papel',
+]
+CAMPOS_DATA = ['data_nascimento', 'data_casamento', 'data_conversao', 'data_batismo']
+CAMPOS_BOOLEANOS = [
+    'batizado_aguas', 'recebido_por_aclamacao', 'membro_congregacao', 'frequenta_escola_biblica',
+    'deseja_exercer_funcao', 'tem_alergia_medicacao',
+]
+COLUNAS = set(CAMPOS_TEXTO) | set(CAMPOS_DATA) | set(CAMPOS_BOOLEANOS) | {'filhos'}
+
+# Papéis que podem vir da planilha (secretários continuam sendo promovidos manualmente)
+PAPEIS_IMPORTAVEIS = {'congregado', 'membro'}
+
+VERDADEIRO = {'sim', 's', 'true', 'verdadeiro', '1', 'x'}
+FALSO = {'nao', 'não', 'n', 'false', 'falso', '0', ''}
+
+# Início de célula que o Excel/LibreOffice interpretaria como fórmula. A exportação
+# prefixa esses valores com um apóstrofo, que a importação remove de volta
+CARACTERES_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+# Ex: "Ana Souza (12/03/2015); Pedro (2018-05-01)"
+PADRAO_FILHO = re.compile(r'^(?P<nome>.+?)\s*\((?P<data>[^)]+)\)$')
+
+ResultadoImportacao = namedtuple('ResultadoImportacao', ['total_linhas', 'importados', 'erros', 'colunas_ignoradas'])
+
+
+class ErroImportacao(ValueError):
+    """Problema no arquivo como um todo (formato, cabeçalho), não em uma linha."""
+
+
+# --- LEITURA DO ARQUIVO ---
+
+def _detectar_codificacao(arquivo):
+    """
+    Percorre o arquivo uma vez, em blocos, antes de qualquer linha ser gravada: um erro
+    de decodificação no meio do arquivo deixaria os lotes anteriores já importados.
+    """
+    for codificacao in CODIFICACOES_CSV:
+        decodificador = codecs.getincrementaldecoder(codificacao)()
+        arquivo.seek(0)
+        try:
+            for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO_LEITURA), b''):
+                decodificador.decode(bloco)
+            decodificador.decode(b'', final=True)
+        except UnicodeDecodeError:
+            continue
+        arquivo.seek(0)
+        return codificacao
+    raise ErroImportacao("Não foi possível ler o arquivo. Salve o CSV em UTF-8 e envie novamente.")
+
+
+def _linhas_csv(arquivo):
+    texto = io.TextIOWrapper(arquivo, encoding=_detectar_codificacao(arquivo), newline='')
+    # O separador é o mais frequente no cabeçalho (o Excel em português usa ';')
+    cabecalho = texto.readline()
+    texto.seek(0)
+    separador = max(';,\t', key=cabecalho.count)
+    yield from csv.reader(texto, delimiter=separador)
+
+
+def _linhas_xlsx(arquivo):
+    if openpyxl is None:
+        raise ErroImportacao("Importação de .xlsx indisponível: instale o pacote openpyxl ou envie um .csv.")
+    planilha = openpyxl.load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        for linha in planilha.active.iter_rows(values_only=True):
+            yield list(linha)
+    finally:
+        planilha.close()
+
+
+def ler_planilha(arquivo, nome_arquivo):
+    """
+    Gera (número da linha, {coluna: valor}) sem carregar o arquivo inteiro na memória.
+    A primeira linha é o cabeçalho, com os nomes dos campos (ex: nome_completo, cpf, filhos).
+    """
+    if nome_arquivo.lower().endswith('.xlsx'):
+        linhas = _linhas_xlsx(arquivo)
+    elif nome_arquivo.lower().endswith(('.csv', '.txt')):
+        linhas = _linhas_csv(arquivo)
+    else:
+        raise ErroImportacao("Formato não suportado. Envie um arquivo .csv ou .xlsx.")
+
+    cabecalho = next(linhas, None)
+    if not cabecalho:
+        raise ErroImportacao("O arquivo está vazio.")
+    cabecalho = [str(coluna or '').strip().lower() for coluna in cabecalho]
+    if 'nome_completo' not in cabecalho:
+        raise ErroImportacao("O cabeçalho precisa ter a coluna 'nome_completo'.")
+    yield cabecalho
+
+    for numero, valores in enumerate(linhas, start=2):
+        if not any(valor not in (None, '') for valor in valores):
+            continue
+        yield numero, dict(zip(cabecalho, valores))
+
+
+# --- CONVERSÃO DOS VALORES ---
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    texto = str(valor)
+    if texto.startswith("'") and texto[1:].startswith(CARACTERES_FORMULA):
+        texto = texto[1:]
+    return texto.strip()
+
+
+def _data(valor):
+    if valor in (None, ''):
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = _texto(valor)
+    for formato in ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y'):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValidationError(f"Data inválida: '{texto}'. Use DD/MM/AAAA.")
+
+
+def _booleano(valor):
+    if isinstance(valor, bool):
+        return valor
+    texto = _texto(valor).lower()
+    if texto in VERDADEIRO:
+        return True
+    if texto in FALSO:
+        return False
+    raise ValidationError(f"Valor inválido: '{texto}'. Use sim ou não.")
+
+
+def _telefone(valor):
+    digitos = apenas_digitos(_texto(valor))
+    if len(digitos) in (10, 11):
+        return f"({digitos[:2]}) {digitos[2:-4]}-{digitos[-4:]}"
+    return _texto(valor)
+
+
+def _filhos(valor):
+    filhos = []
+    for parte in _texto(valor).split(';'):
+        parte = parte.strip()
+        if not parte:
+            continue
+        encontrado = PADRAO_FILHO.match(parte)
+        if not encontrado:
+            raise ValidationError(f"Filho em formato inválido: '{parte}'. Use 'Nome (DD/MM/AAAA)'.")
+        filhos.append(Filho(nome_completo=encontrado['nome'].strip(), data_nascimento=_data(encontrado['data'])))
+    return filhos
+
+
+class ImportadorUsuarios:
+    """
+    Importa fichas de membros em lote. Cada lote de TAMANHO_LOTE linhas é validado
+    (regras do modelo, sem consultas) e gravado com bulk_create de User e de Filho.
+    CPF e username são conferidos contra conjuntos carregados uma única vez no início.
+    As senhas ficam inutilizáveis (sem custo de hash): o membro define a sua depois.
+
+    Cada lote é gravado na sua própria transação. Se um cadastro feito durante a
+    importação ocupar um CPF ou username do lote (IntegrityError), o lote é regravado
+    linha a linha: as linhas em conflito vão para os erros e as demais são importadas.
+    """
+
+    def __init__(self, aprovado_por=None, simular=False, papel_padrao='membro', origem='comando'):
+        self.aprovado_por = aprovado_por
+        self.origem = origem
+        self.simular = simular
+        self.papel_padrao = papel_padrao
+        self.cpfs = set(User.objects.exclude(cpf__isnull=True).exclude(cpf='').values_list('cpf', flat=True))
+        self.usernames = {username.lower() for username in User.objects.values_list('username', flat=True)}
+
+    def importar(self, arquivo, nome_arquivo):
+        linhas = ler_planilha(arquivo, nome_arquivo)
+        cabecalho = next(linhas)
+        colunas_ignoradas = sorted(set(cabecalho) - COLUNAS - {''})
+
+        total = importados = 0
+        erros = []
+        lote = []
+        for numero, dados in linhas:
+            total += 1
+            lote.append((numero, dados))
+            if len(lote) >= TAMANHO_LOTE:
+                importados += self.processar_lote(lote, erros)
+                lote = []
+        if lote:
+            importados += self.processar_lote(lote, erros)
+        if importados and not self.simular:
+            # bulk_create não dispara os sinais
+            estatisticas.invalidar()
+            relatorios.invalidar()
+            aniversariantes.invalidar()
+        return ResultadoImportacao(total, importados, erros, colunas_ignoradas)
+
+    def processar_lote(self, lote, erros):
+        linhas = []
+        usuarios = []
+        filhos_por_usuario = []
+        agora = timezone.now()
+        for numero, dados in lote:
+            try:
+                user, filhos = self.montar(dados, agora)
+            except ValidationError as erro:
+                erros.append({'linha': numero, 'erros': self.mensagens(erro)})
+                continue
+            linhas.append(numero)
+            usuarios.append(user)
+            filhos_por_usuario.append(filhos)
+
+        if self.simular or not usuarios:
+            return len(usuarios)
+
+        try:
+            self.gravar(usuarios, filhos_por_usuario)
+        except IntegrityError:
+            return self.gravar_linha_a_linha(linhas, usuarios, filhos_por_usuario, erros)
+        return len(usuarios)
+
+    def gravar_linha_a_linha(self, linhas, usuarios, filhos_por_usuario, erros):
+        """Regrava um lote que violou uma restrição única, isolando as linhas em conflito."""
+        importados = 0
+        for numero, user, filhos in zip(linhas, usuarios, filhos_por_usuario):
+            # O bulk_create que falhou pode ter preenchido o id antes do rollback
+            for objeto in [user, *filhos]:
+                objeto.pk = None
+                objeto._state.adding = True
+            try:
+                self.gravar([user], [filhos])
+            except IntegrityError:
+                erros.append({'linha': numero, 'erros': {
+                    '__all__': ["CPF ou username cadastrado por outra pessoa durante a importação."],
+                }})
+            else:
+                importados += 1
+        return importados
+
+    def gravar(self, usuarios, filhos_por_usuario):
+        with transaction.atomic():
+            # O bulk_create não chama save(): as colunas derivadas são preenchidas aqui
+            for user in usuarios:
+                user.busca = texto_busca(user)
+                user.atualizar_chaves_mes_dia()
+            User.objects.bulk_create(usuarios, batch_size=TAMANHO_LOTE)
+            filhos = []
+            for user, filhos_do_usuario in zip(usuarios, filhos_por_usuario):
+                for filho in filhos_do_usuario:
+                    filho.user = user
+                    filho.nascimento_mes_dia = chave_mes_dia(filho.data_nascimento)
+                    filhos.append(filho)
+            Filho.objects.bulk_create(filhos, batch_size=TAMANHO_LOTE)
+            auditoria.registrar_varios('importar', self.aprovado_por, usuarios, origem=self.origem)
+
+    def montar(self, dados, agora):
+        """Converte e valida uma linha. Levanta ValidationError com os erros por campo."""
+        erros = {}
+        valores = {}
+        for campo in CAMPOS_TEXTO:
+            if campo in dados:
+                valores[campo] = _telefone(dados[campo]) if campo == 'telefone' else _texto(dados[campo])
+        for campo, conversor in [(campo, _data) for campo in CAMPOS_DATA] + [(campo, _booleano) for campo in CAMPOS_BOOLEANOS]:
+            if campo in dados:
+                try:
+                    valores[campo] = conversor(dados[campo])
+                except ValidationError as erro:
+                    erros[campo] = erro.messages
+        filhos = []
+        if dados.get('filhos'):
+            try:
+                filhos = _filhos(dados['filhos'])
+            except ValidationError as erro:
+                erros['filhos'] = erro.messages
+
+        cpf = apenas_digitos(valores.pop('cpf', '')) or None
+        if cpf and len(cpf) < 11:
+            cpf = cpf.zfill(11)  # planilhas costumam perder os zeros à esquerda
+        if cpf in self.cpfs:
+            erros['cpf'] = ["Já existe um usuário com este CPF."]
+
+        username = valores.pop('username', '') or cpf or self.gerar_username(valores.get('nome_completo', ''))
+        if username.lower() in self.usernames:
+            erros['username'] = ["Já existe um usuário com este username."]
+
+        papel = valores.pop('papel', '').lower() or self.papel_padrao
+        if papel not in PAPEIS_IMPORTAVEIS:
+            erros['papel'] = [f"Papel inválido: '{papel}'. Use congregado ou membro."]
+
+        user = User(
+            username=username,
+            cpf=cpf,
+            papel=papel if papel in PAPEIS_IMPORTAVEIS else self.papel_padrao,
+            aprovado=True,
+            aprovado_por=self.aprovado_por,
+            data_aprovacao=agora,
+            data_cadastro=agora,
+            **valores,
+        )
+        user.set_unusable_password()
+        try:
+            user.full_clean(exclude=['password', 'aprovado_por', 'busca'], validate_unique=False, validate_constraints=False)
+        except ValidationError as erro:
+            for campo, mensagens in erro.message_dict.items():
+                erros.setdefault(campo, []).extend(mensagens)
+        for filho in filhos:
+            try:
+                filho.full_clean(exclude=['user'])
+            except ValidationError as erro:
+                erros.setdefault('filhos', []).extend(erro.messages)
+        if erros:
+            raise ValidationError(erros)
+
+        # Reserva CPF e username também contra as linhas seguintes do próprio arquivo
+        if cpf:
+            self.cpfs.add(cpf)
+        self.usernames.add(username.lower())
+        return user, filhos
+
+    def gerar_username(self, nome):
+        base = slugify(nome).replace('-', '.')[:140] or 'membro'
+        username = base
+        sufixo = 1
+        while username.lower() in self.usernames:
+            sufixo += 1
+            username = f"{base}.{sufixo}"
+        return username
+
+    @staticmethod
+    def mensagens(erro):
+        if hasattr(erro, 'error_dict'):
+            return {campo: [str(mensagem) for mensagem in ValidationError(lista).messages] for campo, lista in erro.error_dict.items()}
+        return {'__all__': erro.messages}
@@ -0,0 +1,68 @@
+# usuarios/management/commands/importar_membros.py
+
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from usuarios.importacao import PAPEIS_IMPORTAVEIS, ErroImportacao, ImportadorUsuarios
+from usuarios.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa fichas de membros de uma planilha .csv ou .xlsx (a primeira linha traz os "
+        "nomes dos campos, ex: nome_completo;cpf;data_nascimento;telefone;filhos). "
+        "As linhas são validadas e gravadas em lotes; os membros entram aprovados e com "
+        "senha inutilizável, a ser definida depois. Linhas com erro são puladas e listadas no relatório."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help="Caminho da planilha (.csv ou .xlsx).")
+        parser.add_argument('--simular', action='store_true', help="Só valida, sem gravar nada.")
+        parser.add_argument(
+            '--papel', default='membro', choices=sorted(PAPEIS_IMPORTAVEIS),
+            help="Papel das linhas sem a coluna 'papel' (padrão: membro).",
+        )
+        parser.add_argument('--aprovado-por', help="Username do secretário registrado como aprovador.")
+        parser.add_argument('--relatorio', help="Grava os erros em um CSV (linha;campo;mensagem).")
+
+    def handle(self, *args, **options):
+        aprovado_por = None
+        if options['aprovado_por']:
+            aprovado_por = User.objects.filter(username=options['aprovado_por']).first()
+            if aprovado_por is None:
+                raise CommandError(f"Usuário '{options['aprovado_por']}' não encontrado.")
+
+        importador = ImportadorUsuarios(
+            aprovado_por=aprovado_por, simular=options['simular'], papel_padrao=options['papel'],
+        )
+        try:
+            with open(options['arquivo'], 'rb') as arquivo:
+                resultado = importador.importar(arquivo, options['arquivo'])
+        except OSError as erro:
+            raise CommandError(f"Não foi possível abrir o arquivo: {erro}")
+        except ErroImportacao as erro:
+            raise CommandError(str(erro))
+
+        if resultado.colunas_ignoradas:
+            self.stdout.write(self.style.WARNING(f"Colunas ignoradas: {', '.join(resultado.colunas_ignoradas)}"))
+
+        for erro in resultado.erros[:20]:
+            for campo, mensagens in erro['erros'].items():
+                self.stdout.write(f"Linha {erro['linha']} ({campo}): {' '.join(mensagens)}")
+        if len(resultado.erros) > 20:
+            self.stdout.write(f"... e mais {len(resultado.erros) - 20} linha(s) com erro.")
+
+        if options['relatorio']:
+            with open(options['relatorio'], 'w', encoding='utf-8-sig', newline='') as saida:
+                escritor = csv.writer(saida, delimiter=';')
+                escritor.writerow(['linha', 'campo', 'mensagem'])
+                for erro in resultado.erros:
+                    for campo, mensagens in erro['erros'].items():
+                        for mensagem in mensagens:
+                            escritor.writerow([erro['linha'], campo, mensagem])
+
+        verbo = "válida(s)" if importador.simular else "importada(s)"
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado.importados} de {resultado.total_linhas} linha(s) {verbo}; {len(resultado.erros)} com erro."
+        ))
@@ -0,0 +1,81 @@
+from django.db import migrations, models
+
+from usuarios.busca import TABELA_FTS, texto_busca
+
+TAMANHO_LOTE = 500
+
+
+def preencher_busca(apps, schema_editor):
+    User = apps.get_model('usuarios', 'User')
+    usuarios = User.objects.using(schema_editor.connection.alias).only('pk', 'nome_completo', 'email', 'cpf', 'telefone')
+    lote = []
+    for user in usuarios.iterator(chunk_size=TAMANHO_LOTE):
+        user.busca = texto_busca(user)
+        lote.append(user)
+        if len(lote) >= TAMANHO_LOTE:
+            User.objects.bulk_update(lote, ['busca'])
+            lote = []
+    if lote:
+        User.objects.bulk_update(lote, ['busca'])
+
+
+SQL_SQLITE = [
+    f"""CREATE VIRTUAL TABLE {TABELA_FTS} USING fts5(busca, tokenize = 'unicode61 remove_diacritics 2')""",
+    f"""INSERT INTO {TABELA_FTS} (rowid, busca) SELECT id, busca FROM usuarios_user""",
+    f"""CREATE TRIGGER usuarios_user_busca_ai AFTER INSERT ON usuarios_user BEGIN
+        INSERT INTO {TABELA_FTS} (rowid, busca) VALUES (new.id, new.busca);
+    END""",
+    f"""CREATE TRIGGER usuarios_user_busca_au AFTER UPDATE OF busca ON usuarios_user BEGIN
+        DELETE FROM {TABELA_FTS} WHERE rowid = old.id;
+        INSERT INTO {TABELA_FTS} (rowid, busca) VALUES (new.id, new.busca);
+    END""",
+    f"""CREATE TRIGGER usuarios_user_busca_ad AFTER DELETE ON usuarios_user BEGIN
+        DELETE FROM {TABELA_FTS} WHERE rowid = old.id;
+    END""",
+]
+
+SQL_SQLITE_REVERSO = [
+    "DROP TRIGGER IF EXISTS usuarios_user_busca_ai",
+    "DROP TRIGGER IF EXISTS usuarios_user_busca_au",
+    "DROP TRIGGER IF EXISTS usuarios_user_busca_ad",
+    f"DROP TABLE IF EXISTS {TABELA_FTS}",
+]
+
+SQL_POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS usuarios_user_busca_trgm ON usuarios_user USING gin (busca gin_trgm_ops)",
+]
+
+SQL_POSTGRES_REVERSO = [
+    "DROP INDEX IF EXISTS usuarios_user_busca_trgm",
+]
+
+
+def _executar(schema_editor, por_banco):
+    for instrucao in por_banco.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(instrucao)
+
+
+def criar_indices(apps, schema_editor):
+    _executar(schema_editor, {'sqlite': SQL_SQLITE, 'postgresql': SQL_POSTGRES})
+
+
+def remover_indices(apps, schema_editor):
+    _executar(schema_editor, {'sqlite': SQL_SQLITE_REVERSO, 'postgresql': SQL_POSTGRES_REVERSO})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0002_alter_user_papel_curso_solicitacaocertificado_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='busca',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de Busca'),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
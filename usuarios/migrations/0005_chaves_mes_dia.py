@@ -0,0 +1,62 @@
+from django.db import migrations, models
+
+TAMANHO_LOTE = 500
+
+
+def _mes_dia(data):
+    return data.month * 100 + data.day if data else None
+
+
+def _preencher(modelo, campos, alias):
+    registros = modelo.objects.using(alias).only('pk', *campos)
+    lote = []
+    for registro in registros.iterator(chunk_size=TAMANHO_LOTE):
+        for campo_data, campo_chave in campos.items():
+            setattr(registro, campo_chave, _mes_dia(getattr(registro, campo_data)))
+        lote.append(registro)
+        if len(lote) >= TAMANHO_LOTE:
+            modelo.objects.using(alias).bulk_update(lote, list(campos.values()))
+            lote = []
+    if lote:
+        modelo.objects.using(alias).bulk_update(lote, list(campos.values()))
+
+
+def preencher_chaves(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    _preencher(apps.get_model('usuarios', 'User'), {
+        'data_nascimento': 'nascimento_mes_dia',
+        'data_casamento': 'casamento_mes_dia',
+        'data_batismo': 'batismo_mes_dia',
+    }, alias)
+    _preencher(apps.get_model('usuarios', 'Filho'), {'data_nascimento': 'nascimento_mes_dia'}, alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0004_user_indices_paginacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='nascimento_mes_dia',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='casamento_mes_dia',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='batismo_mes_dia',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='filho',
+            name='nascimento_mes_dia',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(preencher_chaves, migrations.RunPython.noop),
+    ]
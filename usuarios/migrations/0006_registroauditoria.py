@@ -0,0 +1,34 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0005_chaves_mes_dia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroAuditoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data da Ação')),
+                ('acao', models.CharField(choices=[('criar', 'Criou o usuário'), ('editar', 'Editou o usuário'), ('excluir', 'Excluiu o usuário'), ('aprovar', 'Aprovou o cadastro'), ('desaprovar', 'Desfez a aprovação'), ('rejeitar', 'Rejeitou o cadastro'), ('ativar', 'Ativou o usuário'), ('desativar', 'Desativou o usuário'), ('alterar_papel', 'Alterou o papel'), ('promover_superusuario', 'Promoveu a superusuário'), ('remover_superusuario', 'Removeu de superusuário'), ('importar', 'Importou membros')], max_length=30, verbose_name='Ação')),
+                ('origem', models.CharField(choices=[('api', 'API'), ('admin', 'Painel do Django'), ('comando', 'Comando de gerenciamento')], default='api', max_length=10, verbose_name='Origem')),
+                ('ator_nome', models.CharField(blank=True, max_length=200, verbose_name='Nome de quem fez')),
+                ('alvo_nome', models.CharField(blank=True, max_length=200, verbose_name='Nome do usuário afetado')),
+                ('alteracoes', models.JSONField(blank=True, default=dict, verbose_name='Alterações')),
+                ('alvo', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuário afetado')),
+                ('ator', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Feito por')),
+            ],
+            options={
+                'verbose_name': 'Registro de Auditoria',
+                'verbose_name_plural': 'Registros de Auditoria',
+                'ordering': ['-criado_em', '-id'],
+                'indexes': [models.Index(fields=['criado_em', 'id'], name='usuarios_auditoria_data_idx'), models.Index(fields=['ator', 'criado_em'], name='usuarios_auditoria_ator_idx'), models.Index(fields=['alvo', 'criado_em'], name='usuarios_auditoria_alvo_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0006_registroauditoria'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='solicitacaocertificado',
+            index=models.Index(fields=['professor', 'status', 'data_solicitacao', 'id'], name='usuarios_solicitacao_fila_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitacaocertificado',
+            index=models.Index(fields=['aluno', 'curso'], name='usuarios_solicitacao_aluno_idx'),
+        ),
+    ]
@@ -3,10 +3,21 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import RegexValidator
+from datetime import date
 from django.utils import timezone
+from .busca import texto_busca
 
 # SEU MODELO User E Filho CONTINUAM AQUI (sem alterações)
 # ...
+def chave_mes_dia(data):
+    """Ex: 25/12/1990 -> 1225. Guardada em coluna indexada para buscar aniversários por intervalo."""
+    if not data:
+        return None
+    if isinstance(data, str):
+        data = date.fromisoformat(data)
+    return data.month * 100 + data.day
+
+
 class User(AbstractUser):
     """
     Modelo de usuário personalizado baseado na ficha de cadastro da igreja.
@@ -166,6 +177,7 @@ class User(AbstractUser):
         ('congregado', 'Congregado'),
         ('membro', 'Membro'),
         ('secretario', 'Secretário'),
+        ('professor', 'Professor'),
     ]
     papel = models.CharField(
         max_length=20, 
@@ -187,11 +199,34 @@ class User(AbstractUser):
         related_name='usuarios_aprovados'
     )
     data_aprovacao = models.DateTimeField(null=True, blank=True, verbose_name="Data de Aprovação")
+
+    # --- BUSCA ---
+    # Nome e e-mail sem acentos e em minúsculas, CPF e telefone só com dígitos.
+    # Mantido pelo save() e indexado pela migração 0003 (ver usuarios/busca.py).
+    busca = models.TextField(blank=True, default='', editable=False, verbose_name="Texto de Busca")
+    CAMPOS_BUSCA = {'nome_completo', 'email', 'cpf', 'telefone'}
+
+    # --- ANIVERSÁRIOS ---
+    # Mês e dia (MMDD) de cada data comemorativa, mantidos pelo save() e indexados:
+    # "aniversariantes de 20/12 a 10/01" vira uma busca por intervalo (ver usuarios/aniversariantes.py)
+    nascimento_mes_dia = models.PositiveSmallIntegerField(null=True, blank=True, editable=False, db_index=True)
+    casamento_mes_dia = models.PositiveSmallIntegerField(null=True, blank=True, editable=False, db_index=True)
+    batismo_mes_dia = models.PositiveSmallIntegerField(null=True, blank=True, editable=False, db_index=True)
+    CAMPOS_MES_DIA = {
+        'data_nascimento': 'nascimento_mes_dia',
+        'data_casamento': 'casamento_mes_dia',
+        'data_batismo': 'batismo_mes_dia',
+    }
     
     class Meta:
         verbose_name = "Usuário"
         verbose_name_plural = "Usuários"
         ordering = ['nome_completo']
+        indexes = [
+            # Paginação por chave das listagens do admin (usuarios/paginacao.py)
+            models.Index(fields=['nome_completo', 'id'], name='usuarios_user_nome_id_idx'),
+            models.Index(fields=['aprovado', 'data_cadastro', 'id'], name='usuarios_user_pendentes_idx'),
+        ]
     
     def __str__(self):
         return self.nome_completo or self.username
@@ -202,7 +237,20 @@ class User(AbstractUser):
         # Normaliza CPF para conter apenas dígitos antes de salvar
         if self.cpf:
             self.cpf = ''.join(filter(str.isdigit, self.cpf))
+        self.busca = texto_busca(self)
+        self.atualizar_chaves_mes_dia()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            extras = {self.CAMPOS_MES_DIA[campo] for campo in self.CAMPOS_MES_DIA.keys() & set(update_fields)}
+            if self.CAMPOS_BUSCA.intersection(update_fields):
+                extras.add('busca')
+            kwargs['update_fields'] = set(update_fields) | extras
         super().save(*args, **kwargs)
+
+    def atualizar_chaves_mes_dia(self):
+        """Recalcula as chaves MMDD (também usado antes de bulk_create, que não chama o save())."""
+        for campo_data, campo_chave in self.CAMPOS_MES_DIA.items():
+            setattr(self, campo_chave, chave_mes_dia(getattr(self, campo_data)))
     
     @property
     def is_secretario(self):
@@ -216,6 +264,10 @@ class User(AbstractUser):
     def is_congregado(self):
         return self.papel == 'congregado'
 
+    @property
+    def is_professor(self):
+        return self.papel == 'professor'
+
 
 class Filho(models.Model):
     """
@@ -229,6 +281,7 @@ class Filho(models.Model):
     )
     nome_completo = models.CharField(max_length=200, verbose_name="Nome do Filho(a)")
     data_nascimento = models.DateField(verbose_name="Data de Nascimento")
+    nascimento_mes_dia = models.PositiveSmallIntegerField(null=True, blank=True, editable=False, db_index=True)
 
     class Meta:
         verbose_name = "Filho"
@@ -238,6 +291,13 @@ class Filho(models.Model):
     def __str__(self):
         return f"{self.nome_completo} (Filho de {self.user.nome_completo})"
 
+    def save(self, *args, **kwargs):
+        self.nascimento_mes_dia = chave_mes_dia(self.data_nascimento)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'data_nascimento' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'nascimento_mes_dia'}
+        super().save(*args, **kwargs)
+
 # --- NOVO MODELO PARA GERENCIAR OS DOCUMENTOS ---
 class ModeloDocumento(models.Model):
     """
@@ -273,4 +333,179 @@ class ModeloDocumento(models.Model):
     class Meta:
         verbose_name = "Modelo de Documento"
         verbose_name_plural = "Modelos de Documentos"
-        ordering = ['nome']
\ No newline at end of file
+        ordering = ['nome']
+
+
+# --- CURSOS E CERTIFICADOS ---
+class Curso(models.Model):
+    """
+    Curso oferecido pela igreja (ex: Libras), ministrado por um professor.
+    """
+    nome = models.CharField(max_length=200, verbose_name="Nome do Curso")
+    descricao = models.TextField(blank=True, verbose_name="Descrição")
+    professor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='cursos_ministrados',
+        limit_choices_to={'papel': 'professor'},
+        verbose_name="Professor"
+    )
+    ativo = models.BooleanField(default=True, verbose_name="Curso Ativo")
+    data_criacao = models.DateTimeField(default=timezone.now, verbose_name="Data de Criação")
+    carga_horaria = models.PositiveIntegerField(default=0, verbose_name="Carga Horária (horas)")
+
+    class Meta:
+        verbose_name = "Curso"
+        verbose_name_plural = "Cursos"
+        ordering = ['nome']
+
+    def __str__(self):
+        return self.nome
+
+
+class Matricula(models.Model):
+    """
+    Matrícula de um membro ou congregado em um curso.
+    """
+    aluno = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='matriculas',
+        limit_choices_to={'papel__in': ['membro', 'congregado']},
+        verbose_name="Aluno"
+    )
+    curso = models.ForeignKey(Curso, on_delete=models.CASCADE, related_name='matriculas', verbose_name="Curso")
+    data_matricula = models.DateTimeField(default=timezone.now, verbose_name="Data de Matrícula")
+    concluido = models.BooleanField(default=False, verbose_name="Curso Concluído")
+    data_conclusao = models.DateTimeField(null=True, blank=True, verbose_name="Data de Conclusão")
+    nota_final = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name="Nota Final")
+
+    class Meta:
+        verbose_name = "Matrícula"
+        verbose_name_plural = "Matrículas"
+        ordering = ['-data_matricula']
+        # A restrição de unicidade também serve de índice (aluno, curso)
+        unique_together = [('aluno', 'curso')]
+
+    def __str__(self):
+        return f"{self.aluno} - {self.curso}"
+
+
+class SolicitacaoCertificado(models.Model):
+    """
+    Pedido de certificado de um aluno, que fica na fila do professor do curso até ser respondido.
+    """
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('aprovado', 'Aprovado'),
+        ('rejeitado', 'Rejeitado'),
+    ]
+    aluno = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='solicitacoes_certificado', verbose_name="Aluno"
+    )
+    curso = models.ForeignKey(
+        Curso, on_delete=models.CASCADE, related_name='solicitacoes_certificado', verbose_name="Curso"
+    )
+    professor = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='solicitacoes_para_aprovar', verbose_name="Professor"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente', verbose_name="Status")
+    data_solicitacao = models.DateTimeField(default=timezone.now, verbose_name="Data de Solicitação")
+    data_aprovacao = models.DateTimeField(null=True, blank=True, verbose_name="Data de Aprovação")
+    aprovado_por = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='certificados_aprovados',
+        verbose_name="Aprovado por"
+    )
+    observacao_professor = models.TextField(blank=True, verbose_name="Observação do Professor")
+
+    class Meta:
+        verbose_name = "Solicitação de Certificado"
+        verbose_name_plural = "Solicitações de Certificado"
+        ordering = ['-data_solicitacao']
+        indexes = [
+            # Fila do professor: WHERE professor = ? AND status = 'pendente' ORDER BY data_solicitacao, id
+            models.Index(fields=['professor', 'status', 'data_solicitacao', 'id'], name='usuarios_solicitacao_fila_idx'),
+            models.Index(fields=['aluno', 'curso'], name='usuarios_solicitacao_aluno_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.aluno} - {self.curso} ({self.get_status_display()})"
+
+
+class RegistroAuditoriaQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        raise TypeError("O registro de auditoria não pode ser alterado.")
+
+    def delete(self):
+        raise TypeError("O registro de auditoria não pode ser excluído.")
+
+
+class RegistroAuditoria(models.Model):
+    """
+    Registro (somente inserção) de uma ação administrativa sobre um usuário: quem fez,
+    o quê, quando e quais campos mudaram. Gravado em lote por usuarios/auditoria.py.
+    Ator e alvo não têm restrição de chave estrangeira, para que o registro sobreviva
+    à exclusão do usuário (ex: cadastro rejeitado); os nomes ficam guardados junto.
+    """
+    ACOES = [
+        ('criar', 'Criou o usuário'),
+        ('editar', 'Editou o usuário'),
+        ('excluir', 'Excluiu o usuário'),
+        ('aprovar', 'Aprovou o cadastro'),
+        ('desaprovar', 'Desfez a aprovação'),
+        ('rejeitar', 'Rejeitou o cadastro'),
+        ('ativar', 'Ativou o usuário'),
+        ('desativar', 'Desativou o usuário'),
+        ('alterar_papel', 'Alterou o papel'),
+        ('promover_superusuario', 'Promoveu a superusuário'),
+        ('remover_superusuario', 'Removeu de superusuário'),
+        ('importar', 'Importou membros'),
+    ]
+    ORIGENS = [
+        ('api', 'API'),
+        ('admin', 'Painel do Django'),
+        ('comando', 'Comando de gerenciamento'),
+    ]
+
+    criado_em = models.DateTimeField(default=timezone.now, verbose_name="Data da Ação")
+    acao = models.CharField(max_length=30, choices=ACOES, verbose_name="Ação")
+    origem = models.CharField(max_length=10, choices=ORIGENS, default='api', verbose_name="Origem")
+    ator = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+        null=True, blank=True, related_name='+', verbose_name="Feito por"
+    )
+    ator_nome = models.CharField(max_length=200, blank=True, verbose_name="Nome de quem fez")
+    alvo = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+        null=True, blank=True, related_name='+', verbose_name="Usuário afetado"
+    )
+    alvo_nome = models.CharField(max_length=200, blank=True, verbose_name="Nome do usuário afetado")
+    # {campo: [antes, depois]}
+    alteracoes = models.JSONField(default=dict, blank=True, verbose_name="Alterações")
+
+    objects = RegistroAuditoriaQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Registro de Auditoria"
+        verbose_name_plural = "Registros de Auditoria"
+        ordering = ['-criado_em', '-id']
+        indexes = [
+            models.Index(fields=['criado_em', 'id'], name='usuarios_auditoria_data_idx'),
+            models.Index(fields=['ator', 'criado_em'], name='usuarios_auditoria_ator_idx'),
+            models.Index(fields=['alvo', 'criado_em'], name='usuarios_auditoria_alvo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ator_nome or 'Sistema'}: {self.get_acao_display()} {self.alvo_nome}".strip()
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise TypeError("O registro de auditoria não pode ser alterado.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise TypeError("O registro de auditoria não pode ser excluído.")
@@ -0,0 +1,168 @@
+# usuarios/paginacao.py
+
+import base64
+import binascii
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Por quanto tempo a contagem (quando o banco não sabe estimar) é reaproveitada
+CACHE_TOTAL_SEGUNDOS = 5 * 60
+
+
+def _valor_json(valor):
+    # isoformat() completo: o DjangoJSONEncoder corta os microssegundos, e o cursor
+    # precisa do valor exato para não pular nem repetir linhas
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return str(valor)
+
+
+class PaginacaoKeyset(BasePagination):
+    """
+    Paginação por chave (keyset): cada página continua a partir dos valores da
+    última linha da anterior, ex: WHERE (nome_completo, id) > ('Maria', 42).
+    O custo não depende da profundidade da página e o cursor não pula nem repete
+    registros quando novos usuários são cadastrados durante a navegação.
+
+    A view define a ordenação em `ordenacao_keyset` (a última coluna deve ser única,
+    normalmente o id; '-campo' para ordem decrescente). Parâmetros: ?cursor=, ?limite= (padrão 50, máximo 200) e
+    ?total=1 para incluir um total aproximado.
+    """
+    cursor_query_param = 'cursor'
+    limite_query_param = 'limite'
+    limite_padrao = 50
+    limite_maximo = 200
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        ordenacao = getattr(view, 'ordenacao_keyset', ('id',))
+        self.campos = [campo.lstrip('-') for campo in ordenacao]
+        self.decrescentes = [campo.startswith('-') for campo in ordenacao]
+        self.limite = self.obter_limite(request)
+        self.total = self.estimar_total(queryset) if request.query_params.get('total') in ('1', 'true') else None
+
+        posicao, reverso = self.decodificar_cursor(queryset.model, request)
+        ordem = [
+            f'-{campo}' if decrescente != reverso else campo
+            for campo, decrescente in zip(self.campos, self.decrescentes)
+        ]
+        if posicao is not None:
+            queryset = queryset.filter(self.filtro_apos(posicao, reverso))
+
+        pagina = list(queryset.order_by(*ordem)[:self.limite + 1])
+        ha_mais = len(pagina) > self.limite
+        pagina = pagina[:self.limite]
+        if reverso:
+            pagina.reverse()
+
+        # Indo para frente sempre existe a página anterior ao cursor, e vice-versa
+        tem_proxima = ha_mais if not reverso else posicao is not None
+        tem_anterior = posicao is not None if not reverso else ha_mais
+        self.proxima = self.chave(pagina[-1]) if pagina and tem_proxima else None
+        self.anterior = self.chave(pagina[0]) if pagina and tem_anterior else None
+        return pagina
+
+    def obter_limite(self, request):
+        try:
+            limite = int(request.query_params.get(self.limite_query_param, self.limite_padrao))
+        except ValueError:
+            return self.limite_padrao
+        return max(1, min(limite, self.limite_maximo))
+
+    def filtro_apos(self, posicao, reverso):
+        """(a, b, c) > (x, y, z) expandido em OR/AND, que qualquer banco resolve pelo índice."""
+        filtro = Q()
+        for indice, campo in enumerate(self.campos):
+            operador = 'lt' if self.decrescentes[indice] != reverso else 'gt'
+            condicao = Q(**{f'{campo}__{operador}': posicao[indice]})
+            for anterior, valor in zip(self.campos[:indice], posicao):
+                condicao &= Q(**{anterior: valor})
+            filtro |= condicao
+        return filtro
+
+    def chave(self, objeto):
+        return [getattr(objeto, campo) for campo in self.campos]
+
+    # --- CURSOR ---
+
+    def codificar_cursor(self, posicao, reverso):
+        dados = json.dumps({'p': posicao, 'r': reverso}, default=_valor_json, separators=(',', ':'))
+        return base64.urlsafe_b64encode(dados.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decodificar_cursor(self, modelo, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            dados = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            valores = dados['p']
+            # As colunas da ordenação nunca são nulas: um null só vem de um cursor adulterado
+            if not isinstance(valores, list) or len(valores) != len(self.campos) or None in valores:
+                raise ValueError
+            posicao = [modelo._meta.get_field(campo).to_python(valor) for campo, valor in zip(self.campos, valores)]
+            return posicao, bool(dados.get('r'))
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def url_cursor(self, posicao, reverso):
+        if posicao is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), 'total')
+        return replace_query_param(url, self.cursor_query_param, self.codificar_cursor(posicao, reverso))
+
+    # --- TOTAL APROXIMADO ---
+
+    def estimar_total(self, queryset):
+        """
+        No PostgreSQL usa a estimativa do planejador (EXPLAIN), que não lê a tabela.
+        Nos outros bancos faz o COUNT e o reaproveita por alguns minutos para os mesmos filtros.
+        """
+        conexao = connections[queryset.db]
+        sql, parametros = queryset.order_by().query.sql_with_params()
+        if conexao.vendor == 'postgresql':
+            with conexao.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', parametros)
+                plano = cursor.fetchone()[0]
+            if isinstance(plano, str):
+                plano = json.loads(plano)
+            return int(plano[0]['Plan']['Plan Rows'])
+
+        assinatura = json.dumps([sql, [str(parametro) for parametro in parametros]])
+        chave = 'total_aproximado:' + hashlib.md5(assinatura.encode('utf-8')).hexdigest()
+        total = cache.get(chave)
+        if total is None:
+            total = queryset.count()
+            cache.set(chave, total, CACHE_TOTAL_SEGUNDOS)
+        return total
+
+    def get_paginated_response(self, data):
+        resposta = {
+            'next': self.url_cursor(self.proxima, False),
+            'previous': self.url_cursor(self.anterior, True),
+            'results': data,
+        }
+        if self.total is not None:
+            resposta['total_aproximado'] = self.total
+        return Response(resposta)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'total_aproximado': {'type': 'integer'},
+                'results': schema,
+            },
+        }
@@ -7,4 +7,12 @@ class IsSecretario(BasePermission):
     """
     def has_permission(self, request, view):
         # A permissão é concedida se o usuário estiver autenticado E tiver o papel de secretário.
-        return bool(request.user and request.user.is_authenticated and request.user.is_secretario)
\ No newline at end of file
+        return bool(request.user and request.user.is_authenticated and request.user.is_secretario)
+
+class IsProfessor(BasePermission):
+    """
+    Permissão customizada que permite acesso apenas a usuários
+    com o papel de 'professor'.
+    """
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.is_professor)
\ No newline at end of file
@@ -0,0 +1,199 @@
+# usuarios/relatorios.py
+
+from datetime import date
+from urllib.parse import urlencode
+
+from django.db.models import Avg, Case, Count, FloatField, IntegerField, Value, When
+from django.db.models.functions import Cast, ExtractDay, ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from home import cache as home_cache
+
+from .models import User
+
+# Namespace de cache invalidado a cada alteração de usuário (ver usuarios/signals.py)
+NAMESPACE = 'usuarios_relatorios'
+
+# Faixas etárias de 10 anos; a última é "80+"
+LARGURA_FAIXA = 10
+FAIXA_MAXIMA = 80
+
+# Campos que podem ser agrupados (distribuições e cruzamentos), com os rótulos de exibição
+DIMENSOES = {
+    'papel': dict(User.PAPEL_CHOICES),
+    'estado_civil': dict(User.ESTADO_CIVIL_CHOICES),
+    'nivel_escolar': dict(User.NIVEL_ESCOLAR_CHOICES),
+    'cidade': None,
+    'bairro': None,
+    'batizado_aguas': {True: 'Sim', False: 'Não'},
+    'frequenta_escola_biblica': {True: 'Sim', False: 'Não'},
+    'faixa_etaria': None,
+}
+
+# Cidades e bairros podem ter centenas de valores: as menores contagens viram "Outros"
+LIMITE_VALORES = {'cidade': 20, 'bairro': 30}
+
+# Filtros aceitos na query string (igualdade exata)
+FILTROS_TEXTO = {'papel', 'estado_civil', 'nivel_escolar', 'cidade', 'bairro'}
+FILTROS_BOOLEANOS = {'aprovado', 'ativo', 'batizado_aguas', 'frequenta_escola_biblica'}
+
+NAO_INFORMADO = 'Não informado'
+
+DIAS_POR_ANO = 365.2425
+
+
+class FiltroInvalido(ValueError):
+    pass
+
+
+def invalidar():
+    """Descarta os relatórios em cache. Chame depois de update()/bulk_create(), que não disparam sinais."""
+    home_cache.invalidar(NAMESPACE)
+
+
+def ler_filtros(parametros):
+    """
+    Converte a query string em filtros do queryset. Por padrão só entram os cadastros
+    aprovados e ativos (use ?aprovado=false ou ?ativo=false para ver os demais).
+    """
+    filtros = {'aprovado': True, 'ativo': True}
+    for campo in FILTROS_TEXTO:
+        valor = parametros.get(campo)
+        if valor:
+            escolhas = DIMENSOES.get(campo)
+            if escolhas and valor not in escolhas:
+                raise FiltroInvalido(f"Valor inválido para '{campo}': '{valor}'.")
+            filtros[campo] = valor
+    for campo in FILTROS_BOOLEANOS:
+        valor = parametros.get(campo)
+        if valor is None or valor == '':
+            continue
+        if valor.lower() not in ('true', 'false', '1', '0'):
+            raise FiltroInvalido(f"O parâmetro '{campo}' deve ser true ou false.")
+        filtros[campo] = valor.lower() in ('true', '1')
+    return filtros
+
+
+def _anos_atras(hoje, anos):
+    try:
+        return hoje.replace(year=hoje.year - anos)
+    except ValueError:
+        return date(hoje.year - anos, 2, 28)  # hoje é 29/02
+
+
+def _faixa_etaria(hoje):
+    """Expressão que classifica cada usuário na faixa etária (início da faixa), calculada no banco."""
+    condicoes = [
+        When(data_nascimento__lte=_anos_atras(hoje, inicio), then=Value(inicio))
+        for inicio in range(FAIXA_MAXIMA, 0, -LARGURA_FAIXA)
+    ]
+    condicoes.append(When(data_nascimento__isnull=False, then=Value(0)))
+    return Case(*condicoes, default=None, output_field=IntegerField())
+
+
+def _rotulo_faixa(inicio):
+    if inicio is None:
+        return NAO_INFORMADO
+    if inicio >= FAIXA_MAXIMA:
+        return f"{FAIXA_MAXIMA}+"
+    return f"{inicio}-{inicio + LARGURA_FAIXA - 1}"
+
+
+def _rotulo(dimensao, valor):
+    if dimensao == 'faixa_etaria':
+        return _rotulo_faixa(valor)
+    if valor in (None, ''):
+        return NAO_INFORMADO
+    escolhas = DIMENSOES[dimensao]
+    return escolhas.get(valor, valor) if escolhas else valor
+
+
+def faixas_etarias(queryset):
+    """Pirâmide etária: total por faixa de 10 anos em um único GROUP BY (o cadastro não tem campo de sexo)."""
+    contagens = dict(queryset.values_list('faixa_etaria').annotate(total=Count('pk')).order_by())
+    faixas = [
+        {'faixa': _rotulo_faixa(inicio), 'total': contagens.get(inicio, 0)}
+        for inicio in range(0, FAIXA_MAXIMA + 1, LARGURA_FAIXA)
+    ]
+    faixas.append({'faixa': NAO_INFORMADO, 'total': contagens.get(None, 0)})
+    return faixas
+
+
+def distribuicao(queryset, dimensao):
+    """Total por valor do campo, em um GROUP BY, do mais comum para o menos comum."""
+    linhas = list(queryset.values_list(dimensao).annotate(total=Count('pk')).order_by('-total', dimensao))
+    limite = LIMITE_VALORES.get(dimensao)
+    outros = 0
+    if limite and len(linhas) > limite:
+        outros = sum(total for _, total in linhas[limite:])
+        linhas = linhas[:limite]
+    itens = [{'valor': valor, 'rotulo': _rotulo(dimensao, valor), 'total': total} for valor, total in linhas]
+    if outros:
+        itens.append({'valor': None, 'rotulo': 'Outros', 'total': outros})
+    return itens
+
+
+def cruzamento(queryset, linhas, colunas):
+    """Tabela cruzada (ex: estado civil x faixa etária) em um único GROUP BY pelos dois campos."""
+    tabela = {}
+    consulta = queryset.values_list(linhas, colunas).annotate(total=Count('pk')).order_by()
+    for valor_linha, valor_coluna, total in consulta:
+        tabela.setdefault(_rotulo(linhas, valor_linha), {})[_rotulo(colunas, valor_coluna)] = total
+    return {'linhas': linhas, 'colunas': colunas, 'valores': tabela}
+
+
+def _ano_fracionario(campo):
+    """Data como ano com fração (ex: 01/07/1990 -> 1990.5), calculada no banco em qualquer SGBD."""
+    return (
+        Cast(ExtractYear(campo), FloatField())
+        + (Cast(ExtractMonth(campo), FloatField()) - 1) / Value(12.0)
+        + (Cast(ExtractDay(campo), FloatField()) - 1) / Value(DIAS_POR_ANO)
+    )
+
+
+def resumo_idades(queryset, hoje):
+    """
+    Média e mediana de idade calculadas no banco, sem trazer as datas de nascimento:
+    a média pelo AVG do ano de nascimento fracionário e a mediana lendo só a(s)
+    data(s) do meio da ordenação (OFFSET), já que a idade só depende da data.
+    """
+    nascimentos = queryset.filter(data_nascimento__isnull=False).order_by()
+    agregado = nascimentos.aggregate(total=Count('pk'), ano_medio=Avg(_ano_fracionario('data_nascimento')))
+    total = agregado['total']
+    if not total:
+        return {'media': None, 'mediana': None}
+
+    ano_hoje = hoje.year + (hoje.month - 1) / 12 + (hoje.day - 1) / DIAS_POR_ANO
+    meio = (total - 1) // 2
+    centrais = nascimentos.order_by('data_nascimento').values_list('data_nascimento', flat=True)
+    centrais = centrais[meio:meio + (1 if total % 2 else 2)]
+    idades = [(hoje - nascimento).days / DIAS_POR_ANO for nascimento in centrais]
+    return {
+        'media': round(ano_hoje - agregado['ano_medio'], 1),
+        'mediana': round(sum(idades) / len(idades), 1),
+    }
+
+
+def gerar(filtros, linhas=None, colunas=None, hoje=None):
+    hoje = hoje or timezone.localdate()
+    queryset = User.objects.filter(**filtros).annotate(faixa_etaria=_faixa_etaria(hoje))
+    dados = {
+        'filtros': filtros,
+        'total': queryset.count(),
+        'idade': resumo_idades(queryset, hoje),
+        'faixas_etarias': faixas_etarias(queryset),
+        'distribuicoes': {
+            dimensao: distribuicao(queryset, dimensao) for dimensao in DIMENSOES if dimensao != 'faixa_etaria'
+        },
+    }
+    if linhas and colunas:
+        dados['cruzamento'] = cruzamento(queryset, linhas, colunas)
+    return dados
+
+
+def obter(filtros, linhas=None, colunas=None):
+    """Relatório demográfico, em cache por conjunto de filtros até algum usuário mudar (ou virar o dia)."""
+    hoje = timezone.localdate()
+    partes = (hoje.isoformat(), urlencode(sorted(filtros.items())), linhas, colunas)
+    dados, _ = home_cache.obter_ou_gerar(NAMESPACE, partes, lambda: gerar(filtros, linhas, colunas, hoje))
+    return dados
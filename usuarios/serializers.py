@@ -1,8 +1,64 @@
 from rest_framework import serializers
-from .models import User, Filho
+from .models import User, Filho, RegistroAuditoria, Curso, Matricula, SolicitacaoCertificado
+from .importacao import PAPEIS_IMPORTAVEIS
 from django.utils import timezone
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+
+def _lista_parametro(request, nome):
+    return {campo.strip() for campo in request.query_params.get(nome, '').split(',') if campo.strip()}
+
+
+class CamposEsparsosMixin:
+    """
+    Permite ao cliente escolher os campos da resposta: ?fields=id,nome_completo
+    devolve só esses, ?omit=filhos devolve todos menos esses (apenas em leituras).
+    As views usam `otimizar_queryset` para que a consulta acompanhe o que foi pedido.
+    """
+    # Campos de método: nome no serializer -> colunas do modelo que o método lê
+    colunas_dos_metodos = {}
+    # Relações: nome no serializer -> prefetch_related
+    relacoes_prefetch = {}
+    # Relações: nome no serializer -> colunas lidas do modelo relacionado (via select_related)
+    relacoes_select = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        pedidos = _lista_parametro(request, 'fields')
+        omitidos = _lista_parametro(request, 'omit')
+        for nome in list(self.fields):
+            if (pedidos and nome not in pedidos) or nome in omitidos:
+                self.fields.pop(nome)
+
+    @classmethod
+    def otimizar_queryset(cls, queryset, request, sempre=()):
+        """
+        Lê só as colunas dos campos selecionados (.only()) e faz o prefetch/join
+        das relações apenas quando elas foram pedidas. `sempre` são colunas que a
+        view precisa de qualquer forma (ex: as da paginação).
+        """
+        modelo = cls.Meta.model
+        colunas_modelo = {campo.name for campo in modelo._meta.concrete_fields}
+        colunas = {'pk', *sempre}
+
+        for nome, campo in cls(context={'request': request}).fields.items():
+            if nome in cls.relacoes_prefetch:
+                queryset = queryset.prefetch_related(cls.relacoes_prefetch[nome])
+            elif nome in cls.relacoes_select:
+                queryset = queryset.select_related(nome)
+                colunas.add(nome)
+                colunas.update(f'{nome}__{coluna}' for coluna in cls.relacoes_select[nome])
+            elif nome in cls.colunas_dos_metodos:
+                colunas.update(cls.colunas_dos_metodos[nome])
+            elif campo.source.startswith('get_') and campo.source.endswith('_display'):
+                colunas.add(campo.source[len('get_'):-len('_display')])
+            elif campo.source in colunas_modelo:
+                colunas.add(campo.source)
+        return queryset.only(*colunas)
+
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
@@ -51,7 +107,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(CamposEsparsosMixin, serializers.ModelSerializer):
     filhos = FilhoSerializer(many=True, read_only=True)
     estado_civil_display = serializers.CharField(source='get_estado_civil_display', read_only=True)
     nivel_escolar_display = serializers.CharField(source='get_nivel_escolar_display', read_only=True)
@@ -60,6 +116,11 @@ class UserProfileSerializer(serializers.ModelSerializer):
     foto_perfil = serializers.SerializerMethodField()
     aprovado_por = serializers.StringRelatedField()
 
+    colunas_dos_metodos = {'foto_perfil': ['foto_perfil']}
+    relacoes_prefetch = {'filhos': 'filhos'}
+    # User.__str__ usa o nome completo ou o username
+    relacoes_select = {'aprovado_por': ['nome_completo', 'username']}
+
     class Meta:
         model = User
         # Lista explícita de campos para expor, excluindo a senha e campos de admin.
@@ -104,13 +165,15 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
             'tem_alergia_medicacao', 'alergias_texto'
         ]
 
-class AdminUserListSerializer(serializers.ModelSerializer):
+class AdminUserListSerializer(CamposEsparsosMixin, serializers.ModelSerializer):
     """
     Serializer para a lista de usuários na área de administração.
     """
     papel_display = serializers.CharField(source='get_papel_display', read_only=True)
     foto_perfil_url = serializers.SerializerMethodField()
 
+    colunas_dos_metodos = {'foto_perfil_url': ['foto_perfil']}
+
     class Meta:
         model = User
         fields = [
@@ -165,7 +228,103 @@ class AdminUserUpdateSerializer(serializers.ModelSerializer):
             'papel', 'ativo' # Secretário pode mudar o papel e o status de ativo
         ]
 
-class UserBasicSerializer(serializers.ModelSerializer):
+class AcaoEmLoteSerializer(serializers.Serializer):
+    """
+    Valida o pedido de uma ação em lote sobre vários usuários
+    (ex: aprovar como membro todos os cadastros do domingo).
+    """
+    ACOES = [
+        ('aprovar', 'Aprovar'),
+        ('rejeitar', 'Rejeitar (excluir cadastros pendentes)'),
+        ('ativar', 'Ativar'),
+        ('desativar', 'Desativar'),
+        ('alterar_papel', 'Alterar papel'),
+    ]
+    ACOES_COM_PAPEL = {'aprovar', 'alterar_papel'}
+    MAXIMO_IDS = 500
+
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAXIMO_IDS)
+    acao = serializers.ChoiceField(choices=ACOES)
+    papel = serializers.ChoiceField(choices=User.PAPEL_CHOICES, required=False)
+
+    def validate(self, data):
+        if data['acao'] in self.ACOES_COM_PAPEL and not data.get('papel'):
+            raise serializers.ValidationError({"papel": "Informe o papel para esta ação."})
+        # Mantém a ordem enviada, sem repetições
+        data['ids'] = list(dict.fromkeys(data['ids']))
+        return data
+
+class ImportacaoUsuariosSerializer(serializers.Serializer):
+    """Valida o envio de uma planilha de fichas de membros (.csv ou .xlsx)."""
+    arquivo = serializers.FileField()
+    simular = serializers.BooleanField(default=False, help_text="Só valida, sem gravar nada.")
+    papel_padrao = serializers.ChoiceField(choices=sorted(PAPEIS_IMPORTAVEIS), default='membro')
+
+class RegistroAuditoriaSerializer(serializers.ModelSerializer):
+    """Registro de auditoria (somente leitura). Ator e alvo vão pelo id, que continua válido após exclusões."""
+    acao_display = serializers.CharField(source='get_acao_display', read_only=True)
+
+    class Meta:
+        model = RegistroAuditoria
+        fields = ['id', 'criado_em', 'acao', 'acao_display', 'origem', 'ator', 'ator_nome', 'alvo', 'alvo_nome', 'alteracoes']
+        read_only_fields = fields
+
+class CursoSerializer(serializers.ModelSerializer):
+    """Curso disponível, com o nome do professor e se o usuário logado já está matriculado."""
+    professor_nome = serializers.CharField(source='professor.nome_completo', read_only=True)
+    matriculado = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Curso
+        fields = ['id', 'nome', 'descricao', 'carga_horaria', 'professor', 'professor_nome', 'matriculado']
+
+class MatriculaSerializer(serializers.ModelSerializer):
+    """Matrícula do aluno, com a situação do último pedido de certificado."""
+    curso_nome = serializers.CharField(source='curso.nome', read_only=True)
+    carga_horaria = serializers.IntegerField(source='curso.carga_horaria', read_only=True)
+    certificado_id = serializers.IntegerField(read_only=True)
+    certificado_status = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Matricula
+        fields = [
+            'id', 'curso', 'curso_nome', 'carga_horaria', 'data_matricula', 'concluido', 'data_conclusao',
+            'nota_final', 'certificado_id', 'certificado_status',
+        ]
+
+class SolicitacaoCertificadoSerializer(serializers.ModelSerializer):
+    """Pedido de certificado como aparece na fila do professor."""
+    aluno_nome = serializers.CharField(source='aluno.nome_completo', read_only=True)
+    curso_nome = serializers.CharField(source='curso.nome', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = SolicitacaoCertificado
+        fields = [
+            'id', 'aluno', 'aluno_nome', 'curso', 'curso_nome', 'status', 'status_display',
+            'data_solicitacao', 'data_aprovacao', 'observacao_professor',
+        ]
+
+class RespostaCertificadosSerializer(serializers.Serializer):
+    """
+    Valida a resposta de um professor a vários pedidos de certificado de uma vez.
+    """
+    ACOES = [
+        ('aprovar', 'Aprovar'),
+        ('rejeitar', 'Rejeitar'),
+    ]
+    MAXIMO_IDS = 500
+
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAXIMO_IDS)
+    acao = serializers.ChoiceField(choices=ACOES)
+    observacao = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, data):
+        # Mantém a ordem enviada, sem repetições
+        data['ids'] = list(dict.fromkeys(data['ids']))
+        return data
+
+class UserBasicSerializer(CamposEsparsosMixin, serializers.ModelSerializer):
     """Serializer básico para listagem de usuários"""
     papel_display = serializers.CharField(source='get_papel_display', read_only=True)
     
@@ -0,0 +1,39 @@
+# usuarios/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import aniversariantes, estatisticas, relatorios
+from .autenticacao import invalidar_usuarios
+from .models import Filho, User
+
+# Salvamentos que não mudam nada do que aparece nas estatísticas (ex: o login)
+CAMPOS_IRRELEVANTES = {'last_login', 'password'}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_estatisticas(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= CAMPOS_IRRELEVANTES:
+        return
+    estatisticas.invalidar()
+    relatorios.invalidar()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Filho)
+@receiver(post_delete, sender=Filho)
+def invalidar_aniversariantes(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= CAMPOS_IRRELEVANTES:
+        return
+    aniversariantes.invalidar()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_usuario_autenticado(sender, instance, update_fields=None, **kwargs):
+    """Papel, ativo, senha ou perfil alterados: os workers deixam de usar a cópia memorizada."""
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidar_usuarios([instance.pk])
@@ -1,3 +1,517 @@
+import base64
+import csv
+import io
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from home import cache as home_cache
+
+from . import aniversariantes, auditoria, autenticacao, estatisticas, views
+from .autenticacao import JWTAutenticacaoEmCache
+from .importacao import ImportadorUsuarios
+from .models import Curso, Matricula, RegistroAuditoria, SolicitacaoCertificado, User
+
+
+class BaseAPITestCase(TestCase):
+    def setUp(self):
+        self.secretario = User.objects.create_user(
+            'secretaria', 'secretaria@igreja.com', None, papel='secretario', aprovado=True,
+            nome_completo='Secretaria da Igreja',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.secretario)
+
+    def criar_usuario(self, username, **campos):
+        campos.setdefault('nome_completo', username.title())
+        campos.setdefault('papel', 'membro')
+        campos.setdefault('aprovado', True)
+        return User.objects.create_user(username, f'{username}@igreja.com', None, **campos)
+
+
+class BuscaUsuariosTests(BaseAPITestCase):
+    def buscar(self, termo):
+        resposta = self.client.get(reverse('api-admin-user-list'), {'search': termo})
+        self.assertEqual(resposta.status_code, 200)
+        ids = [usuario['id'] for usuario in resposta.json()['results']]
+        return list(User.objects.filter(pk__in=ids).values_list('username', flat=True))
+
+    def test_busca_ignora_acentos_e_maiusculas(self):
+        self.criar_usuario('joao', nome_completo='João Antônio da Silva')
+        self.criar_usuario('maria', nome_completo='Maria Souza')
+        self.assertEqual(self.buscar('JOAO antonio'), ['joao'])
+        self.assertEqual(self.buscar('silv'), ['joao'])
+
+    def test_busca_por_trecho_do_cpf_e_do_telefone(self):
+        self.criar_usuario('joao', cpf='123.456.789-00', telefone='(11) 98765-4321')
+        self.criar_usuario('maria', cpf='111.222.333-96', telefone='(21) 97777-0000')
+        self.assertEqual(self.buscar('123.456'), ['joao'])
+        self.assertEqual(self.buscar('56789'), ['joao'])
+        self.assertEqual(self.buscar('8765-43'), ['joao'])
+        self.assertEqual(self.buscar('maria 7777'), ['maria'])
+
+    def test_indice_acompanha_edicoes_e_exclusoes(self):
+        usuario = self.criar_usuario('joao', nome_completo='João Silva')
+        usuario.nome_completo = 'João Pereira'
+        usuario.save()
+        self.assertEqual(self.buscar('pereira'), ['joao'])
+        self.assertEqual(self.buscar('silva'), [])
+        usuario.delete()
+        self.assertEqual(self.buscar('pereira'), [])
+
+
+class PaginacaoKeysetTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        # Nomes repetidos: a ordem depende do desempate pelo id
+        for indice in range(25):
+            self.criar_usuario(f'membro{indice:02d}', nome_completo=f'Membro {indice % 5}')
+
+    def listar(self, url, **parametros):
+        resposta = self.client.get(url, parametros)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def test_percorre_todas_as_paginas_sem_pular_nem_repetir(self):
+        esperado = list(User.objects.order_by('nome_completo', 'id').values_list('id', flat=True))
+        vistos = []
+        dados = self.listar(reverse('api-admin-user-list'), limite=7)
+        self.assertIsNone(dados['previous'])
+        while True:
+            vistos += [usuario['id'] for usuario in dados['results']]
+            if not dados['next']:
+                break
+            dados = self.listar(dados['next'])
+        self.assertEqual(vistos, esperado)
+
+        # Voltando pela página anterior chega-se às mesmas linhas
+        anterior = self.listar(dados['previous'])
+        self.assertEqual([usuario['id'] for usuario in anterior['results']], esperado[-12:-5])
+
+    def test_cadastro_durante_a_navegacao_nao_repete_linhas(self):
+        primeira = self.listar(reverse('api-admin-user-list'), limite=10)
+        novo = self.criar_usuario('aaron', nome_completo='Aaron')
+        segunda = self.listar(primeira['next'])
+        ids = [usuario['id'] for usuario in primeira['results'] + segunda['results']]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertNotIn(novo.pk, ids)
+
+    def test_cursor_invalido(self):
+        adulterados = [b'{"p":[null,1]}', b'{"p":"ab"}', b'[1,2]']
+        cursores = ['invalido'] + [base64.urlsafe_b64encode(dados).decode().rstrip('=') for dados in adulterados]
+        for cursor in cursores:
+            with self.subTest(cursor=cursor):
+                resposta = self.client.get(reverse('api-admin-user-list'), {'cursor': cursor})
+                self.assertEqual(resposta.status_code, 404)
+
+
+class AcoesEmLoteTests(BaseAPITestCase):
+    def executar(self, ids, acao, **dados):
+        resposta = self.client.post(reverse('api-admin-user-bulk'), {'ids': ids, 'acao': acao, **dados}, format='json')
+        self.assertEqual(resposta.status_code, 200)
+        return {item['id']: item['sucesso'] for item in resposta.json()['resultados']}
+
+    def test_aprovar_so_cadastros_pendentes(self):
+        pendente = self.criar_usuario('pendente', aprovado=False)
+        aprovado = self.criar_usuario('aprovado', papel='secretario')
+        resultados = self.executar([pendente.pk, aprovado.pk], 'aprovar', papel='membro')
+        self.assertEqual(resultados, {pendente.pk: True, aprovado.pk: False})
+        pendente.refresh_from_db()
+        aprovado.refresh_from_db()
+        self.assertEqual((pendente.aprovado, pendente.papel, pendente.aprovado_por), (True, 'membro', self.secretario))
+        self.assertEqual((aprovado.papel, aprovado.aprovado_por), ('secretario', None))
+
+    def test_secretario_nao_se_rebaixa_pela_aprovacao(self):
+        resultados = self.executar([self.secretario.pk], 'aprovar', papel='membro')
+        self.assertEqual(resultados, {self.secretario.pk: False})
+        self.secretario.refresh_from_db()
+        self.assertEqual(self.secretario.papel, 'secretario')
+
+    def test_acoes_no_proprio_usuario_sao_recusadas(self):
+        for acao, dados in (('rejeitar', {}), ('desativar', {}), ('alterar_papel', {'papel': 'membro'})):
+            self.assertEqual(self.executar([self.secretario.pk], acao, **dados), {self.secretario.pk: False}, acao)
+        self.secretario.refresh_from_db()
+        self.assertEqual((self.secretario.papel, self.secretario.ativo), ('secretario', True))
+
+
+class ImportacaoUsuariosTests(BaseAPITestCase):
+    def importar(self, conteudo, nome='membros.csv'):
+        arquivo = SimpleUploadedFile(nome, conteudo, content_type='text/csv')
+        return self.client.post(reverse('api-admin-user-import'), {'arquivo': arquivo}, format='multipart')
+
+    def test_csv_do_excel_em_cp1252(self):
+        conteudo = 'nome_completo;cidade\r\nJoão da Conceição;São Paulo\r\n'.encode('cp1252')
+        resposta = self.importar(conteudo)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['importados'], 1)
+        self.assertTrue(User.objects.filter(nome_completo='João da Conceição', cidade='São Paulo').exists())
+
+    def test_csv_em_utf8_com_bom(self):
+        resposta = self.importar('nome_completo;cidade\nJoão;São Paulo\n'.encode('utf-8-sig'))
+        self.assertEqual(resposta.json()['importados'], 1)
+        self.assertTrue(User.objects.filter(nome_completo='João', cidade='São Paulo').exists())
+
+    def test_arquivo_ilegivel_nao_grava_nenhum_lote(self):
+        linhas = [f'Membro {indice}' for indice in range(700)]
+        conteudo = ('nome_completo\n' + '\n'.join(linhas)).encode('utf-8') + b'\nInv\x81lido\n'
+        resposta = self.importar(conteudo)
+        self.assertEqual(resposta.status_code, 400)
+        self.assertFalse(User.objects.filter(nome_completo__startswith='Membro').exists())
+
+    def test_username_cadastrado_durante_a_importacao(self):
+        montar = ImportadorUsuarios.montar
+
+        def montar_com_cadastro_concorrente(importador, dados, agora):
+            # Outra pessoa se cadastra com o mesmo username depois que a importação começou
+            if dados['username'] == 'ocupado':
+                self.criar_usuario('ocupado')
+            return montar(importador, dados, agora)
+
+        linhas = [f'Membro {indice};membro{indice}' for indice in range(700)]
+        linhas[600] = 'Ocupado;ocupado'
+        conteudo = ('nome_completo;username\n' + '\n'.join(linhas)).encode('utf-8')
+        with mock.patch.object(ImportadorUsuarios, 'montar', montar_com_cadastro_concorrente):
+            resposta = self.importar(conteudo)
+        self.assertEqual(resposta.status_code, 200)
+        dados = resposta.json()
+        self.assertEqual((dados['importados'], dados['total_erro']), (699, 1))
+        self.assertEqual(dados['erros'][0]['linha'], 602)
+        self.assertEqual(User.objects.filter(nome_completo__startswith='Membro').count(), 699)
+
+
+class ExportacaoUsuariosTests(BaseAPITestCase):
+    def exportar(self):
+        resposta = self.client.get(reverse('api-admin-user-export'), {'formato': 'csv'})
+        self.assertEqual(resposta.status_code, 200)
+        texto = b''.join(resposta.streaming_content).decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(texto), delimiter=';'))
+
+    def test_valores_com_formula_saem_como_texto(self):
+        self.criar_usuario('malicioso', nome_completo='=HYPERLINK("http://exemplo.com","clique")', bairro='@SUM(A1)')
+        linha = next(linha for linha in self.exportar() if linha['username'] == 'malicioso')
+        self.assertEqual(linha['nome_completo'], '\'=HYPERLINK("http://exemplo.com","clique")')
+        self.assertEqual(linha['bairro'], "'@SUM(A1)")
+
+    def test_planilha_exportada_volta_sem_o_apostrofo(self):
+        self.criar_usuario('malicioso', nome_completo='-Fulano')
+        linha = next(linha for linha in self.exportar() if linha['username'] == 'malicioso')
+        self.assertEqual(linha['nome_completo'], "'-Fulano")
+        conteudo = io.StringIO()
+        escritor = csv.writer(conteudo, delimiter=';')
+        escritor.writerows([['nome_completo'], [linha['nome_completo']]])
+        User.objects.filter(username='malicioso').delete()
+        arquivo = SimpleUploadedFile('membros.csv', conteudo.getvalue().encode('utf-8'))
+        resposta = self.client.post(reverse('api-admin-user-import'), {'arquivo': arquivo}, format='multipart')
+        self.assertEqual(resposta.json()['importados'], 1)
+        self.assertTrue(User.objects.filter(nome_completo='-Fulano').exists())
+
+
+class AniversariantesTests(BaseAPITestCase):
+    def nomes(self, hoje, de=None, ate=None):
+        if de is None:
+            de, ate = aniversariantes.intervalo_padrao(hoje)
+        dados = aniversariantes.gerar(de, ate, hoje)
+        return [(item['nome_completo'], item['dia']) for item in dados['nascimento']]
+
+    def test_29_de_fevereiro_em_ano_nao_bissexto(self):
+        self.criar_usuario('bissexto', nome_completo='Bissexto', data_nascimento=date(2000, 2, 29))
+        self.assertEqual(self.nomes(date(2027, 2, 10)), [('Bissexto', date(2027, 2, 28))])
+        self.assertEqual(self.nomes(date(2028, 2, 10)), [('Bissexto', date(2028, 2, 29))])
+        # Intervalo que vira o ano e termina em 28/02 de um ano bissexto: o 29/02 fica de fora
+        self.assertEqual(self.nomes(date(2026, 12, 25), 1220, 228), [('Bissexto', date(2027, 2, 28))])
+        self.assertEqual(self.nomes(date(2027, 12, 25), 1220, 228), [])
+
+
+class AutenticacaoEmCacheTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        autenticacao._usuarios.clear()
+        self.addCleanup(autenticacao._usuarios.clear)
+        self.usuario = self.criar_usuario('membro')
+        self.token = AccessToken.for_user(self.usuario)
+        self.autenticacao = JWTAutenticacaoEmCache()
+
+    def autenticar(self):
+        return self.autenticacao.get_user(self.token)
+
+    def salvar(self, **campos):
+        for campo, valor in campos.items():
+            setattr(self.usuario, campo, valor)
+        # A versão só muda depois do commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.save()
+
+    def test_instancia_nova_por_requisicao_sem_consultar_o_banco(self):
+        primeiro = self.autenticar()
+        with self.assertNumQueries(0):
+            segundo = self.autenticar()
+        self.assertEqual(segundo, primeiro)
+        self.assertIsNot(segundo, primeiro)
+        self.assertIsNot(segundo._state, primeiro._state)
+        self.assertFalse(segundo._state.adding)
+
+        segundo.nome_completo = 'Alterado'
+        segundo._state.fields_cache['aprovado_por'] = self.secretario
+        terceiro = self.autenticar()
+        self.assertEqual(terceiro.nome_completo, 'Membro')
+        self.assertEqual(terceiro._state.fields_cache, {})
+
+    def test_troca_de_versao_recarrega_o_usuario(self):
+        self.autenticar()
+        home_cache.invalidar(autenticacao._namespace(self.usuario.pk))
+        with self.assertNumQueries(1):
+            self.autenticar()
+        with self.assertNumQueries(0):
+            self.autenticar()
+
+    def test_mudanca_de_papel_e_de_ativo_vale_na_requisicao_seguinte(self):
+        self.assertEqual(self.autenticar().papel, 'membro')
+        self.salvar(papel='secretario', ativo=False)
+        usuario = self.autenticar()
+        self.assertEqual((usuario.papel, usuario.ativo), ('secretario', False))
+
+    def test_usuario_desativado_perde_o_acesso(self):
+        self.autenticar()
+        self.salvar(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.autenticar()
+
+
+@mock.patch('usuarios.auditoria._garantir_thread')
+class AuditoriaTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        auditoria._buffer.clear()
+        self.addCleanup(auditoria._buffer.clear)
+        self.addCleanup(auditoria._sinal.clear)
+        self.alvos = [self.criar_usuario(f'alvo{indice}') for indice in range(3)]
+
+    def test_registro_entra_na_fila_so_depois_do_commit(self, garantir_thread):
+        with self.captureOnCommitCallbacks() as callbacks:
+            auditoria.registrar('aprovar', self.secretario, self.alvos[0])
+            self.assertEqual(auditoria._buffer, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(auditoria._buffer), 1)
+        garantir_thread.assert_called_once()
+        # Nada é gravado na requisição
+        self.assertFalse(RegistroAuditoria.objects.exists())
+
+    def test_descarga_grava_tudo_em_um_unico_insert(self, _):
+        with self.captureOnCommitCallbacks(execute=True):
+            auditoria.registrar_varios('desativar', self.secretario, self.alvos)
+            auditoria.registrar('alterar_papel', self.secretario, self.alvos[0], {'papel': ['membro', 'lider']})
+        with self.assertNumQueries(1):
+            auditoria.descarregar()
+        self.assertEqual(auditoria._buffer, [])
+        self.assertEqual(RegistroAuditoria.objects.filter(acao='desativar').count(), 3)
+        registro = RegistroAuditoria.objects.get(acao='alterar_papel')
+        self.assertEqual((registro.ator_id, registro.alvo_nome), (self.secretario.pk, str(self.alvos[0])))
+        self.assertEqual(registro.alteracoes, {'papel': ['membro', 'lider']})
+
+    def test_buffer_cheio_acorda_a_thread(self, _):
+        with mock.patch.object(auditoria, 'LIMITE_BUFFER', 4):
+            with self.captureOnCommitCallbacks(execute=True):
+                auditoria.registrar_varios('ativar', self.secretario, self.alvos)
+            self.assertFalse(auditoria._sinal.is_set())
+            with self.captureOnCommitCallbacks(execute=True):
+                auditoria.registrar('ativar', self.secretario, self.alvos[0])
+            self.assertTrue(auditoria._sinal.is_set())
+
+    def test_falha_no_banco_devolve_os_registros_ao_buffer(self, _):
+        with self.captureOnCommitCallbacks(execute=True):
+            auditoria.registrar_varios('ativar', self.secretario, self.alvos)
+        pendentes = list(auditoria._buffer)
+        with mock.patch.object(RegistroAuditoria.objects, 'bulk_create', side_effect=DatabaseError):
+            with self.assertLogs('usuarios.auditoria', 'ERROR'):
+                auditoria.descarregar()
+        self.assertEqual(auditoria._buffer, pendentes)
+        # A próxima descarga (da thread ou do atexit no encerramento do worker) grava os mesmos registros
+        auditoria.descarregar()
+        self.assertEqual(RegistroAuditoria.objects.count(), 3)
+
+
+class CursosCertificadosTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.professor = self.criar_usuario('professor', papel='professor')
+        self.outro_professor = self.criar_usuario('outro.professor', papel='professor')
+        self.curso = Curso.objects.create(nome='Libras', professor=self.professor, carga_horaria=40)
+        self.outro_curso = Curso.objects.create(nome='Teologia', professor=self.professor, carga_horaria=20)
+        self.aluno = self.criar_usuario('aluno')
+
+    def pedir(self, aluno, curso=None, minutos_atras=0, **campos):
+        curso = curso or self.curso
+        Matricula.objects.get_or_create(aluno=aluno, curso=curso)
+        return SolicitacaoCertificado.objects.create(
+            aluno=aluno, curso=curso, professor=curso.professor,
+            data_solicitacao=timezone.now() - timedelta(minutes=minutos_atras), **campos,
+        )
+
+    def fila(self, **parametros):
+        self.client.force_authenticate(self.professor)
+        resposta = self.client.get(reverse('api-professor-solicitacoes'), parametros)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def test_matricula_unica_por_curso(self):
+        self.client.force_authenticate(self.aluno)
+        url = reverse('api-curso-matricula', args=[self.curso.pk])
+        self.assertEqual(self.client.post(url).status_code, 201)
+        segunda = self.client.post(url)
+        self.assertEqual(segunda.status_code, 400)
+        self.assertEqual(Matricula.objects.filter(aluno=self.aluno, curso=self.curso).count(), 1)
+
+    def test_fila_do_professor(self):
+        alunos = [self.criar_usuario(f'aluno{indice}') for indice in range(3)]
+        # Mesma data de solicitação: o id desempata a ordem
+        mesmo_momento = timezone.now() - timedelta(minutes=5)
+        antigo = self.pedir(alunos[0], minutos_atras=30)
+        empatados = [
+            SolicitacaoCertificado.objects.create(
+                aluno=aluno, curso=self.curso, professor=self.professor, data_solicitacao=mesmo_momento,
+            )
+            for aluno in alunos[1:]
+        ]
+        recente = self.pedir(self.aluno, minutos_atras=1)
+        outro_curso = self.pedir(self.aluno, self.outro_curso, minutos_atras=10)
+        respondido = self.pedir(alunos[0], self.outro_curso, status='rejeitado')
+        # Pedido da fila de outro professor
+        curso_alheio = Curso.objects.create(nome='Música', professor=self.outro_professor)
+        self.pedir(self.aluno, curso_alheio)
+
+        esperado = [antigo.pk, outro_curso.pk, *[pedido.pk for pedido in empatados], recente.pk]
+        dados = self.fila()
+        self.assertEqual([item['id'] for item in dados['results']], esperado)
+
+        # Página a página pelo cursor, sem pular nem repetir
+        vistos = []
+        dados = self.fila(limite=2)
+        while True:
+            vistos += [item['id'] for item in dados['results']]
+            if not dados['next']:
+                break
+            dados = self.client.get(dados['next']).json()
+        self.assertEqual(vistos, esperado)
+
+        self.assertEqual([item['id'] for item in self.fila(curso=self.outro_curso.pk)['results']], [outro_curso.pk])
+        self.assertEqual([item['id'] for item in self.fila(status='rejeitado')['results']], [respondido.pk])
+
+    def test_fila_exige_papel_de_professor(self):
+        self.client.force_authenticate(self.aluno)
+        self.assertEqual(self.client.get(reverse('api-professor-solicitacoes')).status_code, 403)
+
+    def test_responder_pedidos(self):
+        pendente = self.pedir(self.aluno)
+        respondido = self.pedir(self.aluno, self.outro_curso, status='rejeitado')
+        alheio = self.pedir(self.aluno, Curso.objects.create(nome='Música', professor=self.outro_professor))
+
+        self.client.force_authenticate(self.professor)
+        resposta = self.client.post(reverse('api-professor-responder'), {
+            'ids': [pendente.pk, respondido.pk, alheio.pk], 'acao': 'aprovar', 'observacao': 'Parabéns!',
+        }, format='json')
+        self.assertEqual(resposta.status_code, 200)
+        dados = resposta.json()
+        self.assertEqual((dados['total_sucesso'], dados['total_erro']), (1, 2))
+        self.assertEqual({item['id']: item['sucesso'] for item in dados['resultados']}, {
+            pendente.pk: True, respondido.pk: False, alheio.pk: False,
+        })
+
+        pendente.refresh_from_db()
+        self.assertEqual((pendente.status, pendente.aprovado_por, pendente.observacao_professor), (
+            'aprovado', self.professor, 'Parabéns!',
+        ))
+        self.assertIsNotNone(pendente.data_aprovacao)
+        self.assertTrue(Matricula.objects.get(aluno=self.aluno, curso=self.curso).concluido)
+        # Só o pedido aprovado conclui a matrícula; os demais não mudam
+        self.assertFalse(Matricula.objects.get(aluno=self.aluno, curso=self.outro_curso).concluido)
+        alheio.refresh_from_db()
+        self.assertEqual(alheio.status, 'pendente')
+
+    def test_rejeitar_pedido(self):
+        pendente = self.pedir(self.aluno)
+        self.client.force_authenticate(self.professor)
+        self.client.post(reverse('api-professor-responder'), {'ids': [pendente.pk], 'acao': 'rejeitar'}, format='json')
+        pendente.refresh_from_db()
+        self.assertEqual((pendente.status, pendente.data_aprovacao, pendente.aprovado_por), ('rejeitado', None, None))
+        self.assertFalse(Matricula.objects.get(aluno=self.aluno, curso=self.curso).concluido)
+
+    def test_erro_ao_gerar_o_pdf_nao_vaza_detalhes(self):
+        pedido = self.pedir(self.aluno, status='aprovado', data_aprovacao=timezone.now())
+        self.client.force_authenticate(self.aluno)
+        html = mock.Mock()
+        html.return_value.write_pdf.side_effect = RuntimeError('/srv/segredo/fonte.ttf')
+        with mock.patch.object(views, 'HTML', html), self.assertLogs('usuarios.views', 'ERROR'):
+            resposta = self.client.post(reverse('api-gerar-certificado-curso'), {'solicitacao': pedido.pk}, format='json')
+        self.assertEqual(resposta.status_code, 500)
+        self.assertNotIn('segredo', resposta.json()['detail'])
+
+
+class EstatisticasTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.agora = timezone.make_aware(datetime(2026, 3, 15, 12))
+        relogio = mock.patch('usuarios.estatisticas.timezone.now', return_value=self.agora)
+        relogio.start()
+        self.addCleanup(relogio.stop)
+        User.objects.filter(pk=self.secretario.pk).update(data_cadastro=self.momento(2020, 1, 1))
+
+    def momento(self, *data):
+        return timezone.make_aware(datetime(*data))
+
+    def criar(self, username, cadastro, aprovacao=None, **campos):
+        return self.criar_usuario(
+            username, data_cadastro=cadastro, data_aprovacao=aprovacao, aprovado=aprovacao is not None, **campos,
+        )
+
+    def test_contadores_e_meses(self):
+        self.criar('ana', self.momento(2026, 1, 10), self.momento(2026, 2, 1))
+        # Os meses seguem o horário local: 28/02 às 22h já é 1º de março em UTC, mas conta em fevereiro
+        self.criar('bia', self.momento(2026, 2, 28, 22), self.momento(2026, 3, 2))
+        # Pelo mesmo motivo, 31/12 às 23h30 fica em dezembro, fora da janela de 3 meses
+        self.criar('caio', self.momento(2025, 12, 31, 23, 30), self.momento(2026, 1, 5), papel='congregado')
+        self.criar('davi', self.agora - timedelta(days=3))
+        self.criar('eva', self.agora - timedelta(days=40))
+
+        dados = estatisticas.gerar(meses=3)
+        self.assertEqual(
+            (dados['total_usuarios'], dados['usuarios_pendentes'], dados['total_membros'], dados['total_congregados']),
+            (6, 2, 2, 1),
+        )
+        self.assertEqual(dados['fila_pendentes']['faixas'], {'ate_7_dias': 1, 'de_8_a_30_dias': 0, 'mais_de_30_dias': 1})
+        self.assertEqual(dados['fila_pendentes']['dias_pendente_mais_antigo'], 40)
+        self.assertEqual(dados['por_mes'], [
+            {'mes': '2026-01', 'cadastros': 1, 'aprovacoes': 1},
+            {'mes': '2026-02', 'cadastros': 2, 'aprovacoes': 1},
+            {'mes': '2026-03', 'cadastros': 1, 'aprovacoes': 1},
+        ])
+
+    def test_salvar_um_usuario_invalida_o_cache(self):
+        url = reverse('api-dashboard-stats')
+        self.assertEqual(self.client.get(url).json()['total_usuarios'], 1)
+
+        usuario = self.criar('ana', self.agora - timedelta(days=1))
+        self.assertEqual(self.client.get(url).json()['usuarios_pendentes'], 1)
+
+        # Sem sinal (update), os números em cache continuam valendo até invalidar()
+        User.objects.filter(pk=usuario.pk).update(aprovado=True)
+        self.assertEqual(self.client.get(url).json()['usuarios_pendentes'], 1)
+        # Salvar só o último login não muda nada do dashboard
+        usuario.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(url).json()['usuarios_pendentes'], 1)
+
+        usuario.refresh_from_db()
+        usuario.save()
+        self.assertEqual(self.client.get(url).json()['usuarios_pendentes'], 0)
 
-# Create your tests here.
@@ -3,26 +3,42 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.utils import timezone
-from .models import User, ModeloDocumento
-from .permissions import IsSecretario
+from .models import User, ModeloDocumento, RegistroAuditoria, Curso, Matricula, SolicitacaoCertificado
+from .permissions import IsSecretario, IsProfessor
+from django.db import IntegrityError
+from django.db.models import Exists, OuterRef, Subquery
+from . import aniversariantes, auditoria, estatisticas, relatorios
+from .busca import BuscaNormalizadaFilter
+from .paginacao import PaginacaoKeyset
+from .autenticacao import invalidar_usuarios
+from django.db import transaction
 from .serializers import (
     UserRegistrationSerializer, MyTokenObtainPairSerializer, UserProfileSerializer, UserProfileUpdateSerializer, AdminUserListSerializer, AdminUserCreateSerializer, 
-    AdminUserUpdateSerializer, UserBasicSerializer
+    AdminUserUpdateSerializer, UserBasicSerializer, AcaoEmLoteSerializer, ImportacaoUsuariosSerializer,
+    RegistroAuditoriaSerializer, CursoSerializer, MatriculaSerializer, SolicitacaoCertificadoSerializer,
+    RespostaCertificadosSerializer
 )
+from .importacao import ErroImportacao, ImportadorUsuarios
+from . import exportacao
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter
+from django.contrib.staticfiles.storage import staticfiles_storage
 from django.template.loader import render_to_string
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 try:
     from weasyprint import HTML
 except ImportError:
     HTML = None # Permite que o servidor inicie mesmo sem WeasyPrint instalado localmente
 from datetime import datetime
 import base64
+import logging
 import os
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 
 class MyTokenObtainPairView(TokenObtainPairView):
     """
@@ -37,7 +53,10 @@ class UserRegisterView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
 
 class DashboardStatsAPIView(APIView):
-    """ View de API que retorna estatísticas do sistema para o dashboard do secretário. """
+    """
+    View de API que retorna estatísticas do sistema para o dashboard do secretário:
+    totais, idade da fila de pendentes e cadastros/aprovações por mês (?meses=12, máximo 36).
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, format=None):
@@ -46,13 +65,77 @@ class DashboardStatsAPIView(APIView):
                 {"detail": "Acesso negado. Apenas secretários podem ver as estatísticas."},
                 status=status.HTTP_403_FORBIDDEN
             )
-        stats = {
-            'total_usuarios': User.objects.count(),
-            'usuarios_pendentes': User.objects.filter(aprovado=False).count(),
-            'total_membros': User.objects.filter(papel='membro', aprovado=True).count(),
-            'total_congregados': User.objects.filter(papel='congregado', aprovado=True).count(),
-        }
-        return Response(stats)
+        try:
+            meses = int(request.query_params.get('meses', estatisticas.MESES_PADRAO))
+        except ValueError:
+            return Response({"detail": "O parâmetro 'meses' deve ser um número inteiro."}, status=status.HTTP_400_BAD_REQUEST)
+        meses = max(1, min(meses, estatisticas.MESES_MAXIMO))
+
+        return Response(estatisticas.obter(meses))
+
+class RelatorioDemograficoAPIView(APIView):
+    """
+    View de API para secretários: pirâmide etária, idade média/mediana e distribuições
+    (papel, estado civil, escolaridade, cidade, bairro, batismo, escola bíblica), todas
+    agregadas no banco. Filtros: ?papel=, ?cidade=, ?bairro=, ?estado_civil=, ?nivel_escolar=,
+    ?batizado_aguas=, ?frequenta_escola_biblica=, ?aprovado=, ?ativo= (padrão: aprovados e ativos).
+    Tabela cruzada opcional: ?linhas=estado_civil&colunas=faixa_etaria.
+    """
+    permission_classes = [IsAuthenticated, IsSecretario]
+
+    def get(self, request, format=None):
+        try:
+            filtros = relatorios.ler_filtros(request.query_params)
+        except relatorios.FiltroInvalido as erro:
+            return Response({"detail": str(erro)}, status=status.HTTP_400_BAD_REQUEST)
+
+        linhas = request.query_params.get('linhas')
+        colunas = request.query_params.get('colunas')
+        if bool(linhas) != bool(colunas):
+            return Response({"detail": "Informe 'linhas' e 'colunas' para a tabela cruzada."}, status=status.HTTP_400_BAD_REQUEST)
+        for dimensao in filter(None, (linhas, colunas)):
+            if dimensao not in relatorios.DIMENSOES:
+                return Response(
+                    {"detail": f"Campo inválido para cruzamento: '{dimensao}'. Opções: {', '.join(relatorios.DIMENSOES)}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        return Response(relatorios.obter(filtros, linhas, colunas))
+
+class AuditoriaListView(generics.ListAPIView):
+    """
+    View de API para secretários consultarem o registro de auditoria, do mais recente
+    para o mais antigo. Filtros: ?ator=<id>, ?alvo=<id>, ?acao=aprovar, ?origem=admin.
+    """
+    queryset = RegistroAuditoria.objects.all()
+    serializer_class = RegistroAuditoriaSerializer
+    permission_classes = [IsAuthenticated, IsSecretario]
+    pagination_class = PaginacaoKeyset
+    ordenacao_keyset = ('-criado_em', '-id')
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['ator', 'alvo', 'acao', 'origem']
+
+class AniversariantesAPIView(APIView):
+    """
+    View de API para secretários: aniversariantes de nascimento, casamento e batismo
+    (e filhos) entre ?de=MM-DD e ?ate=MM-DD, inclusive quando o intervalo vira o ano
+    (ex: ?de=12-20&ate=01-10). Sem parâmetros, os do mês corrente.
+    """
+    permission_classes = [IsAuthenticated, IsSecretario]
+
+    def get(self, request, format=None):
+        limites = {}
+        for parametro in ('de', 'ate'):
+            valor = request.query_params.get(parametro)
+            if not valor:
+                continue
+            try:
+                limites[parametro] = aniversariantes.ler_mes_dia(valor)
+            except ValueError:
+                return Response(
+                    {"detail": f"O parâmetro '{parametro}' deve ser uma data no formato MM-DD (ex: 12-25)."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        return Response(aniversariantes.obter(**limites))
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
     """
@@ -74,77 +157,79 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     
 class AdminUserListView(generics.ListCreateAPIView):
     """
-    View de API para secretários LISTAREM (GET com filtros) e CRIAREM (POST) usuários.
+    View de API para secretários LISTAREM (GET com filtros, paginado) e CRIAREM (POST) usuários.
     """
-    queryset = User.objects.all().order_by('nome_completo')
+    queryset = User.objects.all()
     permission_classes = [IsAuthenticated, IsSecretario]
+    pagination_class = PaginacaoKeyset
+    ordenacao_keyset = ('nome_completo', 'id')
     
     # Configuração dos filtros
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DjangoFilterBackend, BuscaNormalizadaFilter]
     filterset_fields = ['papel', 'aprovado', 'ativo'] # Campos para filtro exato (ex: /api/admin/users/?papel=membro)
-    search_fields = ['nome_completo', 'email', 'cpf'] # Campos para busca textual (ex: /api/admin/users/?search=João)
+    # A busca textual (ex: /api/admin/users/?search=joao) usa a coluna normalizada User.busca,
+    # que reúne nome, e-mail, CPF e telefone sem acentos (ver usuarios/busca.py)
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return AdminUserCreateSerializer
         return AdminUserListSerializer
 
-class AdminPendingUserListView(generics.ListAPIView):
-    queryset = User.objects.filter(aprovado=False).order_by('data_cadastro')
-    serializer_class = AdminUserListSerializer
-    permission_classes = [IsAuthenticated, IsSecretario]
-
-class AdminApproveUserView(APIView):
-    permission_classes = [IsAuthenticated, IsSecretario]
-    def post(self, request, pk, format=None):
-        try:
-            user_to_approve = User.objects.get(pk=pk)
-        except User.DoesNotExist:
-            return Response({"detail": "Usuário não encontrado."}, status=status.HTTP_404_NOT_FOUND)
-        new_role = request.data.get('papel')
-        if new_role not in ['membro', 'congregado', 'secretario']:
-            return Response({"detail": "Papel inválido fornecido."}, status=status.HTTP_400_BAD_REQUEST)
-        user_to_approve.aprovado = True
-        user_to_approve.aprovado_por = request.user
-        user_to_approve.data_aprovacao = timezone.now()
-        user_to_approve.papel = new_role
-        user_to_approve.save()
-        return Response({"detail": f"Usuário {user_to_approve.nome_completo} aprovado como {user_to_approve.get_papel_display()}."}, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method == 'GET':
+            queryset = AdminUserListSerializer.otimizar_queryset(queryset, self.request, sempre=self.ordenacao_keyset)
+        return queryset
 
-class AdminRejectUserView(APIView):
-    permission_classes = [IsAuthenticated, IsSecretario]
-    def delete(self, request, pk, format=None):
-        try:
-            user_to_reject = User.objects.get(pk=pk, aprovado=False)
-        except User.DoesNotExist:
-            return Response({"detail": "Usuário pendente não encontrado."}, status=status.HTTP_404_NOT_FOUND)
-        user_to_reject.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+    def perform_create(self, serializer):
+        user = serializer.save()
+        auditoria.registrar('criar', self.request.user, user)
 
-class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AdminUserExportView(generics.GenericAPIView):
     """
-    View de API para um secretário:
-    - LER (GET) os detalhes completos de um usuário.
-    - ATUALIZAR (PUT/PATCH) os dados de um usuário.
-    - EXCLUIR (DELETE) um usuário.
+    View de API para secretários baixarem a lista de membros em planilha.
+    GET ?formato=csv (padrão) ou ?formato=xlsx, com os mesmos filtros e busca da
+    listagem (ex: ?papel=membro&ativo=true&search=silva). O CSV é enviado em
+    streaming, lido do banco em lotes, então a memória não cresce com o total de membros.
     """
-    queryset = User.objects.all()
+    queryset = User.objects.order_by('nome_completo', 'id')
     permission_classes = [IsAuthenticated, IsSecretario]
+    filter_backends = AdminUserListView.filter_backends
+    filterset_fields = AdminUserListView.filterset_fields
 
-    def get_serializer_class(self):
-        # Usa um serializer para leitura e outro para escrita
-        if self.request.method in ['PUT', 'PATCH']:
-            return AdminUserUpdateSerializer
-        return UserProfileSerializer
+    def get(self, request, format=None):
+        formato = request.query_params.get('formato', 'csv')
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if formato == 'csv':
+            response = StreamingHttpResponse(exportacao.gerar_csv(queryset), content_type='text/csv; charset=utf-8')
+            response['Content-Disposition'] = f'attachment; filename="{exportacao.nome_arquivo("csv")}"'
+            return response
+        if formato == 'xlsx':
+            if exportacao.openpyxl is None:
+                return Response(
+                    {"detail": "Exportação em .xlsx indisponível no servidor (openpyxl não instalado). Use ?formato=csv."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return FileResponse(
+                exportacao.gerar_xlsx(queryset), as_attachment=True, filename=exportacao.nome_arquivo('xlsx'),
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            )
+        return Response({"detail": "Formato inválido. Use csv ou xlsx."}, status=status.HTTP_400_BAD_REQUEST)
 
 class AdminPendingUserListView(generics.ListAPIView):
     """
     View de API para secretários listarem apenas usuários pendentes de aprovação.
     """
-    # Filtra o queryset para pegar apenas usuários não aprovados
-    queryset = User.objects.filter(aprovado=False).order_by('data_cadastro')
+    # Filtra o queryset para pegar apenas usuários não aprovados, os mais antigos primeiro
+    queryset = User.objects.filter(aprovado=False)
     serializer_class = AdminUserListSerializer # Reutilizamos o serializer da lista
     permission_classes = [IsAuthenticated, IsSecretario]
+    pagination_class = PaginacaoKeyset
+    ordenacao_keyset = ('data_cadastro', 'id')
+
+    def get_queryset(self):
+        return self.serializer_class.otimizar_queryset(super().get_queryset(), self.request, sempre=self.ordenacao_keyset)
 
 class AdminApproveUserView(APIView):
     """
@@ -156,17 +241,19 @@ class AdminApproveUserView(APIView):
         try:
             user_to_approve = User.objects.get(pk=pk)
         except User.DoesNotExist:
-            return Response({"detail": "Usuário не encontrado."}, status=status.HTTP_404_NOT_FOUND)
+            return Response({"detail": "Usuário não encontrado."}, status=status.HTTP_404_NOT_FOUND)
 
         new_role = request.data.get('papel')
-        if new_role not in ['membro', 'congregado', 'secretario']:
+        if new_role not in ['membro', 'congregado', 'secretario', 'professor']:
             return Response({"detail": "Papel inválido fornecido."}, status=status.HTTP_400_BAD_REQUEST)
 
+        antes = auditoria.capturar(user_to_approve)
         user_to_approve.aprovado = True
         user_to_approve.aprovado_por = request.user
         user_to_approve.data_aprovacao = timezone.now()
         user_to_approve.papel = new_role
         user_to_approve.save()
+        auditoria.registrar('aprovar', request.user, user_to_approve, auditoria.diferencas(antes, user_to_approve))
         
         return Response({"detail": f"Usuário {user_to_approve.nome_completo} aprovado como {user_to_approve.get_papel_display()}."}, status=status.HTTP_200_OK)
 
@@ -182,9 +269,144 @@ class AdminRejectUserView(APIView):
         except User.DoesNotExist:
             return Response({"detail": "Usuário pendente não encontrado."}, status=status.HTTP_404_NOT_FOUND)
         
-        user_to_reject.delete()
+        with transaction.atomic():
+            auditoria.registrar('rejeitar', request.user, user_to_reject)
+            user_to_reject.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
     
+class AdminBulkUserActionView(APIView):
+    """
+    View de API para um secretário aplicar uma ação a vários usuários de uma vez.
+    POST {"ids": [1, 2, 3], "acao": "aprovar", "papel": "membro"}
+    Ações: aprovar (só pendentes, com papel), rejeitar (só pendentes), ativar, desativar, alterar_papel (com papel).
+    Tudo roda em uma transação, com bulk_update/update() só das colunas alteradas,
+    e a resposta traz o resultado de cada id.
+    """
+    permission_classes = [IsAuthenticated, IsSecretario]
+
+    def post(self, request, format=None):
+        serializer = AcaoEmLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        acao = serializer.validated_data['acao']
+        papel = serializer.validated_data.get('papel')
+        ids = serializer.validated_data['ids']
+
+        resultados = {}
+        with transaction.atomic():
+            usuarios = {
+                user.pk: user
+                for user in User.objects.select_for_update()
+                .filter(pk__in=ids)
+                .only('pk', 'nome_completo', 'username', 'aprovado', 'papel', 'ativo')
+            }
+            validos = []
+            for user_id in ids:
+                user = usuarios.get(user_id)
+                if user is None:
+                    resultados[user_id] = "Usuário não encontrado."
+                elif user_id == request.user.pk and acao in ('aprovar', 'rejeitar', 'desativar', 'alterar_papel'):
+                    resultados[user_id] = "Você não pode aplicar esta ação ao seu próprio usuário."
+                elif acao in ('aprovar', 'rejeitar') and user.aprovado:
+                    # Para mudar o papel de quem já foi aprovado, use alterar_papel
+                    resultados[user_id] = "Usuário não está pendente de aprovação."
+                else:
+                    validos.append(user)
+
+            if validos:
+                antes = {user.pk: auditoria.capturar(user, ('aprovado', 'papel', 'ativo')) for user in validos}
+                self.aplicar(acao, papel, validos, request.user)
+                novos = {
+                    'aprovar': {'aprovado': True, 'papel': papel},
+                    'rejeitar': {},
+                    'ativar': {'ativo': True},
+                    'desativar': {'ativo': False},
+                    'alterar_papel': {'papel': papel},
+                }[acao]
+                auditoria.registrar_varios(acao, request.user, validos, {
+                    pk: auditoria.diferencas(valores, {**valores, **novos}) for pk, valores in antes.items()
+                })
+                # bulk_update()/update() não disparam os sinais
+                estatisticas.invalidar()
+                relatorios.invalidar()
+                aniversariantes.invalidar()
+                if acao != 'rejeitar':
+                    invalidar_usuarios([user.pk for user in validos])
+
+        detalhe_sucesso = {
+            'aprovar': f"Aprovado como {dict(User.PAPEL_CHOICES).get(papel)}.",
+            'rejeitar': "Cadastro rejeitado e excluído.",
+            'ativar': "Usuário ativado.",
+            'desativar': "Usuário desativado.",
+            'alterar_papel': f"Papel alterado para {dict(User.PAPEL_CHOICES).get(papel)}.",
+        }[acao]
+        lista = [
+            {'id': user_id, 'sucesso': user_id not in resultados, 'detail': resultados.get(user_id, detalhe_sucesso)}
+            for user_id in ids
+        ]
+        return Response({
+            'acao': acao,
+            'total_sucesso': sum(1 for item in lista if item['sucesso']),
+            'total_erro': sum(1 for item in lista if not item['sucesso']),
+            'resultados': lista,
+        }, status=status.HTTP_200_OK)
+
+    def aplicar(self, acao, papel, usuarios, secretario):
+        ids = [user.pk for user in usuarios]
+        if acao == 'aprovar':
+            agora = timezone.now()
+            for user in usuarios:
+                user.aprovado = True
+                user.aprovado_por = secretario
+                user.data_aprovacao = agora
+                user.papel = papel
+            User.objects.bulk_update(usuarios, ['aprovado', 'aprovado_por', 'data_aprovacao', 'papel'])
+        elif acao == 'rejeitar':
+            # delete() do queryset envia os sinais de exclusão de cada usuário
+            User.objects.filter(pk__in=ids, aprovado=False).delete()
+        elif acao == 'ativar':
+            User.objects.filter(pk__in=ids).update(ativo=True)
+        elif acao == 'desativar':
+            User.objects.filter(pk__in=ids).update(ativo=False)
+        elif acao == 'alterar_papel':
+            User.objects.filter(pk__in=ids).update(papel=papel)
+
+class AdminImportUsersView(APIView):
+    """
+    View de API para um secretário importar fichas de membros de uma planilha.
+    POST multipart: arquivo (.csv ou .xlsx, cabeçalho com os nomes dos campos),
+    simular (só valida) e papel_padrao. As linhas válidas são gravadas em lote,
+    já aprovadas e com senha inutilizável; a resposta traz os erros de cada linha.
+    A importação não é tudo ou nada: linhas inválidas ou cujo CPF/username foi
+    cadastrado por outra pessoa durante a importação aparecem em `erros` e as
+    demais são gravadas (`importados`).
+    """
+    permission_classes = [IsAuthenticated, IsSecretario]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request, format=None):
+        serializer = ImportacaoUsuariosSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        arquivo = serializer.validated_data['arquivo']
+        importador = ImportadorUsuarios(
+            aprovado_por=request.user,
+            simular=serializer.validated_data['simular'],
+            papel_padrao=serializer.validated_data['papel_padrao'],
+            origem='api',
+        )
+        try:
+            resultado = importador.importar(arquivo.file, arquivo.name)
+        except ErroImportacao as erro:
+            return Response({"detail": str(erro)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'simulacao': importador.simular,
+            'total_linhas': resultado.total_linhas,
+            'importados': resultado.importados,
+            'total_erro': len(resultado.erros),
+            'colunas_ignoradas': resultado.colunas_ignoradas,
+            'erros': resultado.erros,
+        }, status=status.HTTP_200_OK)
+
 class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     View de API para um secretário:
@@ -199,8 +421,204 @@ class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
         if self.request.method in ['PUT', 'PATCH']:
             return AdminUserUpdateSerializer
         return UserProfileSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method == 'GET':
+            # Com ?fields=nome_completo,foto_perfil lê só essas colunas, sem filhos nem aprovado_por
+            queryset = UserProfileSerializer.otimizar_queryset(queryset, self.request)
+        return queryset
+
+    def perform_update(self, serializer):
+        antes = auditoria.capturar(serializer.instance)
+        user = serializer.save()
+        alteracoes = auditoria.diferencas(antes, user)
+        if alteracoes:
+            auditoria.registrar('editar', self.request.user, user, alteracoes)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            auditoria.registrar('excluir', self.request.user, instance)
+            instance.delete()
     
 
+# --- CURSOS, MATRÍCULAS E CERTIFICADOS ---
+
+# Papéis que podem se matricular (o mesmo limit_choices_to de Matricula.aluno)
+PAPEIS_ALUNO = ['membro', 'congregado']
+
+class CursoListView(generics.ListAPIView):
+    """
+    View de API que lista os cursos ativos, indicando em quais o usuário logado já está matriculado.
+    """
+    serializer_class = CursoSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        matriculado = Matricula.objects.filter(curso=OuterRef('pk'), aluno=self.request.user)
+        return (
+            Curso.objects.filter(ativo=True)
+            .select_related('professor')
+            .only('id', 'nome', 'descricao', 'carga_horaria', 'professor__id', 'professor__nome_completo')
+            .annotate(matriculado=Exists(matriculado))
+        )
+
+class CursoMatriculaView(APIView):
+    """
+    View de API para um membro ou congregado aprovado se matricular em um curso (POST).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk, format=None):
+        if request.user.papel not in PAPEIS_ALUNO or not request.user.aprovado:
+            return Response(
+                {"detail": "Apenas membros e congregados com cadastro aprovado podem se matricular."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        try:
+            curso = Curso.objects.only('pk', 'nome', 'carga_horaria').get(pk=pk, ativo=True)
+        except Curso.DoesNotExist:
+            return Response({"detail": "Curso não encontrado."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            with transaction.atomic():
+                matricula = Matricula.objects.create(aluno=request.user, curso=curso)
+        except IntegrityError:
+            return Response({"detail": "Você já está matriculado neste curso."}, status=status.HTTP_400_BAD_REQUEST)
+        matricula.certificado_id = matricula.certificado_status = None
+        return Response(MatriculaSerializer(matricula).data, status=status.HTTP_201_CREATED)
+
+class MinhasMatriculasView(generics.ListAPIView):
+    """
+    View de API que lista as matrículas do usuário logado, com a situação do último pedido de certificado.
+    """
+    serializer_class = MatriculaSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        ultimo_pedido = SolicitacaoCertificado.objects.filter(
+            aluno=OuterRef('aluno'), curso=OuterRef('curso')
+        ).order_by('-data_solicitacao', '-id')
+        return (
+            Matricula.objects.filter(aluno=self.request.user)
+            .select_related('curso')
+            .annotate(
+                certificado_id=Subquery(ultimo_pedido.values('id')[:1]),
+                certificado_status=Subquery(ultimo_pedido.values('status')[:1]),
+            )
+        )
+
+class SolicitarCertificadoView(APIView):
+    """
+    View de API para o aluno pedir o certificado de um curso em que está matriculado.
+    O pedido vai para a fila do professor do curso.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk, format=None):
+        try:
+            matricula = Matricula.objects.select_related('curso').get(pk=pk, aluno=request.user)
+        except Matricula.DoesNotExist:
+            return Response({"detail": "Matrícula não encontrada."}, status=status.HTTP_404_NOT_FOUND)
+
+        with transaction.atomic():
+            # Trava a matrícula para que dois cliques não criem dois pedidos
+            Matricula.objects.select_for_update().filter(pk=matricula.pk).exists()
+            em_aberto = SolicitacaoCertificado.objects.filter(
+                aluno=request.user, curso=matricula.curso, status__in=['pendente', 'aprovado']
+            ).values_list('status', flat=True).first()
+            if em_aberto == 'pendente':
+                return Response({"detail": "Já existe um pedido de certificado aguardando o professor."}, status=status.HTTP_400_BAD_REQUEST)
+            if em_aberto == 'aprovado':
+                return Response({"detail": "Seu certificado deste curso já foi aprovado."}, status=status.HTTP_400_BAD_REQUEST)
+
+            solicitacao = SolicitacaoCertificado.objects.create(
+                aluno=request.user, curso=matricula.curso, professor_id=matricula.curso.professor_id
+            )
+        return Response(SolicitacaoCertificadoSerializer(solicitacao).data, status=status.HTTP_201_CREATED)
+
+class ProfessorSolicitacoesView(generics.ListAPIView):
+    """
+    View de API com a fila de pedidos de certificado do professor logado, os mais antigos primeiro.
+    ?status=pendente (padrão), aprovado ou rejeitado; ?curso=<id> para um curso só.
+    """
+    serializer_class = SolicitacaoCertificadoSerializer
+    permission_classes = [IsAuthenticated, IsProfessor]
+    pagination_class = PaginacaoKeyset
+    ordenacao_keyset = ('data_solicitacao', 'id')
+
+    def get_queryset(self):
+        situacao = self.request.query_params.get('status', 'pendente')
+        if situacao not in dict(SolicitacaoCertificado.STATUS_CHOICES):
+            situacao = 'pendente'
+        # Usa o índice (professor, status, data_solicitacao, id)
+        queryset = SolicitacaoCertificado.objects.filter(professor=self.request.user, status=situacao)
+        curso = self.request.query_params.get('curso')
+        if curso and curso.isdigit():
+            queryset = queryset.filter(curso_id=curso)
+        return queryset.select_related('aluno', 'curso').only(
+            'id', 'status', 'data_solicitacao', 'data_aprovacao', 'observacao_professor',
+            'aluno__id', 'aluno__nome_completo', 'curso__id', 'curso__nome',
+        )
+
+class ProfessorResponderSolicitacoesView(APIView):
+    """
+    View de API para o professor aprovar ou rejeitar vários pedidos de certificado de uma vez.
+    POST {"ids": [1, 2, 3], "acao": "aprovar", "observacao": "Parabéns!"}
+    Tudo roda em uma transação com dois UPDATEs (pedidos e matrículas concluídas),
+    sem gerar PDFs: o aluno baixa o certificado quando quiser.
+    """
+    permission_classes = [IsAuthenticated, IsProfessor]
+
+    def post(self, request, format=None):
+        serializer = RespostaCertificadosSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        acao = serializer.validated_data['acao']
+        ids = serializer.validated_data['ids']
+
+        resultados = {}
+        with transaction.atomic():
+            pedidos = dict(
+                SolicitacaoCertificado.objects.select_for_update()
+                .filter(pk__in=ids, professor=request.user)
+                .values_list('pk', 'status')
+            )
+            validos = []
+            for pedido_id in ids:
+                if pedido_id not in pedidos:
+                    resultados[pedido_id] = "Pedido não encontrado."
+                elif pedidos[pedido_id] != 'pendente':
+                    resultados[pedido_id] = "Este pedido já foi respondido."
+                else:
+                    validos.append(pedido_id)
+
+            if validos:
+                agora = timezone.now()
+                aprovado = acao == 'aprovar'
+                SolicitacaoCertificado.objects.filter(pk__in=validos).update(
+                    status='aprovado' if aprovado else 'rejeitado',
+                    data_aprovacao=agora if aprovado else None,
+                    aprovado_por=request.user if aprovado else None,
+                    observacao_professor=serializer.validated_data['observacao'],
+                )
+                if aprovado:
+                    aprovados = SolicitacaoCertificado.objects.filter(
+                        pk__in=validos, aluno=OuterRef('aluno'), curso=OuterRef('curso')
+                    )
+                    Matricula.objects.filter(Exists(aprovados), concluido=False).update(concluido=True, data_conclusao=agora)
+
+        detalhe_sucesso = "Certificado aprovado." if acao == 'aprovar' else "Pedido rejeitado."
+        lista = [
+            {'id': pedido_id, 'sucesso': pedido_id not in resultados, 'detail': resultados.get(pedido_id, detalhe_sucesso)}
+            for pedido_id in ids
+        ]
+        return Response({
+            'acao': acao,
+            'total_sucesso': sum(1 for item in lista if item['sucesso']),
+            'total_erro': sum(1 for item in lista if not item['sucesso']),
+            'resultados': lista,
+        }, status=status.HTTP_200_OK)
+
 class GerarCartaConviteAPIView(APIView):
     permission_classes = [IsAuthenticated, IsSecretario]
 
@@ -333,6 +751,61 @@ class GerarCertificadoBatismoAPIView(APIView):
             print(f"Erro ao gerar PDF: {e}")
             return Response({"detail": f"Erro interno ao gerar PDF: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
+class GerarCertificadoCursoAPIView(APIView):
+    """
+    View de API para o aluno gerar o PDF do certificado de um curso já aprovado pelo professor.
+    POST {"solicitacao": <id>}
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, format=None):
+        if HTML is None:
+            return Response({"detail": "Erro de servidor: WeasyPrint não configurado."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        try:
+            solicitacao = SolicitacaoCertificado.objects.select_related('curso').get(
+                pk=request.data.get('solicitacao'), aluno=request.user
+            )
+        except (SolicitacaoCertificado.DoesNotExist, ValueError, TypeError):
+            return Response({"detail": "Pedido de certificado não encontrado."}, status=status.HTTP_404_NOT_FOUND)
+        if solicitacao.status != 'aprovado':
+            return Response({"detail": "Este certificado ainda não foi aprovado pelo professor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        curso = solicitacao.curso
+        meses = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+        data = timezone.localtime(solicitacao.data_aprovacao)
+        texto_conclusao = (
+            f"concluiu o curso com carga horária de {curso.carga_horaria} horas, "
+            f"em {data.day} de {meses[data.month - 1]} de {data.year}."
+        )
+
+        background_static_path = 'documentos/certificado-basico-libras.png'
+        try:
+            certificado_url = request.build_absolute_uri(staticfiles_storage.url(background_static_path))
+        except ValueError:
+            # Sem o manifesto do collectstatic (ex: em desenvolvimento), a URL simples
+            certificado_url = request.build_absolute_uri(f'/static/{background_static_path}')
+
+        context = {
+            'nome_aluno': request.user.nome_completo,
+            'nome_curso': curso.nome,
+            'texto_conclusao': texto_conclusao,
+            'certificado_url': certificado_url,
+        }
+
+        try:
+            html_string = render_to_string('documentos/certificado_libras.html', context)
+            html = HTML(string=html_string, base_url=request.build_absolute_uri('/'))
+            pdf = html.write_pdf()
+
+            response = HttpResponse(pdf, content_type='application/pdf')
+            response['Content-Disposition'] = f'inline; filename="certificado_curso_{curso.pk}_{request.user.username}.pdf"'
+            return response
+        except Exception:
+            # Qualquer falha do template ou do WeasyPrint: o detalhe vai para o log, não para o aluno
+            logger.exception("Erro ao gerar o certificado do pedido %s", solicitacao.pk)
+            return Response({"detail": "Erro interno ao gerar o certificado."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 class SuperuserManagementView(APIView):
     """
     View para superusers gerenciarem outros superusers
@@ -374,9 +847,14 @@ class SuperuserManagementView(APIView):
                 )
             
             # Promover para superuser
+            antes = auditoria.capturar(user_to_promote, ('is_superuser', 'is_staff'))
             user_to_promote.is_superuser = True
             user_to_promote.is_staff = True  # Necessário para acessar admin
             user_to_promote.save()
+            auditoria.registrar(
+                'promover_superusuario', request.user, user_to_promote,
+                auditoria.diferencas(antes, auditoria.capturar(user_to_promote, antes)),
+            )
             
             return Response({
                 "detail": f"Usuário {user_to_promote.nome_completo} promovido a superusuário."
@@ -419,9 +897,14 @@ class SuperuserDemoteView(APIView):
                 )
             
             # Reverter para usuário normal
+            antes = auditoria.capturar(user_to_demote, ('is_superuser', 'is_staff'))
             user_to_demote.is_superuser = False
             user_to_demote.is_staff = False
             user_to_demote.save()
+            auditoria.registrar(
+                'remover_superusuario', request.user, user_to_demote,
+                auditoria.diferencas(antes, auditoria.capturar(user_to_demote, antes)),
+            )
             
             return Response({
                 "detail": f"Usuário {user_to_demote.nome_completo} teve privilégios de superusuário removidos."
@@ -440,6 +923,8 @@ class UserSelectionListView(generics.ListAPIView):
     """
     permission_classes = [IsAuthenticated]
     serializer_class = UserBasicSerializer
+    pagination_class = PaginacaoKeyset
+    ordenacao_keyset = ('nome_completo', 'id')
     
     def get_queryset(self):
         # Apenas superusers podem acessar
@@ -447,4 +932,6 @@ class UserSelectionListView(generics.ListAPIView):
             return User.objects.none()
         
         # Filtrar usuários que não são superusers (para promoção)
-        return User.objects.filter(is_superuser=False).order_by('nome_completo')
\ No newline at end of file
+        return self.serializer_class.otimizar_queryset(
+            User.objects.filter(is_superuser=False), self.request, sempre=self.ordenacao_keyset
+        )
\ No newline at end of file